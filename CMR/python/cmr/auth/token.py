@@ -273,7 +273,7 @@ def read_tokens(edl_user, token_lambdas = None, config:dict = None):
         cipher_text = _base64_text(plain_text)
         encoded_credentials = f'Basic {cipher_text}'
         headers = {"Authorization" : encoded_credentials}
-        tokens = net.get(url, None, headers=headers)
+        tokens = net.get(url, None, headers=headers, config=config)
     return tokens
 
 def create_token(edl_user, token_lambdas = None, config:dict = None):
@@ -309,7 +309,10 @@ def create_token(edl_user, token_lambdas = None, config:dict = None):
         cipher_text = _base64_text(plain_text)
         encoded_credentials = f'Basic {cipher_text}'
         headers = {"Authorization" : encoded_credentials}
-        tokens = net.post(url, None, headers=headers)
+        # each call makes a new token, never share one between threads or
+        # send it again after it may have reached EDL
+        tokens = net.post(url, None, headers=headers,
+            config={**common.always(config), 'coalesce': False, 'retry.idempotent': False})
     return tokens
 
 def delete_token(access_token, edl_user, token_lambdas = None, config:dict = None):
@@ -333,7 +336,9 @@ def delete_token(access_token, edl_user, token_lambdas = None, config:dict = Non
         cipher_text = _base64_text(plain_text)
         encoded_credentials = f'Basic {cipher_text}'
         headers = {"Authorization" : encoded_credentials}
-        response = net.post(url, "token=" + access_token, headers=headers)
+        # never shared or sent again, as for create_token()
+        response = net.post(url, "token=" + access_token, headers=headers,
+            config={**common.always(config), 'coalesce': False, 'retry.idempotent': False})
         tokens = response
     return tokens
 
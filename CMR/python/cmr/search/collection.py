@@ -30,6 +30,32 @@ This function can handle any query parameter which is supported by the CMR.
         limit - int, limiting the number of records returned
         config - configurations
 
+    harvest()
+        query - a dictionary of CMR parameters
+        checkpoint - path of the checkpoint file to resume from
+        output - path of the JSON lines file to write to
+        filters - a list of result filter lambdas
+        limit - int limiting the number of records returned
+        config - configurations
+
+    sync()
+        query - a dictionary of CMR parameters
+        state_file - path of the file which remembers the last sync
+        filters - a list of result filter lambdas
+        config - configurations
+
+    lookup_by_ids()
+        ids - a list of concept ids
+        filters - a list of result filter lambdas
+        config - configurations
+
+    count()
+        query - a dictionary of CMR parameters
+        config - configurations
+
+    count_many()
+        same as count() but for a list of queries counted at the same time
+
 More information can be found at:
 https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
 
@@ -37,6 +63,9 @@ https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
 # pylint: disable=duplicate-code
 
 import cmr.search.common as scom
+from cmr.search import harvest as harvester
+from cmr.search import lookup
+from cmr.search import sync as syncer
 
 # ******************************************************************************
 # filter function lambdas
@@ -60,6 +89,19 @@ def drop_fields(key):
     """Drop a key from a dictionary"""
     return scom.drop_fields(key)
 
+# ******************************************************************************
+# predicate filter lambdas, which drop items
+
+def keep_if(test, query: dict = None):
+    """Drop the items test returns False for, query does the same in CMR"""
+    return scom.keep_if(test, query)
+def provider_is(provider: str):
+    """Keep only the items from a provider"""
+    return scom.provider_is(provider)
+def temporal_overlaps(start: str = None, end: str = None):
+    """Keep only the items with a temporal extent overlapping start to end"""
+    return scom.temporal_overlaps(start, end)
+
 def collection_core_fields(item):
     """Extract only fields that are used to identify a record"""
     record = {}
@@ -114,6 +156,97 @@ def search(query = None, filters = None, limit = None, config: dict = None):
         config=config)
     return found_items
 
+# document-it: {"from":"cmr.search.harvest.harvest"}
+# pylint: disable=R0913,R0917 # a search and where to keep it
+def harvest(query, checkpoint, output, filters = None, limit = None, config: dict = None):
+    """
+    Download every collection found by a search into a file of JSON lines, keeping
+    a checkpoint so that the harvest can be run again to carry on after it is
+    stopped or fails
+    Parameters:
+        query (dictionary): CMR search parameters
+        checkpoint (string): path of the checkpoint file
+        output (string): path of the file collections are appended to
+        filters (list): column filter lambdas
+        limit (int): most collections to write, None for all of them
+        config (dictionary): configuration settings
+    Returns:
+        dictionary with the status and number of collections written, or errors
+    """
+    return harvester.harvest("collections", query, checkpoint, output, filters=filters,
+        limit=limit, config=config)
+
+# document-it: {"from":"cmr.search.sync.sync"}
+def sync(query, state_file, filters = None, config: dict = None):
+    """
+    Find the collections which were added, updated, or deleted since the last time
+    this search was synced with the same state file, only asking CMR for the
+    collections revised since then
+    Parameters:
+        query (dictionary): CMR search parameters
+        state_file (string): path of the file which remembers each search
+        filters (list): column filter lambdas for the added and updated collections
+        config (dictionary): configuration settings
+    Returns:
+        dictionary with added and updated collections, deleted concept ids, and the
+        watermark, or a dictionary with errors
+    """
+    return syncer.sync("collections", query, state_file, filters=filters, config=config)
+
+# document-it: {"from":"cmr.search.lookup.lookup_by_ids"}
+def lookup_by_ids(ids, filters = None, config: dict = None):
+    """
+    Fetch the collections of many concept ids, in chunks with a few downloading at once
+    Parameters:
+        ids (list): collection concept ids, repeats are only looked up once
+        filters (list): column filter lambdas
+        config (dictionary): configuration settings, lookup.batch sets how many
+            ids are sent in each request and lookup.workers how many at once
+    Returns:
+        Lookup which yields tuples of concept id and collection, in the order the
+        ids were given, and then has a list of the missing ids and any errors
+    """
+    return lookup.lookup_by_ids(ids, "collections", filters=filters, config=config)
+
+# document-it: {"from":"cmr.search.common.count"}
+def count(query = None, config: dict = None):
+    """
+    Find how many collections a search would return without downloading any
+    Parameters:
+        query (dictionary): CMR search parameters
+        config (dictionary): configuration settings, count.ttl remembers the
+            answer for that many seconds
+    Returns:
+        dictionary with hits and took, or a dictionary with errors
+    """
+    return scom.count("collections", query, config)
+
+# document-it: {"from":"cmr.search.common.count_many"}
+def count_many(queries, config: dict = None):
+    """
+    Count many collection searches at the same time
+    Parameters:
+        queries (list): dictionaries of CMR search parameters
+        config (dictionary): configuration settings, count.workers sets how
+            many are asked for at once
+    Returns:
+        list of count() results in the same order as the queries
+    """
+    return scom.count_many("collections", queries, config)
+
+# document-it: {"from":"cmr.search.common.search_by_page_async"}
+async def search_async(query = None, filters = None, limit = None, config: dict = None):
+    """
+    Search and return all records using the asyncio transport, use with await
+    """
+    page_state = scom.create_page_state(limit=limit)
+    found_items = await scom.search_by_page_async("collections",
+        query=query,
+        filters=filters,
+        page_state=page_state,
+        config=config)
+    return found_items
+
 def set_logging_to(level):
     """
     Set the logging level to the stated value. Any of the standard logging level
@@ -138,12 +271,16 @@ def help_text(contains: str = ""):
         open_api,
         help_text,
         search,
+        search_async,
         set_logging_to]
     filters = [all_fields,
         collection_core_fields,
         collection_ids_for_granules_fields,
         concept_id_fields,
         drop_fields,
+        keep_if,
         meta_fields,
+        provider_is,
+        temporal_overlaps,
         umm_fields]
     return scom.help_text(contains, functions, filters)
@@ -31,15 +31,56 @@ This function can handle any query parameter which is supported by the CMR.
         page_state - a page_state dictionary for current page
         config - configurations
 
+    search_by_page_async()
+        same as search_by_page() but a coroutine using the asyncio transport
+
+    search_by_page_generator()
+        same as search_by_page() but yields items while the next pages download
+
+    start_pages(), read_page()
+        same as search_by_page() but one page at a time, for callers which
+        handle each page before asking for the next
+
+    count()
+        base - CMR API end point directory
+        query - a dictionary of CMR parameters
+        config - configurations
+
+    count_many()
+        same as count() but for a list of queries counted at the same time
+
+    compile_filters()
+        filters - a list of result filter lambdas
+
+    iter_filters()
+        same as apply_filters() but filters items as they are asked for
+
+    keep_if()
+        test - lambda returning True for the items to keep
+        query - CMR parameters which find the same items
+
+    push_down()
+        query - a dictionary of CMR parameters
+        filters - a list of result filter lambdas
+
 More information can be found at:
 https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
 """
 
+# pylint: disable=C0302 # every way of paging shares the request helpers here
+
+import concurrent.futures
+import json
 import logging
 import math
+import queue
+import threading
+import time
 import webbrowser as web
 
+from cmr.util import aio
 from cmr.util import common
+from cmr.util import jsonstream
 import cmr.util.network as net
 
 # ******************************************************************************
@@ -79,6 +120,104 @@ def drop_fields(key):
     """Drop a key from a dictionary"""
     return lambda dict : common.drop_key_safely(dict, key)
 
+DROPPED = object()
+""" Returned by a compiled filter in place of an item which a predicate dropped """
+
+def keep_if(test, query: dict = None):
+    """
+    Make a predicate filter, which drops the items test returns False for
+    rather then changing them. When query holds CMR parameters which find the
+    same items, the search adds them to its query, so CMR leaves the items out
+    instead, unless the search already has one of those parameters.
+    Parameters:
+        test: lambda taking an item and returning True to keep it
+        query (dictionary): CMR parameters which do the same as test
+    Returns:
+        filter lambda
+    """
+    def predicate(item):
+        return test(item)
+    predicate.query = dict(query or {})
+    return predicate
+
+def _meta(item):
+    """The meta part of an item, or the item if it has already been reduced to it"""
+    return item.get('meta', item)
+
+def _time_ranges(item):
+    """Start and end text of each temporal extent of a granule or collection"""
+    umm = item.get('umm', item)
+    extents = umm.get('TemporalExtents', [])
+    if 'TemporalExtent' in umm:
+        extents = [umm['TemporalExtent']]
+    for extent in extents:
+        ranges = extent.get('RangeDateTimes', [])
+        if 'RangeDateTime' in extent:
+            ranges = [extent['RangeDateTime']]
+        for value in ranges:
+            yield value.get('BeginningDateTime'), value.get('EndingDateTime')
+        singles = extent.get('SingleDateTimes', [])
+        if 'SingleDateTime' in extent:
+            singles = [extent['SingleDateTime']]
+        for value in singles:
+            yield value, value
+
+def provider_is(provider: str):
+    """Predicate filter keeping items from one provider, sent to CMR as provider"""
+    return keep_if(lambda item: _meta(item).get('provider-id') == provider,
+        {'provider': provider})
+
+def temporal_overlaps(start: str = None, end: str = None):
+    """
+    Predicate filter keeping items with a temporal extent which overlaps the
+    range from start to end, either of which can be None for an open range.
+    Extents with no end are ongoing. Sent to CMR as temporal. With neither start
+    nor end there is nothing to test, so all_fields is returned instead.
+    """
+    if start is None and end is None:
+        return all_fields # CMR rejects a temporal of just ','
+    first = common.parse_time(start)
+    last = common.parse_time(end)
+
+    def test(item):
+        for begins, ends in _time_ranges(item):
+            begins = common.parse_time(begins)
+            ends = common.parse_time(ends)
+            if begins is None:
+                continue
+            if (last is None or begins <= last) and (first is None or ends is None
+                    or ends >= first):
+                return True
+        return False
+    return keep_if(test, {'temporal': f"{start or ''},{end or ''}"})
+
+def push_down(query: dict, filters):
+    """
+    Move the predicate filters which have a CMR equivalent into the query, so
+    CMR leaves out the items they would drop. A predicate is left to run
+    locally if the query already has one of its parameters.
+    Parameters:
+        query (dictionary): CMR parameters and their values
+        filters (list): list of or a single lambda function to apply to items
+    Returns:
+        tuple of the query with the pushed down parameters added and the
+        filters which are left
+    """
+    if filters is None:
+        return query, filters
+    local, pushed = [], {}
+    for function in [filters] if callable(filters) else filters:
+        wanted = getattr(function, 'query', None)
+        taken = set(query or {}).union(pushed)
+        if wanted and taken.isdisjoint(wanted):
+            logger.debug("Sending %s to CMR rather then filtering locally", wanted)
+            pushed.update(wanted)
+        else:
+            local.append(function)
+    if not pushed:
+        return query, filters
+    return dict(query or {}, **pushed), local
+
 # ******************************************************************************
 # internal functions
 
@@ -88,23 +227,105 @@ def _next_page_state(page_state, took):
     page_state['took'] = page_state['took'] + took
     return page_state
 
-def _continue_download(page_state):
+def _continue_download(page_state, hits = None):
     """
     Tests to see if enough items have been downloaded, as calculated after a
     download.
     Parameters:
-        hits: total number of records from search
         page_state: position in the download ; current page
             * page_size: number of downloads per page
             * page_num: current page downloaded
             * limit: max records to download, -1 means all
+        hits: total number of records from search, None if not known
     Returns:
         True if another page can be downloaded, False otherwise
     """
     limit = page_state['limit'] # user requested limit
-    items_downloaded = page_state['page_size']*page_state['page_num']
+    items_downloaded = page_state.get('downloaded',
+        page_state['page_size']*page_state['page_num'])
+    if hits is not None and items_downloaded >= hits:
+        return False # nothing more to be found
     return items_downloaded<limit
 
+PAGING_MODES = ('search-after', 'scroll', 'parallel')
+""" Ways pages after the first can be asked for, see _paging() """
+
+# document-it: {"key":"paging", "default":"search-after", "msg":"scroll or parallel"}
+def _paging(page_state: dict, config: dict):
+    """
+    Find how pages after the first are asked for. Searches which fit in one
+    page, 2000 items or less, need none of these unless the page size is being
+    adapted, see _adaptive().
+    Parameters:
+        page_state (dictionary): the current page to download
+        config (dictionary): configurations settings responds to:
+            * paging - search-after to send back the CMR-Search-After header
+              from the last page, scroll to use a CMR scroll session, or
+              parallel to ask for every page by page_num at the same time once
+              the first page has said how many hits there are
+    Returns:
+        'search-after', 'scroll', 'parallel', or None for a search with one page
+    """
+    if int(page_state['limit'])<=2000 and not _adaptive(config):
+        return None
+    paging = common.always(config).get('paging', 'search-after')
+    if paging not in PAGING_MODES:
+        raise ValueError(f"paging must be one of {', '.join(PAGING_MODES)}, not '{paging}'")
+    return paging
+
+# document-it: {"key":"page.target-time", "default":"None", "msg":"seconds each page should take"}
+# document-it: {"key":"page.target-bytes", "default":"None", "msg":"bytes each page should hold"}
+def _adaptive(config: dict):
+    """
+    True if the size of each page is picked from how long the last page took
+    and how large it was, which needs search-after paging
+    Parameters:
+        config (dictionary): configurations settings responds to:
+            * page.target-time - seconds each page should take to download
+            * page.target-bytes - decoded bytes each page should hold
+    """
+    config = common.always(config)
+    wanted = config.get('page.target-time') or config.get('page.target-bytes')
+    return bool(wanted) and config.get('paging', 'search-after') == 'search-after'
+
+# document-it: {"key":"page.first-size", "default":"100", "msg":"size of the first adapted page"}
+def _start_adaptive(page_state: dict, config: dict):
+    """Start an adapted search with a small page, till the real cost is known"""
+    if _adaptive(config) and 'downloaded' not in page_state:
+        page_state['downloaded'] = (page_state['page_num'] - 1) * page_state['page_size']
+        page_state['page_size'] = max(1, min(page_state['page_size'],
+            config.get('page.first-size', 100)))
+
+def _resize_page(page_state: dict, config: dict, seconds: float, size: int, items: int):
+    """
+    Pick the size of the next page, in proportion to how far the page just read
+    was from page.target-time and page.target-bytes, without growing more then
+    double or shrinking to less then a quarter at a time, and staying within
+    the 1 to 2000 items CMR allows
+    Parameters:
+        page_state (dictionary): the page just read
+        config (dictionary): configurations settings
+        seconds (float): time taken to read the page
+        size (int): decoded bytes in the page, 0 if not known
+        items (int): number of items CMR sent in the page, before any filters
+    """
+    page_size = page_state['page_size']
+    page_state['downloaded'] = page_state.get('downloaded', 0) + items
+    wanted = []
+    if config.get('page.target-time') and seconds > 0:
+        wanted.append(page_size * config['page.target-time'] / seconds)
+    if config.get('page.target-bytes') and size > 0:
+        wanted.append(page_size * config['page.target-bytes'] / size)
+    if not wanted:
+        return
+    next_size = max(page_size / 4, min(page_size * 2, *wanted))
+    remaining = page_state['limit'] - page_state['downloaded']
+    if remaining > 0:
+        next_size = min(next_size, remaining)
+    page_state['page_size'] = int(max(1, min(2000, next_size)))
+    logger.debug("Page of %d took %.2fs for %d bytes, next page is %d", page_size,
+        seconds, size, page_state['page_size'])
+
 # document-it: {"key":"Authorization", "default":"None", "msg":"also known as a cmr or EDL token"}
 # document-it: {"key":"X-Request-id", "default":"None"}
 # document-it: {"key":"Client-Id", "default":"python_cmr_lib"}
@@ -130,6 +351,7 @@ def _standard_headers_from_config(config: dict):
     return headers
 
 # document-it: {"from":".cmr_basic_url"}
+# document-it: {"from":"._paging"}
 def _cmr_query_url(base: str, query: dict, page_state: dict, config: dict = None):
     """
     build a collection or granule search URL to CMR
@@ -138,11 +360,15 @@ def _cmr_query_url(base: str, query: dict, page_state: dict, config: dict = None
         query: dictionary url parameters
         config: configurations, responds to:
             * env - sit, uat, ops, prod, production, or blank for production
+            * paging - search-after or scroll
     """
     if query is None:
         query = {}
-    if int(page_state['limit'])>2000:
+    paging = _paging(page_state, config)
+    if paging == 'scroll':
         query = common.conj(query, {'scroll': 'true'})
+    elif paging == 'parallel':
+        query = common.conj(query, {'page_num': page_state['page_num']})
     query = common.conj(query, {'page_size': page_state['page_size']})
     return cmr_basic_url(base, query, config)
 
@@ -164,12 +390,7 @@ def cmr_basic_url(base: str, query: dict = None, config: dict = None, endpoint:
     query = common.always(query)
     query = '' if len(query) < 1 else f'?{net.expand_query_to_parameters(query)}'
 
-    env = common.always(config).get('env', '')
-    if env is None:
-        env = ''
-    env = env.strip().lower()
-    if env not in ['sit', 'uat', 'localhost']:
-        env = ''
+    env = net.config_to_env(config)
 
     if endpoint is None:
         endpoint = 'search'
@@ -183,10 +404,26 @@ def cmr_basic_url(base: str, query: dict = None, config: dict = None, endpoint:
 
     return url
 
+def _search_config(page_state: dict, config: dict):
+    """
+    Mark a search as only reading from CMR, so identical searches sent at once
+    share a request, responses can be cached, and network errors retried. A
+    search which pages with a scroll moves the scroll along, so is not marked.
+    Each mark which is already in config, like coalesce set to False, is kept.
+    Returns:
+        config with coalesce, cacheable, and retry.idempotent set
+    """
+    if _paging(page_state, config) == 'scroll':
+        return config
+    return common.conj(config, {'coalesce': True, 'cacheable': True,
+        'retry.idempotent': True})
+
 # document-it: {"key":"accept", "default":"application/vnd.nasa.cmr.umm_results+json"}
 # document-it: {"from":"._standard_headers_from_config"}
 # document-it: {"from":"._cmr_query_url"}
-def _make_search_request(base: str, query: dict, page_state: dict, config: dict):
+# document-it: {"from":"cmr.util.network.post"}
+def _make_search_request(base: str, query: dict, page_state: dict, config: dict,
+        stream: bool = False):
     """
     Do the first half of the "search_by_page" function, by making the call to CMR.
     Build a request and issue it, returning a json object
@@ -196,9 +433,26 @@ def _make_search_request(base: str, query: dict, page_state: dict, config: dict)
         page_state (dictionary): the current page to download
         config (dictionary): configurations settings responds to:
             * accept - the format for the return defaults to UMM-JSON
+            * coalesce, cacheable, retry.idempotent - see _search_config()
+        stream (bool): return an ItemStream instead of reading the whole page
     Returns:
         JSON object with either data from CMR, or on error you get the error response
     """
+    url, headers = _search_request_parts(base, page_state, config)
+    config = _search_config(page_state, config)
+    if stream:
+        return net.post_stream(url, query, headers=headers, config=config)
+    obj_json = net.post(url, query, headers=headers, config=config)
+
+    return obj_json
+
+def _search_request_parts(base: str, page_state: dict, config: dict):
+    """
+    Build the URL and headers for one page of a search, shared by the
+    synchronous and asyncio versions of _make_search_request
+    Returns:
+        tuple of (url, headers)
+    """
     # Build headers
     headers = _standard_headers_from_config(config)
 
@@ -208,15 +462,106 @@ def _make_search_request(base: str, query: dict, page_state: dict, config: dict)
     if 'CMR-Scroll-Id' in page_state:
         logger.debug('Setting scroll id to %s.', page_state['CMR-Scroll-Id'])
         headers = common.conj(headers, {'CMR-Scroll-Id': page_state['CMR-Scroll-Id']})
+    elif 'CMR-Search-After' in page_state:
+        logger.debug('Setting search after to %s.', page_state['CMR-Search-After'])
+        headers = common.conj(headers, {'CMR-Search-After': page_state['CMR-Search-After']})
     accept = config.get('accept', 'application/vnd.nasa.cmr.umm_results+json')
     headers = common.conj(headers, {'Accept': accept})
 
-    # Build URL and make POST
+    # Build URL
     url = _cmr_query_url(base, None, page_state, config = config)
     logger.info(' - %s: %s', 'POST', url)
-    obj_json = net.post(url, query, headers=headers)
+    return url, headers
 
-    return obj_json
+async def _make_search_request_async(base: str, query: dict, page_state: dict,
+        config: dict):
+    """
+    Same as _make_search_request() but using the asyncio transport
+    Returns:
+        JSON object with either data from CMR, or on error you get the error response
+    """
+    url, headers = _search_request_parts(base, page_state, config)
+    return await aio.post(url, query, headers=headers,
+        config=_search_config(page_state, config))
+
+def _capture_paging(page_state: dict, obj_json: dict, config: dict):
+    """
+    Remember the scroll id or search after value returned by CMR for the next page
+    Returns:
+        False if CMR did not send the search after value needed for the next
+        page, asking without it would start over at the first page. If more
+        pages were wanted, incomplete is set in the page state.
+    """
+    http_headers = obj_json.get('http-headers', {})
+    paging = _paging(page_state, config)
+    if paging == 'scroll':
+        if 'CMR-Scroll-Id' in http_headers:
+            page_state['CMR-Scroll-Id'] = http_headers['CMR-Scroll-Id']
+    elif paging == 'search-after':
+        if 'CMR-Search-After' not in http_headers:
+            page_state.pop('CMR-Search-After', None)
+            if _continue_download(page_state, obj_json.get('hits')):
+                logger.warning("CMR did not send CMR-Search-After with page %d, "
+                    "the search is incomplete", page_state['page_num'])
+                page_state['incomplete'] = True
+            return False
+        page_state['CMR-Search-After'] = http_headers['CMR-Search-After']
+    return True
+
+def _read_stream(obj_json, filters):
+    """
+    Run the items of a streamed page through the filters one at a time as they
+    are parsed, so the unfiltered page is never held in memory
+    Parameters:
+        obj_json: response from _make_search_request()
+        filters (list): A list of lambda functions to reduce the number of columns
+    Returns:
+        tuple of the response without its items, or an error, the filtered
+        items, and the number of items read before filtering, the last two are
+        None if the response was not streamed
+    """
+    if not isinstance(obj_json, jsonstream.ItemStream):
+        return obj_json, None, None
+    with obj_json as stream:
+        try:
+            items = apply_filters(filters, stream)
+            if not isinstance(items, list):
+                items = list(items)
+        except ValueError as err:
+            return _error_object(0, "Could not parse response: " + str(err)), None, None
+    if stream.raw is not None:
+        return stream.raw, None, None
+    return stream.result(), items, stream.count
+
+def _start_deadline(page_state: dict, config: dict):
+    """Turn the deadline in config into a clock time the first time a search starts"""
+    if 'deadline' not in page_state and config.get('deadline') is not None:
+        page_state['deadline'] = time.monotonic() + config['deadline']
+
+def _time_left(page_state: dict):
+    """Seconds left before the search deadline, None if there is no deadline"""
+    if page_state.get('deadline') is None:
+        return None
+    return page_state['deadline'] - time.monotonic()
+
+def _page_config(page_state: dict, config: dict):
+    """
+    Give the request for a page whatever time is left before the deadline, or
+    the caller's own timeout.budget if that is shorter
+    """
+    remaining = _time_left(page_state)
+    if remaining is None:
+        return config
+    remaining = max(0, remaining)
+    budget = config.get('timeout.budget')
+    if budget is not None:
+        remaining = min(budget, remaining)
+    return dict(config, **{'timeout.budget': remaining})
+
+def _deadline_passed(page_state: dict):
+    """True if the search has a deadline and it has passed"""
+    remaining = _time_left(page_state)
+    return remaining is not None and remaining <= 0
 
 def _error_object(code, message):
     """
@@ -232,14 +577,33 @@ def _error_object(code, message):
 # ******************************************************************************
 # public search functions
 
-def create_page_state(page_size = 10, page_num = 1, took = 0, limit = 10):
+class SearchResults(list):
     """
-    Dictionary to hold page state for the recursive call
+    The items found by a search, along with a status saying how the search
+    ended: 'complete', 'max-time' if the processing time reported by CMR ran
+    over, 'deadline' if the wall clock deadline passed, 'incomplete' if CMR did
+    not say how to find the next page, or 'errors' if some of
+    the searches which make up a compound search failed, in which case errors
+    holds the error dictionary of each failed part. Searches which end early
+    hold the items found up to that point.
+    """
+    def __init__(self, items = (), status = 'complete', errors = None):
+        super().__init__(items)
+        self.status = status
+        self.errors = {} if errors is None else errors
+
+def create_page_state(page_size = 10, page_num = 1, took = 0, limit = 10,
+        max_limit = 100000):
+    """
+    Dictionary to hold page state for the paging loop
     Parameters:
         page_size: number of hits per request, can be 1-2000, default to 10
         page_num: current page, can be 1-50, default to 1
         took: positive number, seconds of total processing
-        limit: max records to return, 1-100000, default to 10
+        limit: max records to return, 1-max_limit, default to 10
+        max_limit: largest allowed limit, None for no cap. Searches which
+            stream items, rather then holding them all in a list, can go past
+            100000 when paging with search-after.
     """
 
     # Ensure bounds are followed
@@ -248,7 +612,7 @@ def create_page_state(page_size = 10, page_num = 1, took = 0, limit = 10):
     took = max(0, took)
     if limit is None:
         limit = 10
-    limit = max(0, min(limit, 100000))
+    limit = max(0, limit if max_limit is None else min(limit, max_limit))
 
     # Setup Page Size based on limit
     if limit<=2000:
@@ -271,6 +635,105 @@ def create_page_state(page_size = 10, page_num = 1, took = 0, limit = 10):
     return {'page_size': page_size, 'page_num': page_num, 'took':took, 'limit':limit}
 
 
+# document-it: {"from":"._make_search_request"}
+def search_hits(base, query = None, config: dict = None):
+    """
+    Ask CMR how many items a search would find without downloading any of them,
+    by asking for a page_size of 0
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values
+        config (dictionary): configurations settings, as for count()
+    Returns:
+        number of hits, or a dictionary with errors
+    """
+    found = count(base, query, config)
+    if 'errors' in found:
+        return found
+    return found['hits']
+
+_counts_lock = threading.Lock()
+_counts = {}
+
+def _count_key(base, query, config):
+    """The url, token, and query which decide the hits of a count"""
+    url, headers = _search_request_parts(base,
+        {'page_size': 0, 'page_num': 1, 'took': 0, 'limit': 0}, config)
+    return url, headers.get('Authorization'), json.dumps(query, sort_keys=True, default=str)
+
+def clear_counts():
+    """Forget all the counts remembered by count()"""
+    with _counts_lock:
+        _counts.clear()
+
+# document-it: {"key":"count.ttl", "default":"0", "msg":"seconds to remember counts, 0 for never"}
+# document-it: {"from":"._make_search_request"}
+def count(base, query = None, config: dict = None):
+    """
+    Ask CMR how many items a search would find without downloading any of them,
+    by asking for a page_size of 0. Counts can be remembered for a short time so
+    that planning a job does not ask CMR the same question over and over.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values
+        config (dictionary): configurations settings responds to:
+            * count.ttl - seconds to remember each count, 0 to always ask CMR
+    Returns:
+        dictionary with hits and took, or a dictionary with errors
+    """
+    config = common.always(config)
+    ttl = config.get('count.ttl', 0)
+    key = _count_key(base, query, config) if ttl > 0 else None
+    if key is not None:
+        with _counts_lock:
+            expires, found = _counts.get(key, (0, None))
+        if found is not None and time.monotonic() < expires:
+            return dict(found)
+
+    page_state = {'page_size': 0, 'page_num': 1, 'took': 0, 'limit': 0}
+    obj_json = _make_search_request(base, query, page_state, config)
+    if isinstance(obj_json, str):
+        return _error_object(0, "unknown response: " + obj_json)
+    if 'errors' in obj_json:
+        return obj_json
+    found = {'hits': obj_json['hits'], 'took': obj_json.get('took', 0)}
+    if key is not None:
+        with _counts_lock:
+            _counts[key] = (time.monotonic() + ttl, found)
+    return dict(found)
+
+# document-it: {"key":"count.workers", "default":"4", "msg":"counts asked for at once"}
+# document-it: {"from":".count"}
+def count_many(base, queries, config: dict = None):
+    """
+    Count many searches at the same time
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        queries (list): dictionaries of CMR parameters
+        config (dictionary): configurations settings responds to:
+            * count.workers - number of counts to ask CMR for at once
+            * count.ttl - seconds to remember each count
+    Returns:
+        list with the result of count() for each query, in the same order,
+        a query which failed has a dictionary with errors in its place
+    """
+    config = common.always(config)
+    queries = list(queries)
+    if not queries:
+        return []
+    def count_one(query):
+        try:
+            return count(base, query, config)
+        except Exception as err: # pylint: disable=W0718 # one query must not stop the rest
+            if net.is_timeout(err):
+                return net.timeout_error(err)
+            return _error_object(0, str(err))
+
+    workers = max(1, min(len(queries), config.get('count.workers', 4)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+            thread_name_prefix='cmr-count') as executor:
+        return list(executor.map(count_one, queries))
+
 # document-it: {"from": "._standard_headers_from_config"}
 # document-it: {"from":".cmr_basic_url"}
 def clear_scroll(scroll_id, config: dict = None):
@@ -292,7 +755,13 @@ def clear_scroll(scroll_id, config: dict = None):
         error dictionary if there was a problem, otherwise a JSON object of response headers
     """
     config = common.always(config)
+    url, data, headers = _clear_scroll_parts(scroll_id, config)
+    obj_json = net.post(url, data, headers=headers, config=config)
+    _log_clear_scroll_errors(obj_json)
+    return obj_json
 
+def _clear_scroll_parts(scroll_id, config: dict):
+    """Build the url, body, and headers for a clear-scroll request"""
     # Build headers
     headers = _standard_headers_from_config(config)
     headers = common.conj(headers, {'Content-Type': 'application/json'})
@@ -300,44 +769,216 @@ def clear_scroll(scroll_id, config: dict = None):
     url = cmr_basic_url('clear-scroll', None, config)
     data = '{"scroll_id": "' + str(scroll_id) + '"}'
     logger.info(" - %s: %s", 'POST', url)
-    obj_json = net.post(url, data, headers=headers)
+    return url, data, headers
+
+def _log_clear_scroll_errors(obj_json):
+    """Report any problems clearing a scroll, they are not fatal to the search"""
     if 'errors' in obj_json:
         errors = obj_json['errors']
         for err in errors:
             logger.warning(" Error while clearing scroll: %s", err)
+
+# document-it: {"from":".clear_scroll"}
+async def clear_scroll_async(scroll_id, config: dict = None):
+    """
+    Same as clear_scroll() but using the asyncio transport
+    Parameters:
+        scroll_id(string/number): CMR Scroll ID
+        config(dictionary) - used to make configurations changes
+    Returns:
+        error dictionary if there was a problem, otherwise a JSON object of response headers
+    """
+    config = common.always(config)
+    url, data, headers = _clear_scroll_parts(scroll_id, config)
+    obj_json = await aio.post(url, data, headers=headers, config=config)
+    _log_clear_scroll_errors(obj_json)
     return obj_json
 
+# pylint: disable=R0911 # one return for each length of list called directly
+def compile_filters(filters):
+    """
+    Turn a list of filters into one function which runs them all, in order, on
+    an item. This is done once per search instead of looking at the list again
+    for every item. Up to four filters are called directly from one function,
+    longer lists are split into groups of four. Predicate filters, made with
+    keep_if(), end the run for the items they drop.
+    Parameters:
+        filters(list): list of or a single lambda function to apply to items
+    Return:
+        a function taking and returning one item, or DROPPED for an item a
+        predicate dropped, or None if there are no filters
+    """
+    if filters is None or (callable(filters) and not hasattr(filters, 'query')):
+        return filters
+    functions = (filters,) if callable(filters) else tuple(filters)
+    if not functions:
+        return None
+    for index, function in enumerate(functions):
+        if hasattr(function, 'query'):
+            return _guard(compile_filters(functions[:index]), function,
+                compile_filters(functions[index+1:]))
+    if len(functions) == 1:
+        return functions[0]
+    if len(functions) == 2:
+        first, second = functions
+        return lambda item: second(first(item))
+    if len(functions) == 3:
+        first, second, third = functions
+        return lambda item: third(second(first(item)))
+    if len(functions) == 4:
+        first, second, third, fourth = functions
+        return lambda item: fourth(third(second(first(item))))
+    head, tail = compile_filters(functions[:4]), compile_filters(functions[4:])
+    return lambda item: tail(head(item))
+
+def _guard(before, predicate, after):
+    """
+    Compiled filters which stop at a predicate for the items it drops
+    Parameters:
+        before: compiled filters, without predicates, to run first, or None
+        predicate: predicate filter made with keep_if()
+        after: compiled filters to run on the items which are kept, or None
+    """
+    def guarded(item):
+        if before is not None:
+            item = before(item)
+        if not predicate(item):
+            return DROPPED
+        return item if after is None else after(item)
+    guarded.drops = True
+    return guarded
+
+def iter_filters(filters, items):
+    """
+    Lazy form of apply_filters(), each item is filtered only as it is asked for
+    Parameters:
+        filters(list): list of or a single lambda function to apply to items
+        items: any iterable of objects to be processed
+    Return:
+        an iterator of the filtered items
+    """
+    compiled = compile_filters(filters)
+    if compiled is None:
+        return iter(items)
+    if hasattr(compiled, 'drops'):
+        return (item for item in map(compiled, items) if item is not DROPPED)
+    return map(compiled, items)
+
 def apply_filters(filters, items):
     """
     Apply all filters to the collection of data, returning the results
     Parameters:
-        filters(list): list of or a single lambda function to apply to items
+        filters(list): list of or a single lambda function to apply to items,
+            or a function from compile_filters()
         items(list): list of objects to be processed
     Return:
         the results of the filters
     """
-    result = []
-
     if filters is None:
-        result = items
-    else:
-        for item in items:
-            if isinstance(filters, list):
-                filtered_item = item
-                for filter_function in filters:
-                    filtered_item = filter_function(filtered_item)
-                result.append(filtered_item)
-            else:
-                result.append(filters(item))
-    return result
+        return items
+    compiled = compile_filters(filters)
+    if compiled is None:
+        return list(items)
+    if hasattr(compiled, 'drops'):
+        return [item for item in map(compiled, items) if item is not DROPPED]
+    return list(map(compiled, items))
+
+def _fetch_page(base, query, filters, page_state, config):
+    """
+    Download one page of a search and run its items through the filters, and
+    when the page size is adapted, pick the size of the next page
+    Returns:
+        tuple of the response and the filtered items, or of an error
+        dictionary and None
+    """
+    started, before = time.monotonic(), net.thread_transfer_stats()
+    obj_json = _make_search_request(base, query, page_state,
+        _page_config(page_state, config),
+        stream=config.get('stream', False))
+    obj_json, page, read = _read_stream(obj_json, filters)
+    if _adaptive(config) and isinstance(obj_json, dict) and 'errors' not in obj_json:
+        size = net.thread_transfer_stats()['bytes-decoded'] - before['bytes-decoded']
+        if read is None:
+            read = len(obj_json.get('items', []))
+        _resize_page(page_state, config, time.monotonic() - started, size, read)
+    if isinstance(obj_json, str):
+        return _error_object(0, "unknown response: " + obj_json), None
+    if 'errors' in obj_json:
+        # transient errors have already been retried for just this page
+        logger.warning("Page %d could not be downloaded: %s", page_state['page_num'],
+            obj_json['errors'])
+        return obj_json, None
+    if page is None:
+        page = apply_filters(filters, obj_json['items'])
+    return obj_json, page
+
+# document-it: {"key":"paging.workers", "default":"4", "msg":"threads used by parallel paging"}
+# pylint: disable=R0913,R0914,R0917 # the search and where it is up to
+def _fetch_pages_parallel(base, query, filters, page_state, config, hits):
+    """
+    Download all the pages after the first at the same time, asking for each
+    one by page_num, and put the items back in page order. Pages are used up
+    to the first one which failed, was not started before the deadline, or
+    went over max-time.
+    Parameters:
+        page_state (dictionary): state for the second page
+        config (dictionary): configurations settings responds to:
+            * paging.workers - number of pages to download at once
+        hits (int): number of items found, as reported by the first page
+    Returns:
+        SearchResults of the remaining items, or a dictionary with errors
+    """
+    last_page = math.ceil(min(page_state['limit'], hits) / page_state['page_size'])
+
+    def fetch(page_num):
+        state = dict(page_state, page_num=page_num)
+        if _deadline_passed(state):
+            return None, None
+        return _fetch_page(base, query, filters, state, config)
+
+    items = SearchResults()
+    took = page_state['took']
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, config.get('paging.workers', 4)))
+    futures = [executor.submit(fetch, page_num)
+        for page_num in range(page_state['page_num'], last_page+1)]
+    try:
+        for page_num, future in enumerate(futures, page_state['page_num']):
+            obj_json, page = future.result()
+            if obj_json is None or (page is None and _deadline_passed(page_state)):
+                logger.warning("Search deadline passed before page %d", page_num)
+                items.status = 'deadline'
+                break
+            if page is None:
+                return obj_json
+            items.extend(page)
+            took = took + obj_json['took']
+            if page_num < last_page and took > config.get('max-time', 300000):
+                logger.warning("max search time exceeded")
+                items.status = 'max-time'
+                break
+    finally:
+        # pages not yet started are not needed, the rest finish on their own
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    return items
 
 # document-it: {"key":"max-time", "default": "300000"}
+# document-it: {"key":"deadline", "default": "None", "msg":"seconds for the whole search"}
+# document-it: {"key":"stream", "default": "False", "msg":"parse items as they are downloaded"}
 # document-it: {"from":"._make_search_request"}
+# document-it: {"from":"._paging"}
+# document-it: {"from":"._adaptive"}
+# document-it: {"from":"._start_adaptive"}
+# document-it: {"from":"._fetch_pages_parallel"}
+# pylint: disable=R0911,R0912,R0914 # every way a page can end the search is handled here
 def search_by_page(base, query = None, filters = None, page_state = None, config: dict = None):
     """
-    Recursive function to download all the pages of data. Note, this function
-    will only run for 5 minutes and then will refuse to pull more pages
-    returning what was found in that amount of time.
+    Download all the pages of data, one page after another, collecting the
+    items into one list. Note, this function will only run for 5 minutes and
+    then will refuse to pull more pages returning what was found in that amount
+    of time.
     Parameters:
         query (dictionary): CMR parameters and their values
         filters (list): A list of lambda functions to reduce the number of columns
@@ -345,101 +986,353 @@ def search_by_page(base, query = None, filters = None, page_state = None, config
         config (dictionary): configurations settings responds to:
             * accept - the format for the return defaults to UMM-JSON
             * max-time - total processing time allowed for all calls
-    return collected items
+            * deadline - wall clock seconds allowed for all pages, each page
+              request is given the time which is left
+            * stream - filter each item as it is parsed from the network
+              rather then after the whole page has been read
+            * paging - how pages after the first are found, see _paging()
+            * paging.workers - pages downloaded at once when paging is parallel
+            * page.target-time, page.target-bytes - resize each page to take
+              about this long or hold about this much, see _resize_page()
+    return collected items as SearchResults, or a dictionary with errors
     """
     config = common.always(config)
+    query, filters = push_down(query, filters)
+    filters = compile_filters(filters)
     if page_state is None:
         page_state = create_page_state()  # must be the first page
+    start_pages(page_state, config)
+    if page_state['page_num'] > 1 and _deadline_passed(page_state):
+        logger.warning("Search deadline passed before page %d", page_state['page_num'])
+        return SearchResults([], 'deadline')
 
-    obj_json = _make_search_request(base, query, page_state, config)
+    items = SearchResults()
+    hits, took = 0, 0
+    while True:
+        obj_json, page = _fetch_page(base, query, filters, page_state, config)
+        if page is None:
+            if page_state['page_num'] > 1 and _deadline_passed(page_state):
+                # keep what the earlier pages found
+                items.status = 'deadline'
+                break
+            return obj_json
 
-    if isinstance(obj_json, str):
-        return _error_object(0, "unknown response: " + obj_json)
-    if 'errors' in obj_json:
-        return obj_json
-
-    resp_stats = {'hits': obj_json['hits'], 'took': obj_json['took']}
-    items = obj_json['items']
-    if 'http-headers' in obj_json:
-        http_headers = obj_json['http-headers']
-        if 'CMR-Scroll-Id' in http_headers and page_state['limit']>2000:
-            page_state['CMR-Scroll-Id'] = http_headers['CMR-Scroll-Id']
-
-    items = apply_filters(filters, items)
-    if _continue_download(page_state):
-        accumulated_took_time = page_state['took'] + resp_stats['took']
-        max_allowed_time = config.get('max-time', 300000)
-        if  accumulated_took_time > max_allowed_time:
+        hits, took = obj_json['hits'], obj_json['took']
+        more = _capture_paging(page_state, obj_json, config)
+        items.extend(page)
+        if not (more and _continue_download(page_state, hits)):
+            if page_state.get('incomplete'):
+                items.status = 'incomplete'
+            if 'CMR-Scroll-Id' in page_state and page_state['limit']>2000:
+                scroll_ret = clear_scroll(page_state['CMR-Scroll-Id'], config)
+                if 'errors' in scroll_ret:
+                    for err in scroll_ret['errors']:
+                        logger.warning('Error processing scroll: %s', err)
+            break
+        if page_state['took'] + took > config.get('max-time', 300000):
             # Do not allow searches to go on forever, put an end to this and
             # return what has been found so far, but leave a log message
             logger.warning("max search time exceeded")
-            return items[:page_state['limit']]
-        next_page_state = _next_page_state(page_state, resp_stats['took'])
-        recursive_items = search_by_page(base,
-            query=query,
-            filters=filters,
-            page_state=next_page_state,
-            config=config)
-        items = items + recursive_items
-    else:
-        if 'CMR-Scroll-Id' in page_state and page_state['limit']>2000:
-            scroll_ret = clear_scroll(page_state['CMR-Scroll-Id'], config)
-            if 'errors' in scroll_ret:
-                for err in scroll_ret['errors']:
-                    logger.warning('Error processing scroll: %s', err)
+            items.status = 'max-time'
+            break
+        page_state = _next_page_state(page_state, took)
+        if _deadline_passed(page_state):
+            logger.warning("Search deadline passed before page %d", page_state['page_num'])
+            items.status = 'deadline'
+            break
+        if _paging(page_state, config) == 'parallel':
+            rest = _fetch_pages_parallel(base, query, filters, page_state, config, hits)
+            if not isinstance(rest, SearchResults):
+                return rest
+            items.extend(rest)
+            items.status = rest.status
+            break
     logger.info("Total records downloaded was %d of %d which took %dms.",
-        len(items),
-        resp_stats['hits'],
-        resp_stats['took'])
-    return items[:page_state['limit']]
+        len(items), hits, took)
+    # trim in place, a slice would copy every item found
+    del items[page_state['limit']:]
+    return items
+
+# document-it: {"from":"._start_adaptive"}
+def start_pages(page_state: dict, config: dict = None):
+    """
+    Ready a page state to be stepped through with read_page(), for callers
+    which do something with each page before asking for the next one. The
+    deadline in config starts now, and adapted pages start small.
+    Parameters:
+        page_state (dictionary): the first page to download
+        config (dictionary): configurations settings, see search_by_page()
+    Returns:
+        the page state, changed in place
+    """
+    config = common.always(config)
+    _start_deadline(page_state, config)
+    _start_adaptive(page_state, config)
+    return page_state
 
+def deadline_passed(page_state: dict):
+    """True if the search of a page state has a deadline and it has passed"""
+    return _deadline_passed(page_state)
+
+# document-it: {"from":"._make_search_request"}
+def read_page(base, query, filters, page_state: dict, config: dict = None):
+    """
+    Download the page a page state is on and move the page state on to the
+    next page, if there is one to download
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values
+        filters: a filter lambda, ideally from compile_filters()
+        page_state (dictionary): from start_pages(), changed in place
+        config (dictionary): configurations settings, see search_by_page()
+    Returns:
+        tuple of the response, the filtered items, and True if there is another
+        page, or of a dictionary with errors, None, and False. If CMR did not
+        say how to find a page which was wanted, incomplete is set in the page
+        state.
+    """
+    config = common.always(config)
+    obj_json, page = _fetch_page(base, query, filters, page_state, config)
+    if page is None:
+        return obj_json, None, False
+    more = _capture_paging(page_state, obj_json, config) \
+        and _continue_download(page_state, obj_json['hits'])
+    if more:
+        _next_page_state(page_state, obj_json['took'])
+    return obj_json, page, more
+
+# pylint: disable=R0903 # read through its queue, not methods
+class _Prefetch():
+    """
+    Downloads the pages of a search on a background thread, ahead of the reader,
+    into a queue which holds at most a set number of pages. When the queue is
+    full the thread waits, so a slow reader is never more then that many pages
+    behind the network.
+    """
+    # pylint: disable=R0913,R0917 # the search and how far ahead to read
+    def __init__(self, base, query, filters, page_state, config, size):
+        self.search = (base, query, filters)
+        self.config = config
+        self.pages = queue.Queue(maxsize=size)
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._produce, args=(page_state,),
+            name='cmr-prefetch', daemon=True)
+
+    def _offer(self, entry):
+        """Wait for room in the queue, giving up if the reader has gone away"""
+        while not self.stop.is_set():
+            try:
+                self.pages.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self, page_state):
+        """Download pages till the search is done, fails, or the reader stops"""
+        base, query, filters = self.search
+        try:
+            while not self.stop.is_set():
+                obj_json, page = _fetch_page(base, query, filters, page_state, self.config)
+                if page is None:
+                    self._offer(('errors', obj_json.get('errors', [obj_json])))
+                    return
+                more = _capture_paging(page_state, obj_json, self.config)
+                if not self._offer(('items', page)):
+                    return
+                if not (more and _continue_download(page_state, obj_json['hits'])):
+                    self._offer(('done', None))
+                    return
+                page_state = _next_page_state(page_state, obj_json['took'])
+        except Exception as err: # pylint: disable=W0718 # raised again by the reader
+            self._offer(('raise', err))
+        finally:
+            if 'CMR-Scroll-Id' in page_state and page_state['limit']>2000:
+                clear_scroll(page_state['CMR-Scroll-Id'], self.config)
+
+    def close(self):
+        """Tell the thread to stop, a page being downloaded is finished first"""
+        self.stop.set()
+
+# document-it: {"key":"prefetch", "default":"2", "msg":"pages downloaded ahead of the reader"}
+# document-it: {"key":"deadline", "default": "None", "msg":"seconds for the whole search"}
+# document-it: {"key":"stream", "default": "False", "msg":"parse items as they are downloaded"}
 # document-it: {"from":"._make_search_request"}
+# document-it: {"from":"._paging"}
+# document-it: {"from":"._adaptive"}
+# document-it: {"from":"._start_adaptive"}
+def search_by_page_generator(base, query = None, filters = None, page_state = None,
+        config: dict = None):
+    """
+    A generator which yields one item at a time while a background thread
+    downloads the pages which come next, so work done on each item overlaps
+    with waiting on CMR. Only a few pages are read ahead of the caller, so
+    memory stays flat no matter how many items are found. Errors go to the
+    logs and end the iteration. Stopping early, with break or close(), stops
+    the downloads.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values
+        filters (list): A list of lambda functions to reduce the number of columns
+        page_state (dictionary): the current page to download
+        config (dictionary): configurations settings responds to:
+            * prefetch - most pages to hold which have not been read yet
+            * deadline - wall clock seconds allowed for all pages
+            * stream - filter each item as it is parsed from the network
+            * paging - how pages after the first are found, see _paging(),
+              parallel is read as search-after as pages are already read ahead
+            * page.target-time, page.target-bytes - resize each page, see
+              _resize_page()
+    """
+    config = common.always(config)
+    query, filters = push_down(query, filters)
+    filters = compile_filters(filters)
+    if page_state is None:
+        page_state = create_page_state()  # must be the first page
+    _start_deadline(page_state, config)
+    if _paging(page_state, config) == 'parallel':
+        config = dict(config, paging='search-after')
+    _start_adaptive(page_state, config)
+
+    prefetch = _Prefetch(base, query, filters, page_state, config,
+        max(1, config.get('prefetch', 2)))
+    prefetch.thread.start()
+    yielded = 0
+    try:
+        while True:
+            kind, value = prefetch.pages.get()
+            if kind == 'items':
+                for item in value:
+                    if yielded >= page_state['limit']:
+                        return
+                    yielded = yielded + 1
+                    yield item
+            elif kind == 'errors':
+                for err in value:
+                    logger.error("Error in generator: %s.", str(err))
+                return
+            elif kind == 'raise':
+                raise value
+            else:
+                return
+    finally:
+        prefetch.close()
+
+# document-it: {"from":".search_by_page_generator"}
 def experimental_search_by_page_generator(base, query = None, filters = None,
         page_state = None, config: dict = None):
     """
-    WARNING: This is an experimental function, do not use in an operational
-    system, this function will go away.
-
-    This function performs searches and returns data as a list generator. Errors
-    will go mostly to logs.
+    Deprecated, use search_by_page_generator() which this now calls.
     """
+    if page_state is None or page_state['page_num'] == 1:
+        logger.info('experimental_search_by_page_generator is now search_by_page_generator')
+    yield from search_by_page_generator(base, query=query, filters=filters,
+        page_state=page_state, config=config)
 
+# document-it: {"key":"max-time", "default": "300000"}
+# document-it: {"key":"deadline", "default": "None", "msg":"seconds for the whole search"}
+# document-it: {"from":"._make_search_request"}
+async def search_by_page_async(base, query = None, filters = None, page_state = None,
+        config: dict = None):
+    """
+    Download all the pages of a search using the asyncio transport, many of
+    these searches can be run at once from one event loop with asyncio.gather().
+    Returns the same results as search_by_page().
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values
+        filters (list): A list of lambda functions to reduce the number of columns
+        page_state (dictionary): the current page to download
+        config (dictionary): configurations settings responds to:
+            * accept - the format for the return defaults to UMM-JSON
+            * max-time - total processing time allowed for all calls
+            * deadline - wall clock seconds allowed for all pages
+    Returns:
+        SearchResults or a dictionary with errors
+    """
+    config = common.always(config)
+    query, filters = push_down(query, filters)
+    filters = compile_filters(filters)
     if page_state is None:
         page_state = create_page_state()  # must be the first page
-    if config is None:
-        config = {}
+    _start_deadline(page_state, config)
 
-    obj_json = _make_search_request(base, query, page_state, config)
+    items = []
+    status = 'complete'
+    while True:
+        obj_json = await _make_search_request_async(base, query, page_state,
+            _page_config(page_state, config))
+        if isinstance(obj_json, str):
+            return _error_object(0, "unknown response: " + obj_json)
+        if 'errors' in obj_json:
+            logger.warning("Page %d could not be downloaded: %s", page_state['page_num'],
+                obj_json['errors'])
+            if page_state['page_num'] > 1 and _deadline_passed(page_state):
+                status = 'deadline'
+                break
+            return obj_json
 
-    if page_state['page_num'] == 1:
-        logger.info('experimental_search_by_page_generator is not a supported function')
+        took = obj_json['took']
+        more = _capture_paging(page_state, obj_json, config)
+        items.extend(apply_filters(filters, obj_json['items']))
+        if not (more and _continue_download(page_state, obj_json['hits'])):
+            if page_state.get('incomplete'):
+                status = 'incomplete'
+            if 'CMR-Scroll-Id' in page_state and page_state['limit']>2000:
+                await clear_scroll_async(page_state['CMR-Scroll-Id'], config)
+            break
+        if page_state['took'] + took > config.get('max-time', 300000):
+            logger.warning("max search time exceeded")
+            status = 'max-time'
+            break
+        page_state = _next_page_state(page_state, took)
+        if _deadline_passed(page_state):
+            logger.warning("Search deadline passed before page %d", page_state['page_num'])
+            status = 'deadline'
+            break
+    logger.info("Total records downloaded was %d of %s.", len(items), obj_json.get('hits'))
+    return SearchResults(items[:page_state['limit']], status)
 
-    if 'http-headers' in obj_json:
-        http_headers = obj_json['http-headers']
-        if 'CMR-Scroll-Id' in http_headers and page_state['limit']>2000:
-            page_state['CMR-Scroll-Id'] = http_headers['CMR-Scroll-Id']
+# document-it: {"from":"._make_search_request"}
+async def search_by_page_async_generator(base, query = None, filters = None,
+        page_state = None, config: dict = None):
+    """
+    An async generator which yields one item at a time, fetching pages with the
+    asyncio transport as they are needed. Errors go to the logs and end the
+    iteration.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values
+        filters (list): A list of lambda functions to reduce the number of columns
+        page_state (dictionary): the current page to download
+        config (dictionary): configurations settings
+    """
+    config = common.always(config)
+    query, filters = push_down(query, filters)
+    filters = compile_filters(filters)
+    if page_state is None:
+        page_state = create_page_state()  # must be the first page
 
-    if 'errors' in obj_json:
-        errors = (obj_json['errors'])
-        for err in errors:
-            logger.error("Error in generator: %s.", str(err))
-    else:
-        items = obj_json['items']
-        items = apply_filters(filters, items)
-        for i in items:
-            yield i
-
-    if _continue_download(page_state):
-        next_page_state = _next_page_state(page_state, 0)
-        recursive_items = experimental_search_by_page_generator(base,
-            query=query,
-            filters=filters,
-            page_state=next_page_state,
-            config=config)
-        yield from recursive_items
-    else:
-        if 'CMR-Scroll-Id' in page_state and page_state['limit']>2000:
-            clear_scroll(page_state['CMR-Scroll-Id'], config)
+    yielded = 0
+    while True:
+        obj_json = await _make_search_request_async(base, query, page_state, config)
+        if isinstance(obj_json, str) or 'errors' in obj_json:
+            errors = [obj_json] if isinstance(obj_json, str) else obj_json['errors']
+            for err in errors:
+                logger.error("Error in generator: %s.", str(err))
+            return
+
+        more = _capture_paging(page_state, obj_json, config)
+        for item in apply_filters(filters, obj_json['items']):
+            if yielded >= page_state['limit']:
+                break
+            yielded = yielded + 1
+            yield item
+        if not (more and _continue_download(page_state, obj_json['hits'])):
+            if 'CMR-Scroll-Id' in page_state and page_state['limit']>2000:
+                await clear_scroll_async(page_state['CMR-Scroll-Id'], config)
+            return
+        page_state = _next_page_state(page_state, obj_json['took'])
 
 def open_api(section):
     """Ask python to open up the API in a new browser window - unsupported!"""
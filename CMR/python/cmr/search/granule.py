@@ -30,13 +30,58 @@ This function can handle any query parameter which is supported by the CMR.
         limit - int limiting the number of records returned
         config - configurations
 
+    harvest()
+        query - a dictionary of CMR parameters
+        checkpoint - path of the checkpoint file to resume from
+        output - path of the JSON lines file to write to
+        filters - a list of result filter lambdas
+        limit - int limiting the number of records returned
+        config - configurations
+
+    sync()
+        query - a dictionary of CMR parameters
+        state_file - path of the file which remembers the last sync
+        filters - a list of result filter lambdas
+        config - configurations
+
+    lookup_by_ids()
+        ids - a list of concept ids
+        filters - a list of result filter lambdas
+        config - configurations
+
+    count()
+        query - a dictionary of CMR parameters
+        config - configurations
+
+    count_many()
+        same as count() but for a list of queries counted at the same time
+
+    search_by_temporal()
+        query - a dictionary of CMR parameters with a temporal range
+        filters - a list of result filter lambdas
+        target - most granules to download in one search
+        config - configurations
+
+    search_by_spatial()
+        same as search_by_temporal() but for a bounding_box or polygon
+
+    search_generator()
+        same as search() but yields granules while the next pages download
+
 More information can be found at:
 https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
 """
 
 # pylint: disable=duplicate-code
 
+import concurrent.futures
+
+from cmr.util import common
 import cmr.search.common as scom
+from cmr.search import harvest as harvester
+from cmr.search import lookup
+from cmr.search import partition
+from cmr.search import sync as syncer
 
 # ******************************************************************************
 # filter function lambdas
@@ -60,6 +105,19 @@ def drop_fields(key):
     """Drop a key from a dictionary"""
     return scom.drop_fields(key)
 
+# ******************************************************************************
+# predicate filter lambdas, which drop items
+
+def keep_if(test, query: dict = None):
+    """Drop the items test returns False for, query does the same in CMR"""
+    return scom.keep_if(test, query)
+def provider_is(provider: str):
+    """Keep only the items from a provider"""
+    return scom.provider_is(provider)
+def temporal_overlaps(start: str = None, end: str = None):
+    """Keep only the items with a temporal extent overlapping start to end"""
+    return scom.temporal_overlaps(start, end)
+
 def granule_core_fields(item):
     """Extract only fields that are used to identify a record"""
     record = {}
@@ -116,30 +174,154 @@ def _collection_sample_limits(limits):
 
     return limit_obj
 
-def _collection_samples(collection_query, limit, config):
+BATCH_SIZE = 100
+""" Most collection concept ids sent in one batched sample request """
+
+BATCH_LIMIT = 20
+""" Largest granule limit for which the auto sample strategy uses batches """
+
+def _collection_samples(collection_query, limit, config, references = None):
     """
     First step in the granule samples function is to run a collection query. Do
     not require the loading of the search.py file, call the already loaded common
-    file.
+    file. When a references dictionary is given, it is filled in with the short
+    name and version, and entry title, of each collection mapped to its concept
+    id so that granules can be matched back to the collection they are from.
     """
+    def fields(obj):
+        umm = obj.get('umm', {})
+        return {'concept-id': obj.get('meta', {}).get('concept-id'),
+            'reference': (umm.get('ShortName'), umm.get('Version')),
+            'title': umm.get('EntryTitle')}
     found_collections = scom.search_by_page("collections",
         query=collection_query,
-        filters = lambda obj : obj.get('meta', {}).get('concept-id'),
+        filters=fields,
         page_state=scom.create_page_state(limit=limit),
         config=config)
-    return found_collections[:limit]
-
-def _granule_samples(found_collections, filters, limit, config):
+    if isinstance(found_collections, dict):
+        return found_collections
+    if references is not None:
+        for item in found_collections[:limit]:
+            references[item['reference']] = item['concept-id']
+            references[item['title']] = item['concept-id']
+    return [item['concept-id'] for item in found_collections[:limit]]
+
+def _each_sample(found_collections, filters, limit, config):
+    """
+    Search for the granules of each collection on its own, on at most
+    sample.workers threads at once
+    Returns:
+        list of collection concept id and SearchResults, or dictionary with
+        errors, pairs in the order of the collections
+    """
+    def sample(concept):
+        try:
+            return search({"concept_id": concept}, filters=filters, limit=limit,
+                config=config)
+        except Exception as err: # pylint: disable=W0718 # one collection must not stop the rest
+            return {'errors': [str(err)], 'code': 0, 'reason': str(err)}
+
+    workers = max(1, min(len(found_collections), config.get('sample.workers', 4)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+            thread_name_prefix='cmr-sample') as executor:
+        return list(zip(found_collections, executor.map(sample, found_collections)))
+
+def _owner(item, references):
+    """Concept id of the collection a granule is from, None if it is not known"""
+    concept = item.get('meta', {}).get('collection-concept-id')
+    if concept is not None:
+        return concept
+    collection = item.get('umm', {}).get('CollectionReference', {})
+    if 'EntryTitle' in collection:
+        return references.get(collection['EntryTitle'])
+    return references.get((collection.get('ShortName'), collection.get('Version')))
+
+def _batch_sample(chunk, references, limit, config):
+    """
+    Search for the granules of a chunk of collections with one request and split
+    them up by the collection they are from
+    Returns:
+        dictionary of collection concept id to unfiltered granules, collections
+        which the one page could not fill are left out, as are all of them if
+        the search failed or a granule could not be matched to its collection
+    """
+    page_size = min(2000, len(chunk) * limit * 2)
+    try:
+        granules = scom.search_by_page("granules",
+            query={'collection_concept_id': chunk},
+            page_state=scom.create_page_state(page_size=page_size, limit=page_size),
+            config=config)
+    except Exception as err: # pylint: disable=W0718 # each collection is tried again alone
+        granules = {'errors': [str(err)]}
+    if isinstance(granules, dict):
+        scom.logger.info("Batched sample failed, sampling each collection: %s",
+            granules.get('errors'))
+        return {}
+    found = {concept: [] for concept in chunk}
+    for item in granules:
+        owner = _owner(item, references)
+        if owner not in found:
+            scom.logger.info("Granule %s is not from a known collection, sampling "
+                "each collection", item.get('meta', {}).get('concept-id'))
+            return {}
+        if len(found[owner]) < limit:
+            found[owner].append(item)
+    if len(granules) < page_size:
+        # every granule of the chunk was returned, short collections are complete
+        return found
+    return {concept: items for concept, items in found.items() if len(items) >= limit}
+
+# document-it: {"key":"sample.workers", "default":"4", "msg":"collections sampled at once"}
+def _granule_samples(found_collections, filters, limit, config, references = None):
     """
     Second step in the granule samples function is to run a granule query based
-    on the results of the _collection_samples() search.
+    on the results of the _collection_samples() search. The collections are
+    searched at the same time, on at most sample.workers threads, and their
+    granules are returned in the order of the collections. A collection which
+    could not be searched is left out and its error is kept in the errors of
+    the results. When references are given, the collections are first searched
+    in sorted batches of collection_concept_id, see _batch_sample(), and only
+    the ones the batches could not fill are searched on their own.
     """
-    found_granules = []
+    config = common.always(config)
+    sampled = {}
+    if references is not None:
+        ordered = sorted(set(found_collections))
+        for start in range(0, len(ordered), _batch_size(limit)):
+            chunk = ordered[start:start + _batch_size(limit)]
+            for concept, items in _batch_sample(chunk, references, limit, config).items():
+                sampled[concept] = apply_filters(filters, items)
+    missing = [concept for concept in found_collections if concept not in sampled]
+    sampled.update(_each_sample(missing, filters, limit, config) if missing else [])
+
+    found_granules = scom.SearchResults()
     for concept in found_collections:
-        query = {"concept_id": concept}
-        granules = search(query, filters=filters, limit=limit, config=config)
+        granules = sampled[concept]
+        if isinstance(granules, dict):
+            scom.logger.warning("Could not sample granules from %s: %s", concept,
+                granules.get('errors'))
+            found_granules.errors[concept] = granules
+            found_granules.status = 'errors'
+            continue
         found_granules.extend(granules)
-    return found_granules[:len(found_collections)*limit]
+    del found_granules[len(found_collections)*limit:]
+    return found_granules
+
+def _batch_size(limit):
+    """Number of collections to sample in one request, leaving room for uneven ones"""
+    return max(1, min(BATCH_SIZE, 2000 // (limit * 2)))
+
+# document-it: {"key":"sample.strategy", "default":"auto", "msg":"auto, batch, or each"}
+def _batched(found_collections, limit, config):
+    """
+    Should collections be sampled in batches, the auto strategy does so when
+    there is more then one collection and the granule limit is at most
+    BATCH_LIMIT
+    """
+    strategy = common.always(config).get('sample.strategy', 'auto')
+    if strategy == 'auto':
+        return len(found_collections) > 1 and limit <= BATCH_LIMIT
+    return strategy == 'batch'
 
 # ******************************************************************************
 # public search functions
@@ -175,6 +357,160 @@ def search(query, filters = None, limit = None, config: dict = None):
         config=config)
     return found_items
 
+# document-it: {"from":"cmr.search.harvest.harvest"}
+# pylint: disable=R0913,R0917 # a search and where to keep it
+def harvest(query, checkpoint, output, filters = None, limit = None, config: dict = None):
+    """
+    Download every granule found by a search into a file of JSON lines, keeping
+    a checkpoint so that the harvest can be run again to carry on after it is
+    stopped or fails
+    Parameters:
+        query (dictionary): CMR search parameters
+        checkpoint (string): path of the checkpoint file
+        output (string): path of the file granules are appended to
+        filters (list): column filter lambdas
+        limit (int): most granules to write, None for all of them
+        config (dictionary): configuration settings
+    Returns:
+        dictionary with the status and number of granules written, or errors
+    """
+    return harvester.harvest("granules", query, checkpoint, output, filters=filters,
+        limit=limit, config=config)
+
+# document-it: {"from":"cmr.search.sync.sync"}
+def sync(query, state_file, filters = None, config: dict = None):
+    """
+    Find the granules which were added, updated, or deleted since the last time
+    this search was synced with the same state file, only asking CMR for the
+    granules revised since then
+    Parameters:
+        query (dictionary): CMR search parameters
+        state_file (string): path of the file which remembers each search
+        filters (list): column filter lambdas for the added and updated granules
+        config (dictionary): configuration settings
+    Returns:
+        dictionary with added and updated granules, deleted concept ids, and the
+        watermark, or a dictionary with errors
+    """
+    return syncer.sync("granules", query, state_file, filters=filters, config=config)
+
+# document-it: {"from":"cmr.search.lookup.lookup_by_ids"}
+def lookup_by_ids(ids, filters = None, config: dict = None):
+    """
+    Fetch the granules of many concept ids, in chunks with a few downloading at once
+    Parameters:
+        ids (list): granule concept ids, repeats are only looked up once
+        filters (list): column filter lambdas
+        config (dictionary): configuration settings, lookup.batch sets how many
+            ids are sent in each request and lookup.workers how many at once
+    Returns:
+        Lookup which yields tuples of concept id and granule, in the order the
+        ids were given, and then has a list of the missing ids and any errors
+    """
+    return lookup.lookup_by_ids(ids, "granules", filters=filters, config=config)
+
+# document-it: {"from":"cmr.search.common.count"}
+def count(query = None, config: dict = None):
+    """
+    Find how many granules a search would return without downloading any
+    Parameters:
+        query (dictionary): CMR search parameters
+        config (dictionary): configuration settings, count.ttl remembers the
+            answer for that many seconds
+    Returns:
+        dictionary with hits and took, or a dictionary with errors
+    """
+    return scom.count("granules", query, config)
+
+# document-it: {"from":"cmr.search.common.count_many"}
+def count_many(queries, config: dict = None):
+    """
+    Count many granule searches at the same time
+    Parameters:
+        queries (list): dictionaries of CMR search parameters
+        config (dictionary): configuration settings, count.workers sets how
+            many are asked for at once
+    Returns:
+        list of count() results in the same order as the queries
+    """
+    return scom.count_many("granules", queries, config)
+
+# document-it: {"from":"cmr.search.common.search_by_page_async"}
+async def search_async(query, filters = None, limit = None, config: dict = None):
+    """
+    Search and return all records using the asyncio transport, use with await
+    Parameters:
+        query (dictionary): required, CMR search parameters
+        filters (list): column filter lambdas
+        limit (int): number from 1 to 100000
+        config (dictionary): configuration settings
+    Returns:
+        JSON results from CMR
+    """
+    page_state = scom.create_page_state(limit=limit)
+    found_items = await scom.search_by_page_async("granules",
+        query=query,
+        filters=filters,
+        page_state=page_state,
+        config=config)
+    return found_items
+
+# document-it: {"from":"cmr.search.partition.search_by_temporal"}
+def search_by_temporal(query, filters = None, target = 10000, config: dict = None):
+    """
+    Search for granules by cutting the temporal range of the query into windows
+    of no more then target granules each, downloading the windows at the same
+    time. Granules found in more then one window are returned once.
+    Parameters:
+        query (dictionary): required, CMR search parameters with one temporal
+            range, like {'temporal': '2020-01-01T00:00:00Z,2021-01-01T00:00:00Z'}
+        filters (list): column filter lambdas
+        target (int): most granules to download in one search
+        config (dictionary): configuration settings
+    Returns:
+        JSON results from CMR
+    """
+    return partition.search_by_temporal("granules", query, filters=filters,
+        target=target, config=config)
+
+# document-it: {"from":"cmr.search.partition.search_by_spatial"}
+def search_by_spatial(query, filters = None, target = 10000, config: dict = None):
+    """
+    Search for granules by cutting the bounding_box or polygon of the query into
+    tiles of no more then target granules each, downloading the tiles at the
+    same time. Granules which cross more then one tile are returned once.
+    Parameters:
+        query (dictionary): required, CMR search parameters with one
+            bounding_box or polygon, like {'bounding_box': '170,-10,-170,10'}
+        filters (list): column filter lambdas
+        target (int): most granules to download in one search
+        config (dictionary): configuration settings
+    Returns:
+        JSON results from CMR
+    """
+    return partition.search_by_spatial("granules", query, filters=filters,
+        target=target, config=config)
+
+# document-it: {"from":"cmr.search.common.search_by_page_async_generator"}
+async def search_async_generator(query, filters = None, limit = None, config: dict = None):
+    """
+    Search for granules and yield them one at a time from an async generator,
+    use with `async for`. Errors will go to logs.
+    Parameters:
+        query (dictionary): required, CMR search parameters
+        filters (list): column filter lambdas
+        limit (int): number of granules, items are not held in memory so
+            there is no cap of 100000
+        config (dictionary): configuration settings
+    """
+    page_state = scom.create_page_state(limit=limit, max_limit=None)
+    async for item in scom.search_by_page_async_generator("granules",
+            query=query,
+            filters=filters,
+            page_state=page_state,
+            config=config):
+        yield item
+
 def sample_by_collections(collection_query, filters = None, limits = None, config: dict = None):
     """
     Perform a compound search looking for granules based on the results of a
@@ -188,7 +524,16 @@ def sample_by_collections(collection_query, filters = None, limits = None, confi
         limits: an int, a list of 0 to 2 int values, or a dictionary, None values will be asasumed
             list: [granule limit, collection limit]
             dictionary: {'granule': None, 'collection': None}
-        config (dictionary): configuration settings
+        config (dictionary): configuration settings responds to:
+            * sample.workers - how many collections are searched at once
+            * sample.strategy - 'each' to search every collection on its own,
+              'batch' to search many collections in one request, or 'auto',
+              the default, to use batches for small granule limits
+    Returns:
+        SearchResults of granules, in the order of the collections, with the
+        status 'errors' and an errors dictionary of concept id to error for
+        any collection which could not be searched, or a dictionary with
+        errors if the collection search failed
     """
 
     # prep work
@@ -196,36 +541,46 @@ def sample_by_collections(collection_query, filters = None, limits = None, confi
     max_limit = limit_obj["granule"] * limit_obj["collection"]
 
     # searches
-    found_collections = _collection_samples(collection_query, limit_obj["collection"], config)
-    found_granules = _granule_samples(found_collections, filters, limit_obj["granule"], config)
-
-    # return results
-    return found_granules[:max_limit]
-
-# document-it: {"from":"cmr.search.common.experimental_search_by_page_generator"}
-def experimental_search_generator(query, filters = None, limit = None, config: dict = None):
+    references = {}
+    found_collections = _collection_samples(collection_query, limit_obj["collection"], config,
+        references)
+    if isinstance(found_collections, dict):
+        return found_collections
+    if not _batched(found_collections, limit_obj["granule"], config):
+        references = None
+    found_granules = _granule_samples(found_collections, filters, limit_obj["granule"], config,
+        references)
+
+    # return results, trimmed in place to keep the status and errors
+    del found_granules[max_limit:]
+    return found_granules
+
+# document-it: {"from":"cmr.search.common.search_by_page_generator"}
+def search_generator(query, filters = None, limit = None, config: dict = None):
     """
-    WARNING: This is an experimental function, do not use in an operational
-    system, this function will go away.
-
-    This function performs searches and returns data as a list generator. Errors
-    will go to logs. A list generator may be more performant on large datasets,
-    but some experimenting is needed.
+    Search for granules and yield them one at a time while the next pages are
+    downloaded on a background thread. Errors will go to logs.
     Parameters:
         query (dictionary): required, CMR search parameters
         filters (list): column filter lambdas
-        limit (int): number from 1 to 100000
-        config (dictionary): configuration settings
-    Returns:
-        JSON results from CMR
+        limit (int): number of granules, items are not held in memory so
+            there is no cap of 100000
+        config (dictionary): configuration settings, prefetch sets the most
+            pages read ahead of the caller
     """
-    page_state = scom.create_page_state(limit=limit)
-    found_items = scom.experimental_search_by_page_generator("granules",
+    page_state = scom.create_page_state(limit=limit, max_limit=None)
+    yield from scom.search_by_page_generator("granules",
         query=query,
         filters=filters,
         page_state=page_state,
         config=config)
-    yield from found_items
+
+# document-it: {"from":".search_generator"}
+def experimental_search_generator(query, filters = None, limit = None, config: dict = None):
+    """
+    Deprecated, use search_generator() which this now calls.
+    """
+    yield from search_generator(query, filters=filters, limit=limit, config=config)
 
 def open_api(section = '#granule-search-by-parameters'):
     """
@@ -251,11 +606,16 @@ def help_text(contains: str = ""):
         open_api,
         help_text,
         search,
+        search_async,
+        search_async_generator,
         set_logging_to]
     filters = [all_fields,
         concept_id_fields,
         drop_fields,
         granule_core_fields,
+        keep_if,
         meta_fields,
+        provider_is,
+        temporal_overlaps,
         umm_fields]
     return scom.help_text(contains, functions, filters)
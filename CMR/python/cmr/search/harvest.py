@@ -0,0 +1,195 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Long searches which write their items to a file and can be picked up again
+date: 2026-10-17
+since: 0.1
+
+A harvest downloads every page of a search, one after another, appending the
+items to a file with one JSON record per line. After each page a small
+checkpoint file records the query, the CMR-Search-After value for the next
+page, the number of items written, and how long the output file was. Running
+the same harvest again with the same checkpoint starts from the next page, and
+any half written page at the end of the output is dropped first.
+
+    harvest()
+        base - CMR API end point directory
+        query - a dictionary of CMR parameters
+        checkpoint - path of the checkpoint file
+        output - path of the file items are written to
+        filters - a list of result filter lambdas
+        limit - int limiting the number of records returned
+        config - configurations
+    read_checkpoint()
+        checkpoint - path of the checkpoint file
+"""
+
+import json
+import logging
+import os
+
+from cmr.util import common
+import cmr.search.common as scom
+
+logging.basicConfig(level = logging.ERROR)
+logger = logging.getLogger('cmr.search.harvest')
+
+VERSION = 1
+""" Layout of the checkpoint file, files of another version are not resumed """
+
+ALL = 10**12
+""" Limit used when none is given, more items then CMR will ever hold """
+
+PAGE_KEYS = ['page_size', 'page_num', 'took', 'limit', 'downloaded', 'CMR-Search-After']
+""" Parts of the page state kept in a checkpoint """
+
+# ******************************************************************************
+
+def read_checkpoint(checkpoint: str):
+    """
+    Read a checkpoint file
+    Parameters:
+        checkpoint (string): path of the checkpoint file
+    Returns:
+        dictionary with base, query, output, page_state, items, pages, hits,
+        offset, and status, or None if there is no checkpoint
+    """
+    text = common.read_file(os.path.expanduser(checkpoint))
+    if text is None:
+        return None
+    return json.loads(text)
+
+def _start(base, query, checkpoint, output, limit):
+    """
+    Load the checkpoint of an earlier run of the same harvest, or make a new one
+    Returns:
+        checkpoint dictionary, raises ValueError if the checkpoint belongs to
+        another harvest
+    """
+    state = read_checkpoint(checkpoint)
+    if state is not None:
+        if state.get('version') != VERSION:
+            raise ValueError(f"Checkpoint {checkpoint} is from version "
+                f"{state.get('version')}, not {VERSION}")
+        if (state['base'], state['query'], state['output']) != (base, query, output):
+            raise ValueError(f"Checkpoint {checkpoint} is for a different harvest")
+        logger.info("Resuming harvest after %d items", state['items'])
+        return state
+    page_state = scom.create_page_state(limit=ALL if limit is None else limit,
+        max_limit=None)
+    return {'version': VERSION,
+        'base': base,
+        'query': query,
+        'output': output,
+        'page_state': {key: page_state[key] for key in PAGE_KEYS if key in page_state},
+        'items': 0,
+        'pages': 0,
+        'hits': None,
+        'offset': 0,
+        'status': 'running'}
+
+def _summary(state: dict, resumed: bool):
+    """What a harvest returns to the caller"""
+    return {'status': state['status'], 'items': state['items'], 'pages': state['pages'],
+        'hits': state['hits'], 'resumed': resumed}
+
+# document-it: {"key":"harvest.every", "default":"1", "msg":"pages between checkpoints"}
+# document-it: {"key":"max-time", "default": "300000"}
+# document-it: {"from":"cmr.search.common._make_search_request"}
+# document-it: {"from":"cmr.search.common._adaptive"}
+# pylint: disable=R0913,R0914,R0917 # a search, where to keep it, and where it is up to
+def harvest(base, query, checkpoint, output, filters = None, limit = None,
+        config: dict = None):
+    """
+    Download all the pages of a search into a file of JSON lines, saving a
+    checkpoint as each page is written so that a harvest which is stopped, or
+    fails, can be run again and carry on from the page after the last one saved.
+    Pages are always found with CMR-Search-After, as a scroll session would not
+    last till the harvest is run again.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values
+        checkpoint (string): path of the checkpoint file
+        output (string): path of the file to append items to
+        filters (list): A list of lambda functions to reduce the number of columns
+        limit (int): most items to write, None for all of them, there is no
+            cap as items are not held in memory, a harvest which is resumed
+            keeps the limit it was started with
+        config (dictionary): configurations settings responds to:
+            * harvest.every - pages to write between checkpoints
+            * max-time - processing time allowed for this run, the harvest can
+              be run again to continue
+            * page.target-time, page.target-bytes - resize each page as it is
+              downloaded, see cmr.search.common._resize_page()
+    Returns:
+        dictionary with the status, the number of items and pages written,
+        the hits CMR reported, and if this run resumed an earlier one, or a
+        dictionary with errors, in which case the checkpoint still holds the
+        last page written
+    """
+    config = dict(common.always(config), paging='search-after')
+    query = common.always(query)
+    state = _start(base, query, checkpoint, output, limit)
+    resumed = state['pages'] > 0
+    if state['status'] in ('complete', 'incomplete'):
+        return _summary(state, resumed)
+    page_state = scom.start_pages(dict(state['page_state']), config)
+    every = max(1, config.get('harvest.every', 1))
+    search, filters = scom.push_down(query, filters)
+    filters = scom.compile_filters(filters)
+
+    with open(os.path.expanduser(output), 'a+b') as file:
+        # anything after the offset is from a page which was not saved
+        file.truncate(state['offset'])
+        file.seek(state['offset'])
+        took, unsaved = 0, 0
+        while True:
+            obj_json, page, more = scom.read_page(base, search, filters, page_state, config)
+            if page is None:
+                return obj_json
+            page = page[:max(0, page_state['limit'] - state['items'])]
+            for item in page:
+                file.write(json.dumps(item).encode('utf-8') + b'\n')
+            took = took + obj_json['took']
+            state['items'] = state['items'] + len(page)
+            state['pages'] = state['pages'] + 1
+            state['hits'] = obj_json['hits']
+            done = not more
+            out_of_time = not done and took > config.get('max-time', 300000)
+            unsaved = unsaved + 1
+            if done or out_of_time or unsaved >= every:
+                file.flush()
+                os.fsync(file.fileno())
+                state['offset'] = file.tell()
+                state['page_state'] = {key: page_state[key] for key in PAGE_KEYS
+                    if key in page_state}
+                state['status'] = 'running'
+                if done:
+                    state['status'] = 'incomplete' if page_state.get('incomplete') \
+                        else 'complete'
+                common.replace_file(checkpoint, json.dumps(state))
+                unsaved = 0
+            if done:
+                break
+            if out_of_time:
+                logger.warning("max search time exceeded, run the harvest again to continue")
+                state['status'] = 'max-time'
+                break
+    logger.info("Harvest wrote %d items of %d", state['items'], state['hits'])
+    return _summary(state, resumed)
@@ -0,0 +1,151 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Fetch the records of a large number of concept ids
+date: 2026-10-17
+since: 0.1
+
+The concept ids are put in the order they were first given, with repeats
+dropped, and split into chunks which each fit in one page of a search. The
+chunks are sent, as concept_id values in the body of a POST, a few at a time,
+and the records of each chunk are handed back, keyed by their concept id, as
+soon as the chunk and all the ones before it are done. Records which a
+predicate filter drops are not handed back but are not missing either, so
+predicates are always run locally rather then sent to CMR. Only a few chunks are
+downloaded ahead of the caller so memory stays flat however many ids are asked
+for. Once every record has been handed back, the ids which were not found are
+listed, as are the chunks which failed.
+
+    found = lookup_by_ids(ids, 'granules')
+    for concept_id, record in found:
+        ...
+    print(found.missing, found.errors)
+
+    lookup_by_ids()
+        ids - a list of concept ids
+        kind - CMR API end point directory
+        filters - a list of result filter lambdas
+        config - configurations
+"""
+
+import collections
+import concurrent.futures
+import logging
+
+from cmr.util import common
+import cmr.search.common as scom
+
+logging.basicConfig(level = logging.ERROR)
+logger = logging.getLogger('cmr.search.lookup')
+
+# ******************************************************************************
+
+def _chunks(ids, size):
+    """Split ids, with repeats dropped, into lists of at most size ids"""
+    unique = list(dict.fromkeys(ids))
+    return [unique[start:start+size] for start in range(0, len(unique), size)]
+
+def _fetch(kind, query, config):
+    """
+    Search for one chunk of concept ids, given as the concept_id of the query
+    Returns:
+        dictionary of concept id to record, or a dictionary with errors
+    """
+    size = len(query['concept_id'])
+    page_state = scom.create_page_state(page_size=size, limit=size)
+    found = scom.search_by_page(kind, query, page_state=page_state,
+        config=dict(config, paging='search-after'))
+    if isinstance(found, dict):
+        return found
+    return {item.get('meta', {}).get('concept-id'): item for item in found}
+
+# pylint: disable=R0903 # only meant to be iterated over
+class Lookup():
+    """
+    Records of a list of concept ids, found when iterated over, see the module
+    documentation. Iterating yields tuples of concept id and record, after
+    which missing lists the ids which were not found, in the order given, and
+    errors has the error of each chunk which failed, keyed by its first id.
+    """
+    def __init__(self, ids, kind = 'granules', filters = None, config: dict = None):
+        self.kind = kind
+        self.filters = scom.compile_filters(filters) or (lambda item: item)
+        self.config = common.always(config)
+        self.chunks = _chunks(ids, max(1, min(2000, self.config.get('lookup.batch', 500))))
+        self.missing = []
+        self.errors = {}
+
+    def __iter__(self):
+        self.missing, self.errors = [], {}
+        workers = max(1, self.config.get('lookup.workers', 4))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                thread_name_prefix='cmr-lookup') as executor:
+            pending = collections.deque()
+            chunks = iter(self.chunks)
+            try:
+                while True:
+                    # keep a few chunks ahead of the caller, in the order given
+                    while len(pending) < workers * 2:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        pending.append((chunk, executor.submit(_fetch, self.kind,
+                            {'concept_id': chunk}, self.config)))
+                    if not pending:
+                        break
+                    chunk, future = pending.popleft()
+                    yield from self._handle(chunk, future.result())
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def _handle(self, chunk, found):
+        """Yield the records of a chunk which is done, noting any left out"""
+        if 'errors' in found:
+            logger.warning("Could not look up %d ids starting with %s: %s", len(chunk),
+                chunk[0], found.get('errors'))
+            self.errors[chunk[0]] = found
+            return
+        for concept_id in chunk:
+            if concept_id not in found:
+                self.missing.append(concept_id)
+                continue
+            record = self.filters(found[concept_id])
+            if record is not scom.DROPPED:
+                yield concept_id, record
+
+# document-it: {"key":"lookup.batch", "default":"500", "msg":"concept ids per request"}
+# document-it: {"key":"lookup.workers", "default":"4", "msg":"requests made at once"}
+# document-it: {"from":"cmr.search.common.search_by_page"}
+def lookup_by_ids(ids, kind = 'granules', filters = None, config: dict = None):
+    """
+    Fetch the records of many concept ids, a chunk of them at a time with a few
+    chunks downloading at once
+    Parameters:
+        ids (list): concept ids, repeats are only looked up once
+        kind (string): CMR end point, like collections or granules
+        filters (list): A list of lambda functions to reduce the number of columns
+        config (dictionary): configurations settings responds to:
+            * lookup.batch - concept ids sent in each request, 1 to 2000
+            * lookup.workers - requests made at the same time
+    Returns:
+        Lookup which yields tuples of concept id and record, in the order the
+        ids were given, and then has the missing ids and any errors
+    """
+    return Lookup(ids, kind, filters, config)
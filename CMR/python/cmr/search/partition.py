@@ -0,0 +1,395 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Split one large search into smaller searches which can be run at the same time
+date: 2026-10-17
+since: 0.1
+
+A single search is read one page after another, so it can only go as fast as
+one connection. These functions cut the search into parts, using searches with
+a page_size of 0 to count the hits in each part, then download the parts at the
+same time and merge them, dropping any item found by more then one part.
+
+    temporal_windows()
+        base - CMR API end point directory
+        query - a dictionary of CMR parameters with a temporal range
+        target - most hits wanted in one window
+        config - configurations
+    search_by_temporal()
+        same as temporal_windows() plus filters, returns the merged items
+    spatial_tiles()
+        same as temporal_windows() but for a bounding_box or polygon
+    search_by_spatial()
+        same as spatial_tiles() plus filters, returns the merged items
+"""
+
+import concurrent.futures
+import datetime
+import logging
+import time
+
+from cmr.util import common
+import cmr.search.common as scom
+
+logging.basicConfig(level = logging.ERROR)
+logger = logging.getLogger('cmr.search.partition')
+
+# ******************************************************************************
+# dates
+
+def parse_time(text: str):
+    """
+    Read a date from a CMR temporal range or record, see
+    cmr.util.common.parse_time()
+    Parameters:
+        text (string): ISO 8601 date, like 2020-01-31T12:00:00Z
+    Returns:
+        timezone aware datetime, or None if text is blank or can not be read
+    """
+    return common.parse_time(text)
+
+def format_time(when: datetime.datetime):
+    """Write a datetime the way CMR expects to read it"""
+    return when.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def _one_value(query: dict, name: str):
+    """The single value of a query parameter, None if it is not in the query"""
+    value = (query or {}).get(name)
+    if isinstance(value, (list, tuple)):
+        if len(value) != 1:
+            raise ValueError(f'query must have exactly one {name} to partition')
+        value = value[0]
+    return value
+
+def _temporal_range(query: dict):
+    """
+    Find the start and end of the one temporal range in a query
+    Returns:
+        tuple of datetimes, raises ValueError if there is not exactly one
+        range with both a start and an end
+    """
+    value = _one_value(query, 'temporal')
+    if not isinstance(value, str):
+        raise ValueError('query must have a temporal range to partition')
+    parts = value.split(',')
+    start = parse_time(parts[0])
+    end = parse_time(parts[1]) if len(parts) > 1 else None
+    if start is None or end is None:
+        raise ValueError(f"temporal range '{value}' needs both a start and an end")
+    return start, end
+
+def _with_temporal(query: dict, window):
+    """Copy of the query searching only one window"""
+    return dict(query, temporal=f'{format_time(window[0])},{format_time(window[1])}')
+
+# ******************************************************************************
+# boxes
+
+def _spatial_box(query: dict):
+    """
+    Find the box to cut up from the bounding_box or polygon of a query
+    Returns:
+        tuple of west, south, east, north, with east greater then west, so
+        boxes crossing the antimeridian have an east past 180. Polygons are
+        assumed to have no edge longer then 180 degrees of longitude. Raises
+        ValueError if the query has neither a bounding_box or a polygon.
+    """
+    box = _one_value(query, 'bounding_box')
+    if box is not None:
+        west, south, east, north = [float(value) for value in str(box).split(',')]
+        if east < west:
+            east = east + 360
+        return west, south, east, north
+    polygon = _one_value(query, 'polygon')
+    if polygon is None:
+        raise ValueError('query must have a bounding_box or polygon to partition')
+    points = [float(value) for value in str(polygon).split(',')]
+    longitudes = [points[0]]
+    for longitude in points[2::2]:
+        # follow the shortest way around, so a polygon crossing the
+        # antimeridian keeps going past 180 instead of jumping back
+        step = (longitude - longitudes[-1] + 180) % 360 - 180
+        longitudes.append(longitudes[-1] + step)
+    west, east = min(longitudes), max(longitudes)
+    if west < -180:
+        west, east = west + 360, east + 360
+    return west, min(points[1::2]), east, max(points[1::2])
+
+def _degrees(value: float):
+    """Write a longitude or latitude without trailing zeros"""
+    text = f'{value:.6f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+def bounding_box(tile):
+    """
+    Write a tile from spatial_tiles() as a CMR bounding_box, moving longitudes
+    back into -180 to 180. Tiles east of the antimeridian have a west greater
+    then their east.
+    Parameters:
+        tile (tuple): west, south, east, north, and optionally hits
+    Returns:
+        string like '170,-10,-170,10'
+    """
+    west, south, east, north = tile[:4]
+    if east - west >= 360:
+        west, east = -180, 180
+    else:
+        west = (west + 180) % 360 - 180
+        east = (east + 180) % 360 - 180
+        if east <= west:
+            east = 180 if east == -180 else east
+    return ','.join(_degrees(value) for value in (west, south, east, north))
+
+def _with_box(query: dict, tile):
+    """Copy of the query searching only one tile"""
+    return dict(query, bounding_box=bounding_box(tile))
+
+def _dedupe_key(item):
+    """Identity of one revision of a record, None if the item has no meta section"""
+    meta = item.get('meta', {}) if isinstance(item, dict) else {}
+    if 'concept-id' not in meta:
+        return None
+    return (meta['concept-id'], meta.get('revision-id'))
+
+def _harvest_parts(parts, harvest, config):
+    """
+    Run harvest on every part at the same time and merge what they find in part
+    order, keeping only the first copy of any item found by more then one part
+    Parameters:
+        parts (list): what to search, handed to harvest
+        harvest: lambda taking a part and returning SearchResults or an error
+        config (dictionary): responds to partition.workers
+    Returns:
+        SearchResults with the status of the last part which did not complete,
+        or the first error dictionary
+    """
+    items = scom.SearchResults()
+    seen = set()
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, config.get('partition.workers', 4)))
+    futures = [executor.submit(harvest, part) for part in parts]
+    try:
+        for future in futures:
+            found = future.result()
+            if not isinstance(found, scom.SearchResults):
+                return found
+            for item in found:
+                key = _dedupe_key(item)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                items.append(item)
+            if found.status != 'complete':
+                items.status = found.status
+    finally:
+        # parts not started are not needed after an error
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    return items
+
+# pylint: disable=R0913,R0917 # the search plus how to cut it up
+def _cut(base, query, target, config, whole, narrow, halve):
+    """
+    Cut a search into parts, in half and those halves in half, till each part
+    has no more then target hits. The hits of each part are counted with a
+    page_size=0 search, all the parts of one round at once. Parts with no hits
+    are dropped.
+    Parameters:
+        whole (tuple): the part covering all of the query
+        narrow: lambda taking the query and a part and returning the query for
+            just that part
+        halve: lambda taking a part and returning its two halves, or None if
+            the part is too small to cut
+    Returns:
+        list of part tuples with the hits added on the end, or a dictionary
+        with errors
+    """
+    pending = [whole]
+    parts = []
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, config.get('partition.workers', 4))) as executor:
+        while len(pending) > 0:
+            counts = list(executor.map(
+                lambda part: scom.search_hits(base, narrow(query, part), config),
+                pending))
+            cut = []
+            for part, hits in zip(pending, counts):
+                if isinstance(hits, dict):
+                    return hits
+                halves = halve(part) if hits > target else None
+                if halves is not None:
+                    cut.extend(halves)
+                elif hits > 0:
+                    if hits > target:
+                        logger.warning("%s has %d hits and can not be cut",
+                            narrow({}, part), hits)
+                    parts.append(part + (hits,))
+            pending = cut
+    return sorted(parts)
+
+def _search_parts(base, query, filters, parts, narrow, config):
+    """
+    Download the parts from _cut() at the same time and merge them, see
+    _harvest_parts(). A deadline in config covers all the parts.
+    """
+    deadline = None
+    if config.get('deadline') is not None:
+        deadline = time.monotonic() + config['deadline']
+
+    def harvest(part):
+        page_state = scom.create_page_state(limit=part[-1], max_limit=None)
+        page_state['deadline'] = deadline
+        return scom.search_by_page(base, narrow(query, part[:-1]),
+            page_state=page_state, config=config)
+
+    items = _harvest_parts(parts, harvest, config)
+    if not isinstance(items, scom.SearchResults):
+        return items
+    logger.info("%d parts found %d items", len(parts), len(items))
+    if filters is None:
+        return items
+    return scom.SearchResults(scom.apply_filters(filters, items), items.status)
+
+# ******************************************************************************
+# public functions
+
+# document-it: {"key":"partition.workers", "default":"4", "msg":"parts searched at once"}
+# document-it: {"key":"partition.min-span", "default":"1", "msg":"seconds, smallest window"}
+def temporal_windows(base: str, query: dict, target: int = 10000, config: dict = None):
+    """
+    Cut the temporal range of a query in half, and those halves in half, till
+    each window has no more then target hits. The hits of each window are
+    counted with a page_size=0 search, all the windows of one round at once.
+    Windows with no hits are dropped. Items which span many windows, or which
+    fall on the edge of two, are counted in each of them.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters, must have one temporal range with
+            a start and an end
+        target (int): most hits wanted in one window
+        config (dictionary): configurations settings responds to:
+            * partition.workers - number of searches to run at once
+            * partition.min-span - seconds, windows this small are not cut,
+              even if they have more then target hits
+    Returns:
+        list of (start, end, hits) tuples in time order, or a dictionary with errors
+    """
+    config = common.always(config)
+    min_span = datetime.timedelta(seconds=config.get('partition.min-span', 1))
+
+    def halve(window):
+        start, end = window
+        middle = (start + (end - start) / 2).replace(microsecond=0)
+        if end - start <= min_span or not start < middle < end:
+            return None
+        return [(start, middle), (middle, end)]
+
+    return _cut(base, query, target, config, _temporal_range(query), _with_temporal, halve)
+
+# document-it: {"key":"partition.min-degrees", "default":"0.1", "msg":"smallest tile"}
+def spatial_tiles(base: str, query: dict, target: int = 10000, config: dict = None):
+    """
+    Cut the bounding box of a query in half across its longer side, and those
+    halves in half, till each tile has no more then target hits. Boxes which
+    cross the antimeridian, where west is greater then east, are cut as one box
+    and tiles are written back with longitudes from -180 to 180. Queries with a
+    polygon are cut over the box around the polygon, each tile keeps the
+    polygon and adds a bounding_box, which CMR joins with AND. Items which
+    cover many tiles are counted in each of them.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters, must have one bounding_box or polygon
+        target (int): most hits wanted in one tile
+        config (dictionary): configurations settings responds to:
+            * partition.workers - number of searches to run at once
+            * partition.min-degrees - tiles this small are not cut, even if
+              they have more then target hits
+    Returns:
+        list of (west, south, east, north, hits) tuples, or a dictionary with
+        errors. East may be past 180 for tiles east of the antimeridian, see
+        bounding_box() for the value to send to CMR.
+    """
+    config = common.always(config)
+    min_degrees = config.get('partition.min-degrees', 0.1)
+
+    def halve(tile):
+        west, south, east, north = tile
+        if max(east - west, north - south) <= min_degrees:
+            return None
+        if east - west >= north - south:
+            middle = (west + east) / 2
+            return [(west, south, middle, north), (middle, south, east, north)]
+        middle = (south + north) / 2
+        return [(west, south, east, middle), (west, middle, east, north)]
+
+    return _cut(base, query, target, config, _spatial_box(query), _with_box, halve)
+
+# document-it: {"from":".temporal_windows"}
+# document-it: {"from":"cmr.search.common.search_by_page"}
+def search_by_temporal(base: str, query: dict, filters = None, target: int = 10000,
+        config: dict = None):
+    """
+    Download every item of a search with a temporal range by cutting the range
+    into windows, see temporal_windows(), and downloading the windows at the
+    same time. Items found in more then one window, same concept-id and
+    revision-id, are kept only once. Items are returned in window order.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters with one temporal range
+        filters (list): A list of lambda functions to reduce the number of columns,
+            applied after duplicates are removed
+        target (int): most hits to download in one search
+        config (dictionary): configurations, as for temporal_windows() and
+            search_by_page(). A deadline covers all the windows.
+    Returns:
+        SearchResults, or a dictionary with errors
+    """
+    config = common.always(config)
+    windows = temporal_windows(base, query, target, config)
+    if isinstance(windows, dict):
+        return windows
+    return _search_parts(base, query, filters, windows, _with_temporal, config)
+
+# document-it: {"from":".spatial_tiles"}
+# document-it: {"from":"cmr.search.common.search_by_page"}
+def search_by_spatial(base: str, query: dict, filters = None, target: int = 10000,
+        config: dict = None):
+    """
+    Download every item of a search with a bounding_box or polygon by cutting
+    the area into tiles, see spatial_tiles(), and downloading the tiles at the
+    same time. Items which cross more then one tile, same concept-id and
+    revision-id, are kept only once. Items are returned in tile order.
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters with one bounding_box or polygon
+        filters (list): A list of lambda functions to reduce the number of columns,
+            applied after duplicates are removed
+        target (int): most hits to download in one search
+        config (dictionary): configurations, as for spatial_tiles() and
+            search_by_page(). A deadline covers all the tiles.
+    Returns:
+        SearchResults, or a dictionary with errors
+    """
+    config = common.always(config)
+    tiles = spatial_tiles(base, query, target, config)
+    if isinstance(tiles, dict):
+        return tiles
+    return _search_parts(base, query, filters, tiles, _with_box, config)
@@ -48,7 +48,7 @@ def search(config: dict = None):
 
     url = scom.cmr_basic_url(endpoint='ingest', base="providers", config=config)
 
-    response = net.get(url)
+    response = net.get(url, config=config)
 
     if 'errors' in response:
         return response #let caller know about the errors
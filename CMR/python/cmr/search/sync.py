@@ -0,0 +1,226 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Keep a copy of a search up to date by only asking for what has changed
+date: 2026-10-17
+since: 0.1
+
+The first sync of a query downloads everything it finds. A state file then
+keeps, for each query, the concept id and revision id of every record found and
+the latest revision date seen, the high water mark. Later syncs only ask for
+records revised since the mark, less a small overlap to cover records which
+were being saved while the last sync ran, and sort them into ones which were
+added and ones which were updated. CMR does not return deleted records, so a
+count of the whole search is compared with the records known, and only when
+they differ are the concept ids listed to find which ones are gone.
+
+    sync()
+        base - CMR API end point directory
+        query - a dictionary of CMR parameters
+        state_file - path of the file to keep the marks in
+        filters - a list of result filter lambdas
+        config - configurations
+    read_state()
+        state_file - path of the file to keep the marks in
+"""
+
+import datetime
+import json
+import logging
+import os
+
+from cmr.util import common
+import cmr.search.common as scom
+from cmr.search import harvest as harvester
+from cmr.search import partition
+
+logging.basicConfig(level = logging.ERROR)
+logger = logging.getLogger('cmr.search.sync')
+
+VERSION = 1
+""" Layout of the state file, files of another version are not used """
+
+# ******************************************************************************
+
+def read_state(state_file: str):
+    """
+    Read a sync state file
+    Parameters:
+        state_file (string): path of the state file
+    Returns:
+        dictionary of version and queries, each query having a base, query,
+        watermark, and records of concept id to revision id, or None if there
+        is no state file
+    """
+    text = common.read_file(os.path.expanduser(state_file))
+    if text is None:
+        return None
+    state = json.loads(text)
+    if state.get('version') != VERSION:
+        raise ValueError(f"State file {state_file} is from version "
+            f"{state.get('version')}, not {VERSION}")
+    return state
+
+def _query_key(base: str, query: dict):
+    """Name of a query in the state file"""
+    return base + ' ' + json.dumps(query, sort_keys=True, default=str)
+
+def _download(base, query, filters, config, handle):
+    """
+    Hand the filtered items of each page of a search to handle, as the page
+    arrives, with no cap on how many records there are
+    Returns:
+        status the search ended with, as in SearchResults, or a dictionary with
+        errors
+    """
+    config = dict(config, paging='search-after')
+    page_state = scom.start_pages(scom.create_page_state(limit=harvester.ALL,
+        max_limit=None), config)
+    filters = scom.compile_filters(filters)
+    took, pages = 0, 0
+    while True:
+        obj_json, page, more = scom.read_page(base, query, filters, page_state, config)
+        if page is None:
+            if pages > 0 and scom.deadline_passed(page_state):
+                return 'deadline'
+            return obj_json
+        handle(page)
+        pages = pages + 1
+        took = took + obj_json['took']
+        if not more:
+            return 'incomplete' if page_state.get('incomplete') else 'complete'
+        if took > config.get('max-time', 300000):
+            logger.warning("max search time exceeded")
+            return 'max-time'
+        if scom.deadline_passed(page_state):
+            logger.warning("Sync deadline passed before page %d", page_state['page_num'])
+            return 'deadline'
+
+def _deleted(base, query, records, config):
+    """
+    Find the records which are no longer found by a search, only listing the
+    concept ids of the search if the count of hits says some are gone
+    Returns:
+        list of concept ids, or a dictionary with errors
+    """
+    hits = scom.search_hits(base, query, config)
+    if isinstance(hits, dict):
+        return hits
+    if hits == len(records):
+        return []
+    current = set()
+    status = _download(base, query, [scom.concept_id_fields], config,
+        lambda page: current.update(item['concept-id'] for item in page))
+    if isinstance(status, dict):
+        return status
+    if status != 'complete':
+        logger.warning("Could not list every record to look for deletions: %s", status)
+        return []
+    missing = current.difference(records)
+    if missing:
+        logger.warning("%d records were found which the sync did not see, like %s",
+            len(missing), sorted(missing)[0])
+    return sorted(set(records).difference(current))
+
+# document-it: {"key":"sync.overlap", "default":"60", "msg":"seconds to look back past the mark"}
+# document-it: {"key":"sync.deletions", "default":"True", "msg":"look for deleted records"}
+# document-it: {"from":"cmr.search.common.search_by_page"}
+# pylint: disable=R0914 # what was known and what has changed
+def sync(base, query, state_file, filters = None, config: dict = None):
+    """
+    Find the records of a search which were added, updated, or deleted since
+    the last time the search was synced with the same state file
+    Parameters:
+        base (string): CMR end point, like collections or granules
+        query (dictionary): CMR parameters and their values, without an
+            updated_since, which is set from the state file
+        state_file (string): path of the file which remembers each query
+        filters (list): A list of lambda functions to reduce the number of
+            columns of the added and updated records
+        config (dictionary): configurations settings responds to:
+            * sync.overlap - seconds before the mark to start looking from
+            * sync.deletions - False to not look for deleted records
+            * max-time, deadline - as in search_by_page(), a sync which is cut
+              short keeps what it found and its status says why
+    Returns:
+        dictionary with status, added and updated records, deleted concept
+        ids, and the new watermark, or a dictionary with errors in which case
+        the state file is not changed
+    """
+    config = common.always(config)
+    query = common.always(query)
+    state = read_state(state_file) or {'version': VERSION, 'queries': {}}
+    key = _query_key(base, query)
+    known = state['queries'].get(key, {'base': base, 'query': query, 'watermark': None,
+        'records': {}})
+    records = dict(known['records'])
+    watermark = partition.parse_time(known['watermark'])
+
+    # oldest first, so a sync cut short by max-time leaves no gaps before the mark
+    delta = dict(query)
+    delta.setdefault('sort_key', 'revision_date')
+    if watermark is not None:
+        since = watermark - datetime.timedelta(seconds=config.get('sync.overlap', 60))
+        delta['updated_since'] = partition.format_time(since)
+    # filtered as each page arrives, so the unfiltered records are not all kept
+    filters = scom.compile_filters(filters) or (lambda item: item)
+    added, updated = [], []
+
+    def handle(page):
+        nonlocal watermark
+        for item in page:
+            meta = item.get('meta', {})
+            concept_id, revision = meta.get('concept-id'), meta.get('revision-id')
+            change = None
+            if concept_id not in records:
+                change = added
+            elif records[concept_id] != revision:
+                change = updated
+            if change is not None:
+                record = filters(item)
+                if record is not scom.DROPPED:
+                    change.append(record)
+            records[concept_id] = revision
+            revised = partition.parse_time(meta.get('revision-date'))
+            if revised is not None and (watermark is None or revised > watermark):
+                watermark = revised
+
+    status = _download(base, delta, None, config, handle)
+    if isinstance(status, dict):
+        return status
+
+    deleted = []
+    if known['watermark'] is not None and status == 'complete' \
+            and config.get('sync.deletions', True):
+        deleted = _deleted(base, query, records, config)
+        if isinstance(deleted, dict):
+            return deleted
+        for concept_id in deleted:
+            del records[concept_id]
+
+    mark = None if watermark is None else watermark.isoformat().replace('+00:00', 'Z')
+    state['queries'][key] = dict(known, watermark=mark, records=records)
+    common.replace_file(state_file, json.dumps(state))
+    logger.info("Sync found %d added, %d updated, and %d deleted records", len(added),
+        len(updated), len(deleted))
+    return {'status': status,
+        'added': added,
+        'updated': updated,
+        'deleted': deleted,
+        'watermark': mark}
@@ -0,0 +1,522 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+An asyncio version of the post() and get() functions in cmr.util.network
+date: 2026-10-17
+since: 0.1
+
+A small HTTP/1.1 client built on asyncio.open_connection() so that one event
+loop can drive hundreds of CMR requests without a thread for each. Connections
+are kept alive and reused per event loop, responses may be gzip or deflate
+encoded, and the retry and rate limit settings are the same as those used by
+cmr.util.network. Redirects and proxies are not supported.
+
+Only the default transport is driven by the event loop. When the transport
+config setting names any other cmr.util.transport, like cmr.util.fakecmr, the
+request is handed to cmr.util.network on a worker thread so that it reaches the
+same transport a blocking call would.
+
+    post()
+        url - resource to post to
+        body - dictionary of parameters or a string
+        accept - Accept header
+        headers - dictionary of HTTP headers
+        config - configurations, see cmr.util.network.retry_policy()
+    get()
+        url - resource to get
+        accept - Accept header
+        headers - dictionary of HTTP headers
+        config - configurations
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import socket
+import ssl
+import time
+import urllib.error
+import urllib.parse
+import weakref
+import zlib
+
+from cmr.util import common
+from cmr.util import transport
+import cmr.util.network as net
+
+logging.basicConfig(level = logging.ERROR)
+logger = logging.getLogger('cmr.util.aio')
+
+# ******************************************************************************
+# connection pool
+
+class AsyncResponse():
+    """A fully read HTTP response"""
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def getheaders(self):
+        """Return headers as a list of (name, value) tuples like http.client"""
+        return self.headers
+
+    def getheader(self, name, default = None):
+        """Find a header without regard to case"""
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+class AsyncConnectionPool():
+    """
+    Idle keep-alive connections for one event loop, grouped by scheme, host,
+    and port. Connections which have been checked out belong to one request.
+    """
+    def __init__(self, max_size = 10, idle_timeout = 60):
+        self.max_size = max(0, max_size)
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._stats = {'created': 0, 'reused': 0, 'returned': 0, 'evicted': 0,
+            'discarded': 0}
+
+    def _count(self, name):
+        """Increment a stats counter"""
+        self._stats[name] = self._stats[name] + 1
+
+    async def checkout(self, key, context = None):
+        """
+        Take an idle connection out of the pool or open a new one
+        Parameters:
+            key(tuple): (scheme, host, port)
+            context(ssl.SSLContext): used for https connections
+        Returns:
+            tuple of (reader, writer, True if the connection was reused)
+        """
+        now = time.monotonic()
+        idle = self._idle.get(key, [])
+        while len(idle) > 0:
+            reader, writer, last_used = idle.pop()
+            if now - last_used > self.idle_timeout or writer.transport.is_closing():
+                writer.close()
+                self._count('evicted')
+                continue
+            self._count('reused')
+            return reader, writer, True
+        self._count('created')
+        scheme, host, port = key
+        if scheme == 'https':
+            if context is None:
+                context = ssl.create_default_context()
+            reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return reader, writer, False
+
+    def checkin(self, key, reader, writer):
+        """Return a connection to the pool for use by the next request"""
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.max_size and not writer.transport.is_closing():
+            idle.append((reader, writer, time.monotonic()))
+            self._count('returned')
+        else:
+            self.discard(writer)
+
+    def discard(self, writer):
+        """Close a connection which can not be reused"""
+        self._count('discarded')
+        writer.close()
+
+    def clear(self):
+        """Close all idle connections"""
+        for connections in self._idle.values():
+            for _, writer, _ in connections:
+                writer.close()
+        self._idle = {}
+
+    def stats(self):
+        """Report on pool usage"""
+        report = dict(self._stats)
+        report['idle'] = {f'{key[0]}://{key[1]}:{key[2]}': len(value)
+            for key, value in self._idle.items() if len(value) > 0}
+        return report
+
+_pools = weakref.WeakKeyDictionary()
+
+def default_pool():
+    """Return the connection pool for the running event loop"""
+    loop = asyncio.get_event_loop()
+    if loop not in _pools:
+        _pools[loop] = AsyncConnectionPool()
+    return _pools[loop]
+
+# ******************************************************************************
+# HTTP/1.1
+
+def _split_url(url):
+    """Break a url into the pool key and the path to request"""
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ['http', 'https']:
+        raise urllib.error.URLError(f'unsupported url scheme {scheme}')
+    port = parts.port if parts.port is not None else (443 if scheme == 'https' else 80)
+    selector = parts.path if len(parts.path) > 0 else '/'
+    if len(parts.query) > 0:
+        selector = selector + '?' + parts.query
+    return (scheme, parts.hostname, port), parts.netloc, selector
+
+def _request_bytes(method, netloc, selector, data, headers):
+    """Encode the request line, headers, and body"""
+    lines = [f'{method} {selector} HTTP/1.1', f'Host: {netloc}']
+    names = [name.lower() for name in headers]
+    for name, value in headers.items():
+        lines.append(f'{name}: {value}')
+    if data is not None:
+        if 'content-type' not in names:
+            lines.append('Content-Type: application/x-www-form-urlencoded')
+        lines.append(f'Content-Length: {len(data)}')
+    head = ('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1')
+    return head if data is None else head + data
+
+class _TimedReader():
+    """
+    Wrap a StreamReader so that each read gives up after the read timeout, the
+    same as a socket timeout does for a blocking read
+    """
+    def __init__(self, reader, timeout):
+        self.reader = reader
+        self.timeout = timeout
+
+    async def readline(self):
+        """Read one line"""
+        return await asyncio.wait_for(self.reader.readline(), self.timeout)
+
+    async def readexactly(self, size):
+        """Read exactly size bytes"""
+        return await asyncio.wait_for(self.reader.readexactly(size), self.timeout)
+
+    async def read(self, size):
+        """Read up to size bytes"""
+        return await asyncio.wait_for(self.reader.read(size), self.timeout)
+
+async def _read_head(reader):
+    """Read the status line and headers of a response"""
+    line = await reader.readline()
+    if len(line) < 1:
+        raise ConnectionResetError('connection closed by server')
+    parts = line.decode('iso-8859-1').rstrip('\r\n').split(' ', 2)
+    status = int(parts[1])
+    reason = parts[2] if len(parts) > 2 else ''
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in [b'\r\n', b'\n', b'']:
+            break
+        name, _, value = line.decode('iso-8859-1').partition(':')
+        headers.append((name.strip(), value.strip()))
+    return parts[0], status, reason, headers
+
+async def _read_chunked(reader, feed):
+    """Read a body sent with Transfer-Encoding: chunked"""
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b';')[0].strip(), 16)
+        if size == 0:
+            # skip any trailers
+            while (await reader.readline()) not in [b'\r\n', b'\n', b'']:
+                pass
+            return
+        feed(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+async def _read_body(reader, method, status, headers):
+    """
+    Read and decode a response body
+    Returns:
+        tuple of (body bytes, True if the server will close the connection)
+    """
+    response = AsyncResponse(status, '', headers, b'')
+    will_close = (response.getheader('Connection', '') or '').lower() == 'close'
+    decoder = net.BodyDecoder(response.getheader('Content-Encoding'))
+    parts = []
+    def feed(chunk):
+        parts.append(decoder.feed(chunk))
+
+    if method == 'HEAD' or status in [204, 304] or 100 <= status < 200:
+        pass
+    elif 'chunked' in (response.getheader('Transfer-Encoding', '') or '').lower():
+        await _read_chunked(reader, feed)
+    elif response.getheader('Content-Length') is not None:
+        remaining = int(response.getheader('Content-Length'))
+        while remaining > 0:
+            chunk = await reader.read(min(net.READ_CHUNK_SIZE, remaining))
+            if len(chunk) < 1:
+                raise asyncio.IncompleteReadError(b''.join(parts), remaining)
+            remaining = remaining - len(chunk)
+            feed(chunk)
+    else:
+        # no length given, the body ends when the connection closes
+        will_close = True
+        chunk = await reader.read(net.READ_CHUNK_SIZE)
+        while len(chunk) > 0:
+            feed(chunk)
+            chunk = await reader.read(net.READ_CHUNK_SIZE)
+    parts.append(decoder.finish())
+    return b''.join(parts), will_close
+
+# pylint: disable=R0913,R0914,R0917 # connection, request, and response state all in one place
+async def _exchange(conn_pool, method, url, data, headers, timeouts = None):
+    """
+    Send one request over a pooled connection and read the whole response. A
+    reused connection which the server has since closed is replaced once.
+    Connecting is limited to the connect timeout, and waiting for the response
+    headers and for each read of the body to the read timeout.
+    """
+    timeouts = timeouts if timeouts is not None else net.request_timeouts()
+    key, netloc, selector = _split_url(url)
+    payload = _request_bytes(method, netloc, selector, data, headers)
+    reader, writer, reused = await asyncio.wait_for(conn_pool.checkout(key),
+        timeouts['connect'])
+    while True:
+        try:
+            writer.write(payload)
+            await writer.drain()
+            version, status, reason, head_list = await asyncio.wait_for(
+                _read_head(reader), timeouts['read'])
+            break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            conn_pool.discard(writer)
+            if not reused:
+                raise
+            logger.debug('Stale pooled connection to %s, reconnecting', netloc)
+            reader, writer, reused = await asyncio.wait_for(conn_pool.checkout(key),
+                timeouts['connect'])
+        except BaseException:
+            conn_pool.discard(writer)
+            raise
+    try:
+        body, will_close = await _read_body(_TimedReader(reader, timeouts['read']),
+            method, status, head_list)
+    except BaseException:
+        conn_pool.discard(writer)
+        raise
+    if will_close or version == 'HTTP/1.0':
+        conn_pool.discard(writer)
+    else:
+        conn_pool.checkin(key, reader, writer)
+    return AsyncResponse(status, reason, head_list, body)
+
+async def _wait_for_limiter(bucket, need_token, need_slot):
+    """
+    Wait on a rate limiter without blocking the event loop or a thread. Nothing
+    is taken till the limiter says yes, so a task cancelled while it waits
+    holds no slot.
+    """
+    start = time.monotonic()
+    waited = None
+    pause = 0.001
+    while True:
+        wait = bucket.poll(need_token, need_slot, waited)
+        if wait == 0:
+            return
+        if wait is None:
+            # no way to be told of a release from another thread, check back
+            # sooner at first and then less often
+            wait = pause
+            pause = min(pause * 2, 0.05)
+        await asyncio.sleep(wait)
+        waited = time.monotonic() - start
+
+# pylint: disable=R0912 # each way an attempt can end is handled in the retry loop
+async def _request(method, url, data, headers, config):
+    """
+    Send a request with the retry and rate limit settings from config
+    Returns:
+        AsyncResponse of the last attempt
+    """
+    policy = net.retry_policy(config)
+    bucket = net.rate_limiter(config)
+    timeouts = net.request_timeouts(config)
+    expires = None
+    if timeouts['budget'] is not None:
+        expires = time.monotonic() + timeouts['budget']
+    conn_pool = default_pool()
+    await _wait_for_limiter(bucket, False, True)
+    try:
+        attempt = 1
+        while True:
+            await _wait_for_limiter(bucket, True, False)
+            remaining = None if expires is None else expires - time.monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError()
+                response = await asyncio.wait_for(
+                    _exchange(conn_pool, method, url, data, headers, timeouts), remaining)
+            except asyncio.TimeoutError as err:
+                # not an OSError before python 3.11, report it as a socket timeout
+                failure = urllib.error.URLError(socket.timeout('timed out'))
+                if attempt >= policy['max-attempts'] or remaining is not None \
+                        or not net.may_resend(method, policy, failure.reason):
+                    raise failure from err
+                retry_after = None
+                reason = 'timed out'
+            except (OSError, asyncio.IncompleteReadError) as err:
+                failure = urllib.error.URLError(err)
+                if attempt >= policy['max-attempts'] \
+                        or not net.may_resend(method, policy, err):
+                    raise failure from err
+                retry_after = None
+                reason = str(err)
+            else:
+                failure = None
+                if 200 <= response.status < 300 \
+                        or response.status not in policy['statuses'] \
+                        or attempt >= policy['max-attempts']:
+                    return response
+                retry_after = net.parse_retry_after(response.getheader('Retry-After'))
+                reason = f'HTTP {response.status}'
+            delay = net.retry_delay(attempt, policy, retry_after)
+            if expires is not None and delay >= expires - time.monotonic():
+                # no time left to retry in
+                if failure is None:
+                    return response
+                raise failure
+            logger.warning(" %s failed with %s on attempt %d of %d, retrying in %.2fs",
+                url, reason, attempt, policy['max-attempts'], delay)
+            await asyncio.sleep(delay)
+            attempt = attempt + 1
+    finally:
+        bucket.release()
+
+def _other_transport(config):
+    """True if config names a transport other then the default"""
+    return net.transport_for(config) is not transport.lookup()
+
+async def _in_thread(func, *args):
+    """Run a blocking call on the default executor of the running loop"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+def _to_json(response, include_headers):
+    """
+    Convert a response into the same objects returned by cmr.util.network
+    Parameters:
+        response(AsyncResponse): response to convert
+        include_headers(bool): True to add http-headers to a 200 response
+    """
+    if not 200 <= response.status < 300:
+        return {'code': response.status,
+            'reason': response.reason,
+            'errors': [response.reason]}
+    head_list = {}
+    for head in response.getheaders():
+        head_list[head[0]] = head[1]
+    raw_response = response.body.decode('utf-8')
+    if response.status == 200:
+        obj_json = json.loads(raw_response)
+        if isinstance(obj_json, list):
+            obj_json = {"hits": len(obj_json), "items" : obj_json}
+        if include_headers:
+            obj_json['http-headers'] = head_list
+    elif response.status == 204:
+        obj_json = {'http-headers': head_list}
+    else:
+        if raw_response.startswith("{") and raw_response.endswith("}"):
+            return json.loads(raw_response)
+        return raw_response
+    return obj_json
+
+def _headers(accept, headers):
+    """Merge the default headers with those from the caller"""
+    merged = {'Accept-Encoding': net.ACCEPT_ENCODING}
+    if accept is not None:
+        merged['Accept'] = accept
+    for key, value in common.always(headers).items():
+        if value is not None and len(value) > 0:
+            # later values win no matter the case used for the name
+            for existing in [name for name in merged if name.lower() == key.lower()]:
+                del merged[existing]
+            merged[key] = value
+    return merged
+
+# ******************************************************************************
+# public functions
+
+# document-it: {"from":"cmr.util.network.post"}
+async def post(url, body, accept = None, headers = None, config: dict = None):
+    """
+    Make an HTTP POST to CMR without blocking the event loop
+    Parameters:
+        url (string): resource to post to
+        body (dictionary): parameters to send, or string if raw text to be sent
+        accept (string): encoding of the returned data
+        headers (dictionary): HTTP headers to apply
+        config (dictionary): configurations, see cmr.util.network.retry_policy()
+    Returns:
+        same as cmr.util.network.post()
+    """
+    if _other_transport(config):
+        return await _in_thread(net.post, url, body, accept, headers, config)
+    if isinstance(body, str):
+        data = body
+    else:
+        data = net.expand_query_to_parameters(body)
+    data = data.encode('utf-8')
+    logger.debug(" Headers->CMR= %s", headers)
+    try:
+        response = await _request('POST', url, data, _headers(accept, headers), config)
+        return _to_json(response, True)
+    except urllib.error.URLError as exception:
+        if not net.is_timeout(exception):
+            raise
+        return net.timeout_error(exception)
+    except zlib.error as exception:
+        return net.decode_error(exception)
+
+# document-it: {"from":"cmr.util.network.get"}
+async def get(url, accept = None, headers = None, config: dict = None):
+    """
+    Make an HTTP GET to CMR without blocking the event loop
+    Parameters:
+        url (string): resource to get
+        accept (string): encoding of the returned data
+        headers (dictionary): HTTP headers to apply
+        config (dictionary): configurations, see cmr.util.network.retry_policy()
+    Returns:
+        same as cmr.util.network.get()
+    """
+    if _other_transport(config):
+        return await _in_thread(net.get, url, accept, headers, config)
+    logger.debug(" Headers->CMR= %s", headers)
+    try:
+        response = await _request('GET', url, None, _headers(accept, headers), config)
+        return _to_json(response, False)
+    except urllib.error.URLError as exception:
+        if not net.is_timeout(exception):
+            raise
+        return net.timeout_error(exception)
+    except zlib.error as exception:
+        return net.decode_error(exception)
+
+def pool_stats():
+    """Report on the connection pool for the running event loop"""
+    return default_pool().stats()
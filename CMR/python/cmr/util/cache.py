@@ -0,0 +1,332 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+A two tier cache of HTTP responses for cmr.util.network
+date: 2026-10-17
+since: 0.1
+
+The same searches are often run over and over by many users or at the start of
+every job. Responses are kept in a small in memory LRU cache which is backed by
+an optional directory of files that is trimmed to a maximum size, least
+recently used first. Entries are keyed by method, URL, body, and the headers
+which change what CMR returns. Stored responses keep their ETag and
+Last-Modified values so that the next request can ask CMR to send a 304 instead
+of the whole body.
+
+    request_key()
+        req - urllib.request.Request
+    cache_for()
+        directory - where to write files, None for memory only
+        memory_entries - number of responses to keep in memory
+        max_bytes - largest size of the directory
+    CachedResponse
+        entry - a stored response, readable like http.client.HTTPResponse
+"""
+
+from collections import OrderedDict
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logging.basicConfig(level = logging.ERROR)
+logger = logging.getLogger('cmr.util.cache')
+
+KEY_HEADERS = ['accept', 'authorization', 'echo-token', 'cmr-search-after']
+""" Request headers which change the response and so are part of the key """
+
+SKIP_HEADERS = ['cmr-scroll-id']
+""" Requests with these headers depend on server state and are never cached """
+
+DROP_HEADERS = ['connection', 'content-encoding', 'content-length', 'keep-alive',
+    'transfer-encoding']
+""" Response headers which do not apply to a stored and decoded body """
+
+# ******************************************************************************
+# entries
+
+def request_key(req):
+    """
+    Build the cache key for a request
+    Parameters:
+        req (urllib.request.Request): request about to be sent
+    Returns:
+        hex digest, or None if the request should not be cached
+    """
+    if req.get_method() not in ['GET', 'POST']:
+        return None
+    headers = {name.lower(): value for name, value in req.header_items()}
+    if any(name in headers for name in SKIP_HEADERS):
+        return None
+    digest = hashlib.sha256()
+    digest.update(req.get_method().encode('utf-8') + b'\n')
+    digest.update(req.full_url.encode('utf-8') + b'\n')
+    for name in KEY_HEADERS:
+        digest.update(f'{name}: {headers.get(name, "")}\n'.encode('utf-8'))
+    data = req.data if req.data is not None else b''
+    digest.update(data if isinstance(data, bytes) else str(data).encode('utf-8'))
+    return digest.hexdigest()
+
+def make_entry(status, headers, body, now = None):
+    """
+    Build an entry for a response which has already been read and decoded
+    Parameters:
+        status (int): HTTP status
+        headers (list): tuples of header name and value
+        body (bytes): decoded body
+        now (float): time stored, defaults to time.time()
+    Returns:
+        dictionary with status, headers, body, etag, last-modified, and stored
+    """
+    kept = [(name, value) for name, value in headers if name.lower() not in DROP_HEADERS]
+    found = {name.lower(): value for name, value in kept}
+    return {'status': status,
+        'headers': kept,
+        'body': body,
+        'etag': found.get('etag'),
+        'last-modified': found.get('last-modified'),
+        'stored': time.time() if now is None else now}
+
+def validators(entry):
+    """Headers which ask the server to send a 304 if the entry is still good"""
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last-modified'):
+        headers['If-Modified-Since'] = entry['last-modified']
+    return headers
+
+class CachedResponse():
+    """A stored entry which can be read like an http.client.HTTPResponse"""
+    def __init__(self, entry):
+        self.status = entry['status']
+        self.headers = list(entry['headers'])
+        self._body = io.BytesIO(entry['body'])
+
+    def read(self, amt = None):
+        """Return the next amt bytes of the body"""
+        return self._body.read(amt)
+
+    def getheaders(self):
+        """Return the headers as a list of tuples"""
+        return self.headers
+
+    def close(self):
+        """Nothing is held open"""
+        self._body.close()
+
+# ******************************************************************************
+# tiers
+
+class MemoryCache():
+    """A thread safe least recently used cache with a fixed number of entries"""
+    def __init__(self, max_entries = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Find an entry, marking it as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        """Add an entry, dropping the least recently used ones when full"""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(0, self.max_entries):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+class DiskCache():
+    """
+    Entries saved as files in a directory, one per key. A file is a line of JSON
+    describing the response followed by the body. Reading a file marks it as
+    recently used and the directory is trimmed to max_bytes after each write.
+    """
+    def __init__(self, directory, max_bytes = 100 * 1024 * 1024):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        """File for a key"""
+        return os.path.join(self.directory, key + '.cache')
+
+    def get(self, key):
+        """Read an entry, None if there is not one or it can not be read"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                meta = json.loads(file.readline().decode('utf-8'))
+                body = file.read()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        meta['headers'] = [tuple(header) for header in meta['headers']]
+        meta['body'] = body
+        return meta
+
+    def put(self, key, entry):
+        """Write an entry, replacing any older one, then trim the directory"""
+        meta = {name: value for name, value in entry.items() if name != 'body'}
+        line = json.dumps(meta).encode('utf-8') + b'\n'
+        try:
+            handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as file:
+                file.write(line)
+                file.write(entry['body'])
+            os.replace(temp_path, self._path(key))
+        except OSError as err:
+            logger.warning("Could not write cache entry %s: %s", key, err)
+            return
+        self.trim()
+
+    def trim(self):
+        """Delete the least recently used files till the directory fits in max_bytes"""
+        with self._lock:
+            files = []
+            total = 0
+            with os.scandir(self.directory) as listing:
+                for item in listing:
+                    if item.name.endswith('.cache') and item.is_file():
+                        stat = item.stat()
+                        files.append((stat.st_mtime, stat.st_size, item.path))
+                        total = total + stat.st_size
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total = total - size
+                except OSError:
+                    pass # already gone
+
+    def clear(self):
+        """Delete every entry"""
+        with self._lock:
+            with os.scandir(self.directory) as listing:
+                for item in listing:
+                    if item.name.endswith('.cache'):
+                        os.remove(item.path)
+
+class HttpCache():
+    """
+    Memory tier in front of an optional disk tier. Entries found on disk are
+    copied into memory, new entries are written to both.
+    """
+    def __init__(self, memory_entries = 256, directory = None, max_bytes = 100*1024*1024):
+        self.memory = MemoryCache(memory_entries)
+        self.disk = None if directory is None else DiskCache(directory, max_bytes)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0}
+
+    def update(self, memory_entries = None, max_bytes = None):
+        """Change the size limits"""
+        if memory_entries is not None:
+            self.memory.max_entries = memory_entries
+        if max_bytes is not None and self.disk is not None:
+            self.disk.max_bytes = max_bytes
+
+    def get(self, key):
+        """Find an entry in memory, then on disk"""
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.put(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        """Save an entry to all tiers"""
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            self.disk.put(key, entry)
+        self.count('stored')
+
+    def count(self, name):
+        """Add one to a statistic: hits, misses, revalidated, or stored"""
+        with self._lock:
+            self._stats[name] = self._stats[name] + 1
+
+    def clear(self):
+        """Forget all entries in all tiers"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """Counts of hits, misses, revalidated, and stored responses"""
+        with self._lock:
+            report = dict(self._stats)
+        report['memory-entries'] = len(self.memory)
+        return report
+
+# ******************************************************************************
+# process wide caches, one per directory
+
+_lock = threading.Lock()
+_caches = {}
+
+def cache_for(directory = None, memory_entries = None, max_bytes = None):
+    """
+    Find or create the shared cache for a directory, limits given are applied
+    to the cache and stay in effect for later calls
+    Parameters:
+        directory (string): where to keep files, None for memory only
+        memory_entries (int): responses to keep in memory
+        max_bytes (int): largest size of the directory
+    Returns:
+        HttpCache
+    """
+    with _lock:
+        if directory not in _caches:
+            _caches[directory] = HttpCache(directory=directory)
+        store = _caches[directory]
+    store.update(memory_entries, max_bytes)
+    return store
+
+def stats():
+    """Report on each of the caches"""
+    with _lock:
+        caches = dict(_caches)
+    return {directory: store.stats() for directory, store in caches.items()}
+
+def reset():
+    """Forget all caches, files on disk are left alone, used by tests"""
+    with _lock:
+        _caches.clear()
@@ -21,8 +21,13 @@ since 0.0
 """
 
 import os
+import re
 import subprocess
-from datetime import datetime
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+_TIME_PATTERN = re.compile(r'(\d{4}-\d\d-\d\d)(?:[T ](\d\d:\d\d(?::\d\d)?)(?:\.(\d+))?)?'
+    r'(Z|[+-]\d\d:?\d\d)?')
 
 def conj(coll, to_add):
     """
@@ -118,6 +123,23 @@ def write_file(path, text):
         cache.write(text)
         cache.close()
 
+def replace_file(path, text):
+    """
+    Write a file by writing a temporary file next to it and then renaming it,
+    so the file is never found half written, even if the process is stopped
+    Parameters:
+        path (string): path to file to write
+        text (string): content for file
+    """
+    path = os.path.expanduser(path)
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+        suffix='.tmp')
+    with os.fdopen(handle, 'w', encoding='utf-8') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
 def execute_command(cmd):
     """
     A utility method to execute a shell command and return a string of the output
@@ -176,3 +198,34 @@ def now():
     return the current time in a function that can be patched away for testing
     """
     return datetime.now()
+
+def parse_time(text):
+    """
+    Read an ISO 8601 date, as CMR writes them, without needing
+    datetime.fromisoformat(). Fractions of a second past microseconds are
+    dropped and dates without a timezone are taken to be UTC.
+    Parameters:
+        text (string): date like 2020-01-31T12:00:00.000Z, or just 2020-01-31
+    Returns:
+        timezone aware datetime, or None if text is blank or can not be read
+    """
+    if text is None:
+        return None
+    match = _TIME_PATTERN.fullmatch(str(text).strip())
+    if match is None:
+        return None
+    day, clock, fraction, zone = match.groups()
+    clock = clock or '00:00:00'
+    try:
+        when = datetime.strptime(day + 'T' + clock,
+            '%Y-%m-%dT%H:%M:%S' if len(clock) > 5 else '%Y-%m-%dT%H:%M')
+    except ValueError:
+        return None
+    if fraction:
+        when = when.replace(microsecond=int(fraction[:6].ljust(6, '0')))
+    offset = timedelta(0)
+    if zone and zone != 'Z':
+        digits = zone[1:].replace(':', '')
+        offset = timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+        offset = -offset if zone[0] == '-' else offset
+    return when.replace(tzinfo=timezone(offset)).astimezone(timezone.utc)
@@ -0,0 +1,368 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+An in process stand in for CMR search, for tests and benchmarks
+date: 2026-10-17
+since: 0.1
+
+FakeCmr is a cmr.util.transport.Transport which answers collection and granule
+searches with generated UMM-JSON records instead of going over the network.
+Every record is built from its position in the result set, so the same search
+always returns the same records. Paging by page_num, offset, CMR-Scroll-Id,
+and CMR-Search-After all work, as does page_size=0 for a count of hits.
+Record n covers the hour starting n hours after EPOCH and one point on the
+globe, so searches with a temporal range or bounding_box find only the records
+which overlap them. Polygons are not understood and match everything. Record n
+was last revised at the start of its hour unless given another revision, and
+updated_since finds the records revised since then. Granules can be spread over
+a number of collections, granule n being in collection n modulo that number,
+and are then found by collection_concept_id. Records of the kind searched for
+can be found by their concept_id.
+
+    fake = fakecmr.FakeCmr(hits=5000, latency=0.05)
+    transport.register('fake', fake)
+    collection.search({'provider': 'FAKE'}, limit=5000, config={'transport': 'fake'})
+
+Errors can be injected by request number or at random to exercise retries:
+
+    FakeCmr(errors={2: 503, 3: 503}, retry_after=1)
+    FakeCmr(error_rate=0.1, seed=42)
+"""
+
+import collections
+import datetime
+import email.message
+import io
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+
+from cmr.util import common
+from cmr.util import transport
+
+# ******************************************************************************
+
+EPOCH = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+""" Date of the first generated record, each record after it is one hour later """
+
+class FakeResponse():
+    """A response with the parts of http.client.HTTPResponse used by the network module"""
+    def __init__(self, body: bytes, status: int = 200, headers = ()):
+        self.status = status
+        self.reason = 'OK' if status == 200 else 'No Content'
+        self.headers = list(headers)
+        self._body = io.BytesIO(body)
+        self.closed = False
+
+    def read(self, amt = None):
+        """Read amt bytes of the body, or all that is left"""
+        return self._body.read(amt)
+
+    def getheaders(self):
+        """Headers as a list of name, value tuples"""
+        return self.headers
+
+    def getheader(self, name, default = None):
+        """Value of one header"""
+        for key, value in self.headers:
+            if key.lower() == name.lower():
+                return value
+        return default
+
+    def close(self):
+        """Mark the response as done"""
+        self.closed = True
+
+def _http_error(url, status, message, headers):
+    """Build the exception urlopen() raises for a status other then 2xx"""
+    hdrs = email.message.Message()
+    for key, value in headers:
+        hdrs[key] = value
+    body = json.dumps({'errors': [message]}).encode('utf-8')
+    return urllib.error.HTTPError(url, status, message, hdrs, io.BytesIO(body))
+
+def _date(index):
+    """Date of the record at index as CMR would write it"""
+    return (EPOCH + datetime.timedelta(hours=index)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+def location(index):
+    """Longitude and latitude of the point covered by the record at index"""
+    return -180 + (index * 37) % 360 + 0.5, -90 + (index * 7) % 179 + 0.5
+
+def _inside(box, index):
+    """True if the record at index is in a bounding_box, which may cross the antimeridian"""
+    west, south, east, north = [float(value) for value in box.split(',')]
+    longitude, latitude = location(index)
+    if not south <= latitude <= north:
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east
+
+def _collection_id(index, collection_count, provider = 'FAKE'):
+    """Concept id of the collection holding the granule at index"""
+    return f'C{1000000000 + index % collection_count}-{provider}'
+
+# pylint: disable=R0913,R0914,R0917 # each way a record can be left out
+def _matching(params, hits, revised = None, deleted = (), collection_count = None,
+        provider = 'FAKE', prefix = None):
+    """
+    Find the records a search matches, every record matches unless the search
+    has a temporal range, bounding boxes, or updated_since. Record n covers the
+    hour starting n hours after EPOCH and the point at location(n).
+    Parameters:
+        params (dictionary): search parameters, each a list of values
+        hits (int): number of records, before any are deleted
+        revised (dictionary): index to the revision id and date of records
+            revised since they were made
+        deleted (set): indexes of records which are no longer found
+        collection_count (int): number of collections the granules are spread over
+        provider (string): provider id used in concept ids
+        prefix (string): first letter of the concept ids of the kind searched
+            for, concept_id values with another prefix are not looked at
+    Returns:
+        range or list of record indexes
+    """
+    found = range(hits)
+    ids = [value for value in params.get('concept_id', [])
+        if value.startswith(prefix or '?') and value.endswith(f'-{provider}')]
+    if ids:
+        wanted = {int(value[1:].split('-')[0]) - 1000000000 for value in ids}
+        found = [index for index in sorted(wanted) if index in found]
+    if deleted:
+        found = [index for index in found if index not in deleted]
+    if 'temporal' in params:
+        hour = datetime.timedelta(hours=1)
+        start, end = (params['temporal'][0].split(',') + [''])[:2]
+        start, end = common.parse_time(start), common.parse_time(end)
+        first = 0 if start is None else math.ceil((start - EPOCH) / hour) - 1
+        last = hits if end is None else math.floor((end - EPOCH) / hour)
+        found = found[max(0, first):max(0, last + 1)]
+    for box in params.get('bounding_box', []):
+        found = [index for index in found if _inside(box, index)]
+    if collection_count and 'collection_concept_id' in params:
+        wanted = set(params['collection_concept_id'])
+        found = [index for index in found
+            if _collection_id(index, collection_count, provider) in wanted]
+    since = common.parse_time(params.get('updated_since', [''])[0])
+    if since is not None:
+        # revision dates which can not be read count as the oldest
+        found = [index for index in found
+            if (common.parse_time(_revision(index, revised)[1]) or EPOCH) >= since]
+    return found
+
+def _revision(index, revised = None):
+    """Revision id and date of the record at index"""
+    return (revised or {}).get(index, (1, _date(index)))
+
+# pylint: disable=R0913,R0917 # each part of a record which can be changed
+def make_item(kind: str, index: int, provider: str = 'FAKE', revised: dict = None,
+        collection_count: int = None):
+    """
+    Build the UMM-JSON record found at an index in the result set
+    Parameters:
+        kind (string): collections or granules
+        index (int): zero based position of the record
+        provider (string): provider id used in the concept id
+        revised (dictionary): index to the revision id and date of records
+            revised since they were made
+        collection_count (int): number of collections granules are spread over,
+            None to leave collection-concept-id out of granules
+    Returns:
+        dictionary with meta and umm sections
+    """
+    revision_id, revision_date = _revision(index, revised)
+    granule = kind == 'granules'
+    prefix = 'G' if granule else 'C'
+    meta = {'concept-type': 'granule' if granule else 'collection',
+        'concept-id': f'{prefix}{1000000000 + index}-{provider}',
+        'revision-id': revision_id,
+        'native-id': f'fake-{kind}-{index}',
+        'provider-id': provider,
+        'format': 'application/vnd.nasa.cmr.umm+json',
+        'revision-date': revision_date}
+    temporal = {'BeginningDateTime': _date(index), 'EndingDateTime': _date(index + 1)}
+    longitude, latitude = location(index)
+    if granule and collection_count:
+        meta['collection-concept-id'] = _collection_id(index, collection_count, provider)
+    if granule:
+        umm = {'GranuleUR': f'FAKE_GRANULE_{index}',
+            'CollectionReference': {'ShortName': 'FAKE', 'Version': '1'},
+            'TemporalExtent': {'RangeDateTime': temporal},
+            'SpatialExtent': {'HorizontalSpatialDomain': {'Geometry': {
+                'Points': [{'Longitude': longitude, 'Latitude': latitude}]}}}}
+    else:
+        umm = {'ShortName': f'FAKE_{index}',
+            'Version': '1',
+            'EntryTitle': f'Fake collection number {index}',
+            'TemporalExtents': [{'RangeDateTimes': [temporal]}],
+            'SpatialExtent': {'HorizontalSpatialDomain': {'Geometry': {
+                'BoundingRectangles': [{'WestBoundingCoordinate': longitude,
+                    'EastBoundingCoordinate': longitude,
+                    'NorthBoundingCoordinate': latitude,
+                    'SouthBoundingCoordinate': latitude}]}}}}
+    return {'meta': meta, 'umm': umm}
+
+# ******************************************************************************
+
+# pylint: disable=R0902 # one attribute per setting
+class FakeCmr(transport.Transport):
+    """
+    Answers CMR searches in process, see the module documentation
+    """
+    # pylint: disable=R0913,R0917 # each setting is a keyword with a default
+    def __init__(self, hits = 100, latency = 0, errors = None, error_rate = 0,
+            error_status = 503, retry_after = None, seed = None, provider = 'FAKE',
+            sleep = time.sleep, revised = None, deleted = (), collection_count = None):
+        """
+        Parameters:
+            hits (int): records found by every search, or a lambda which takes
+                the kind (collections or granules) and the parameters of the
+                request, as a dictionary of lists, and returns the hits
+            latency (float): seconds to wait before answering each request, or
+                a lambda like hits which returns the seconds
+            errors (dictionary): request number, counting from 1, to the HTTP
+                status to fail that request with
+            error_rate (float): chance, 0 to 1, that any request fails
+            error_status (int): HTTP status used for random errors
+            retry_after (string): Retry-After header to send with errors
+            seed (int): seed for the random errors, so runs can be repeated
+            provider (string): provider id used in concept ids
+            sleep: lambda used to wait out the latency, replaceable in tests
+            revised (dictionary): index to a tuple of the revision id and
+                revision date of records which have changed, can be updated
+                between searches
+            deleted (set): indexes of records which are no longer found, can
+                be updated between searches
+            collection_count (int): number of collections granules are spread
+                over, found by collection_concept_id, None for no collections
+        """
+        self.hits = hits
+        self.latency = latency
+        self.errors = dict(errors or {})
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.provider = provider
+        self.sleep = sleep
+        self.revised = dict(revised or {})
+        self.deleted = set(deleted)
+        self.collection_count = collection_count
+        self.requests = collections.deque(maxlen=1000)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._scrolls = {}
+        self._stats = {'requests': 0, 'errors': 0, 'items': 0, 'scrolls-opened': 0}
+
+    def urlopen(self, req, timeout = None, read_timeout = None):
+        """Answer a request as CMR would, see Transport.urlopen()"""
+        url = urllib.parse.urlsplit(req.full_url)
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1].split('.')[0]
+        params = urllib.parse.parse_qs(url.query)
+        text = req.data or b''
+        text = text if isinstance(text, str) else text.decode('utf-8')
+        if not text.startswith('{'):
+            for key, values in urllib.parse.parse_qs(text).items():
+                params[key] = params.get(key, []) + values
+        headers = {key.lower(): value for key, value in req.header_items()}
+
+        with self._lock:
+            self._stats['requests'] = self._stats['requests'] + 1
+            number = self._stats['requests']
+            self.requests.append({'method': req.get_method(), 'endpoint': endpoint,
+                'params': params, 'headers': headers})
+            status = self.errors.get(number)
+            if status is None and self.error_rate > 0 \
+                    and self._random.random() < self.error_rate:
+                status = self.error_status
+            if status is not None:
+                self._stats['errors'] = self._stats['errors'] + 1
+
+        latency = self.latency(endpoint, params) if callable(self.latency) else self.latency
+        if latency > 0:
+            self.sleep(latency)
+        if status is not None:
+            extra = [] if self.retry_after is None else [('Retry-After', str(self.retry_after))]
+            raise _http_error(req.full_url, status, f'Injected error {status}', extra)
+        if endpoint == 'clear-scroll':
+            with self._lock:
+                self._scrolls.pop(str(json.loads(text or '{}').get('scroll_id')), None)
+            return FakeResponse(b'', 204)
+        if endpoint not in ('collections', 'granules'):
+            raise _http_error(req.full_url, 404, f'Unknown end point {endpoint}', [])
+        return self._search(endpoint, params, headers)
+
+    def _search(self, kind, params, headers):
+        """Build one page of search results"""
+        def first(name, default):
+            return int(params.get(name, [default])[0])
+
+        found = _matching(params,
+            self.hits(kind, params) if callable(self.hits) else self.hits,
+            self.revised, self.deleted, self.collection_count, self.provider,
+            'G' if kind == 'granules' else 'C')
+        hits = len(found)
+        page_size = first('page_size', 10)
+        offset = first('offset', (first('page_num', 1) - 1) * page_size)
+        response_headers = []
+
+        scroll_id = headers.get('cmr-scroll-id')
+        with self._lock:
+            if scroll_id is not None:
+                if scroll_id not in self._scrolls:
+                    raise _http_error('', 404, f'Scroll session [{scroll_id}] does not exist',
+                        [])
+                offset = self._scrolls[scroll_id]
+            elif params.get('scroll', ['false'])[0] == 'true':
+                self._stats['scrolls-opened'] = self._stats['scrolls-opened'] + 1
+                scroll_id = str(self._stats['scrolls-opened'])
+            if 'cmr-search-after' in headers:
+                offset = json.loads(headers['cmr-search-after'])[0] + 1
+            count = min(page_size, max(0, hits - offset))
+            if scroll_id is not None:
+                self._scrolls[scroll_id] = offset + count
+                response_headers.append(('CMR-Scroll-Id', scroll_id))
+            self._stats['items'] = self._stats['items'] + count
+
+        items = [make_item(kind, index, self.provider, self.revised,
+                self.collection_count)
+            for index in found[offset:offset+count]]
+        if count > 0:
+            response_headers.append(('CMR-Search-After', json.dumps([offset + count - 1])))
+        response_headers = [('Content-Type', 'application/vnd.nasa.cmr.umm_results+json'),
+            ('CMR-Hits', str(hits)),
+            ('CMR-Took', '1')] + response_headers
+        body = json.dumps({'hits': hits, 'took': 1, 'items': items}).encode('utf-8')
+        return FakeResponse(body, 200, response_headers)
+
+    def stats(self):
+        """
+        Report on the requests answered
+        Returns:
+            dictionary with counts of requests, injected errors, items served,
+            scroll sessions opened, and scroll sessions not yet cleared
+        """
+        with self._lock:
+            report = dict(self._stats)
+            report['scrolls'] = len(self._scrolls)
+        return report
@@ -0,0 +1,261 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Parse the items out of a JSON response while it is still being downloaded
+date: 2026-10-17
+since: 0.1
+
+CMR search results are one JSON object holding a few small fields, like hits
+and took, and one long list of items. Rather then holding the bytes, the text,
+and the parsed objects of a whole page in memory, ItemStream finds the edges of
+each item as the text arrives and parses them one at a time. Only the current
+item and the last chunk read are held in memory.
+
+    ItemStream
+        chunks - iterable of bytes, as read from the network
+        array - name of the top level list to stream, defaults to items
+        headers - HTTP headers to hand back with the other fields
+"""
+
+import codecs
+import json
+import re
+
+# ******************************************************************************
+# scanning patterns
+
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[\s,}\]]')
+_NON_SPACE = re.compile(r'\S')
+
+_COMPACT_SIZE = 32 * 1024
+""" Consumed characters to allow in the buffer before dropping them """
+
+# ******************************************************************************
+# item stream
+
+# pylint: disable=R0902 # parser state plus the fields found so far
+class ItemStream():
+    """
+    Iterate over the items of a JSON object as the text arrives. All other top
+    level fields are kept in `fields` and are complete once iteration ends,
+    fields which come before the array are available as soon as the first item
+    is returned. A body which is not a JSON object is kept as text in `raw`.
+    Malformed JSON raises a ValueError. An ItemStream can be iterated once.
+    """
+    def __init__(self, chunks, array = 'items', headers = None, encoding = 'utf-8'):
+        """
+        Parameters:
+            chunks: iterable of bytes
+            array(string): name of the top level list to stream
+            headers(dictionary): HTTP headers, returned by result()
+            encoding(string): text encoding of the bytes
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self.array = array
+        self.headers = headers
+        self.fields = {}
+        self.raw = None
+        self.count = 0
+
+    def __iter__(self):
+        return self._parse()
+
+    def result(self):
+        """
+        Top level fields, and any HTTP headers as http-headers, in the same form
+        as network.post() but without the items
+        """
+        found = dict(self.fields)
+        if self.headers is not None:
+            found['http-headers'] = self.headers
+        return found
+
+    def close(self):
+        """Stop reading, closing the source of the chunks if it can be closed"""
+        self._eof = True
+        if hasattr(self._chunks, 'close'):
+            self._chunks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # **************************************************************************
+    # buffer management
+
+    def _fill(self):
+        """Add the next chunk to the buffer, returning False at the end of the body"""
+        while not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._decoder.decode(b'', final=True)
+            else:
+                text = self._decoder.decode(chunk)
+            if len(text) > 0:
+                self._buf = self._buf + text
+                return True
+        return False
+
+    def _compact(self):
+        """Drop text which has already been parsed, only safe between values"""
+        if self._pos > _COMPACT_SIZE:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+
+    def _peek(self):
+        """Skip white space and return the next character, '' at the end"""
+        while True:
+            match = _NON_SPACE.search(self._buf, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buf[self._pos]
+            self._pos = len(self._buf)
+            if not self._fill():
+                return ''
+
+    def _expect(self, allowed):
+        """Consume the next character, which must be one of allowed"""
+        char = self._peek()
+        if char == '' or char not in allowed:
+            found = 'end of data' if char == '' else repr(char)
+            raise ValueError(f"Expecting one of {allowed!r} but found {found}")
+        self._pos = self._pos + 1
+        return char
+
+    # **************************************************************************
+    # values
+
+    # pylint: disable=R0912 # one branch per token kind keeps the scan in one loop
+    def _scan(self, start, in_string):
+        """
+        Find the end of the object, list, or string which starts at start
+        Returns:
+            index just past the end of the value
+        """
+        depth = 0 if in_string else 1
+        pos = start + 1
+        while True:
+            pattern = _STRING_END if in_string else _STRUCTURE
+            match = pattern.search(self._buf, pos)
+            if match is None:
+                pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of data inside a value")
+                continue
+            found = match.group()
+            pos = match.end()
+            if in_string:
+                if found == '\\':
+                    # the escaped character may not have arrived yet
+                    while pos >= len(self._buf):
+                        if not self._fill():
+                            raise ValueError("Unexpected end of data inside a string")
+                    pos = pos + 1
+                else:
+                    in_string = False
+                    if depth == 0:
+                        return pos
+            elif found == '"':
+                in_string = True
+            elif found in '{[':
+                depth = depth + 1
+            else:
+                depth = depth - 1
+                if depth == 0:
+                    return pos
+
+    def _value(self):
+        """Parse the next complete JSON value"""
+        char = self._peek()
+        start = self._pos
+        if char == '':
+            raise ValueError("Unexpected end of data, expecting a value")
+        if char in '{[':
+            end = self._scan(start, False)
+        elif char == '"':
+            end = self._scan(start, True)
+        else:
+            while True:
+                match = _SCALAR_END.search(self._buf, start)
+                if match is not None:
+                    end = match.start()
+                    break
+                if not self._fill():
+                    end = len(self._buf)
+                    break
+        self._pos = end
+        return json.loads(self._buf[start:end])
+
+    # **************************************************************************
+    # structure
+
+    def _parse(self):
+        """Generator walking the top level object, the source is closed when done"""
+        try:
+            yield from self._object()
+        finally:
+            self.close()
+
+    def _object(self):
+        """Generator over the streamed items of the top level object"""
+        if self._peek() != '{':
+            # not a JSON object, keep the text for the caller to report on
+            while self._fill():
+                pass
+            self.raw = self._buf[self._pos:].strip()
+            return
+        self._pos = self._pos + 1
+        if self._peek() == '}':
+            self._pos = self._pos + 1
+            return
+        while True:
+            self._compact()
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expecting a field name but found {key!r}")
+            self._expect(':')
+            if key == self.array and self._peek() == '[':
+                yield from self._items()
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',}') == '}':
+                return
+
+    def _items(self):
+        """Generator over the values of the streamed array"""
+        self._pos = self._pos + 1
+        if self._peek() == ']':
+            self._pos = self._pos + 1
+            return
+        while True:
+            self._compact()
+            item = self._value()
+            self.count = self.count + 1
+            yield item
+            if self._expect(',]') == ']':
+                return
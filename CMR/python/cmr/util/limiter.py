@@ -0,0 +1,233 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Client side rate limiting shared by every thread in the process
+date: 2026-10-17
+since: 0.1
+
+CMR throttles clients which send too many requests at once. Rather then bursting
+and then waiting out a 429, callers can smooth out their requests with a token
+bucket per CMR environment. Each bucket limits both the request rate and the
+number of requests in flight.
+
+    configure()
+        env - CMR environment: '' for production, 'uat', 'sit', 'localhost'
+        rate - requests per second, None for no limit
+        burst - requests which may be sent at once after a quiet period
+        in_flight - max concurrent requests, None for no limit
+    bucket_for()
+        env - CMR environment
+    stats()
+        wait counts and times for each environment
+"""
+
+import threading
+import time
+
+# ******************************************************************************
+# token bucket
+
+# pylint: disable=R0902 # limits, bucket state, and stats are all needed
+class TokenBucket():
+    """
+    A thread safe token bucket with an optional cap on concurrent requests.
+    Tokens are added at `rate` per second up to `burst`, each request takes one.
+    Limits may be changed while the bucket is in use.
+    """
+    def __init__(self, rate = None, burst = None, in_flight = None, clock = time.monotonic):
+        """
+        Parameters:
+            rate(float): tokens added per second, None for no rate limit
+            burst(int): bucket size, defaults to one second worth of tokens
+            in_flight(int): max requests between hold() and release, None for no limit
+            clock: lambda returning seconds, replaced in tests
+        """
+        self._clock = clock
+        self._cond = threading.Condition()
+        self.rate = None
+        self.burst = None
+        self.in_flight = None
+        self._settings = None
+        self._tokens = 0.0
+        self._stamp = clock()
+        self._active = 0
+        self._stats = {'requests': 0, 'waits': 0, 'wait-time': 0.0}
+        self.update(rate, burst, in_flight)
+
+    def update(self, rate = None, burst = None, in_flight = None):
+        """Change the limits, waiting threads will see the new values"""
+        with self._cond:
+            if self._settings == (rate, burst, in_flight):
+                return
+            self._settings = (rate, burst, in_flight)
+            self._refill(self._clock())
+            was_limited = self.rate is not None
+            self.rate = None if rate is None or rate <= 0 else float(rate)
+            if self.rate is None:
+                self.burst = None
+            else:
+                self.burst = max(1.0, float(burst if burst is not None else self.rate))
+                # a new limit starts with a full bucket
+                self._tokens = min(self._tokens, self.burst) if was_limited else self.burst
+            self.in_flight = None if in_flight is None or in_flight < 1 else int(in_flight)
+            self._cond.notify_all()
+
+    def limits(self):
+        """Return the current limits as a tuple of (rate, burst, in_flight)"""
+        with self._cond:
+            return (self.rate, self.burst, self.in_flight)
+
+    def _refill(self, now):
+        """Add the tokens earned since the last call, lock must be held"""
+        if self.rate is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _try_acquire(self, need_token, need_slot, waited):
+        """
+        Take a token and/or an in flight slot if they are free, lock must be held
+        Returns:
+            0 when taken, None when waiting on a release, else seconds till a token
+        """
+        self._refill(self._clock())
+        if need_slot and self.in_flight is not None and self._active >= self.in_flight:
+            return None
+        if need_token and self.rate is not None and self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        if need_token:
+            if self.rate is not None:
+                self._tokens = self._tokens - 1
+            self._stats['requests'] = self._stats['requests'] + 1
+        if need_slot:
+            self._active = self._active + 1
+        if waited is not None:
+            self._stats['waits'] = self._stats['waits'] + 1
+            self._stats['wait-time'] = self._stats['wait-time'] + waited
+        return 0
+
+    def _acquire(self, need_token, need_slot):
+        """Wait for a token and/or an in flight slot, returning seconds waited"""
+        start = self._clock()
+        waited = None
+        with self._cond:
+            while True:
+                wait = self._try_acquire(need_token, need_slot, waited)
+                if wait == 0:
+                    return waited or 0
+                self._cond.wait(wait)
+                waited = self._clock() - start
+
+    def poll(self, need_token = True, need_slot = False, waited = None):
+        """
+        Take a token and/or an in flight slot without waiting, for callers like
+        asyncio which can not block a thread while they wait
+        Parameters:
+            need_token(bool): take a token, as take() does
+            need_slot(bool): take an in flight slot, call release() when done
+            waited(float): seconds the caller has waited so far, None if it has not
+        Returns:
+            0 when taken, None when waiting on a release, else seconds till a token
+        """
+        with self._cond:
+            return self._try_acquire(need_token, need_slot, waited)
+
+    def take(self):
+        """
+        Wait till a request may be sent under the rate limit
+        Returns:
+            seconds spent waiting
+        """
+        return self._acquire(True, False)
+
+    def hold(self):
+        """
+        Wait for an in flight slot, call release() when the request is done
+        Returns:
+            seconds spent waiting
+        """
+        return self._acquire(False, True)
+
+    def release(self):
+        """Give back an in flight slot taken with hold()"""
+        with self._cond:
+            self._active = max(0, self._active - 1)
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.hold()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def stats(self):
+        """Report on requests and how long they waited"""
+        with self._cond:
+            report = dict(self._stats)
+            report['in-flight'] = self._active
+            report['rate'] = self.rate
+            report['in-flight-limit'] = self.in_flight
+        return report
+
+# ******************************************************************************
+# process wide buckets, one per CMR environment
+
+_lock = threading.Lock()
+_buckets = {}
+
+def bucket_for(env: str = ''):
+    """
+    Find or create the shared bucket for a CMR environment, new buckets have
+    no limits till configure() is called
+    Parameters:
+        env(string): CMR environment, '' for production
+    Returns:
+        TokenBucket
+    """
+    env = env if env is not None else ''
+    with _lock:
+        if env not in _buckets:
+            _buckets[env] = TokenBucket()
+        return _buckets[env]
+
+def configure(env: str = '', rate = None, burst = None, in_flight = None):
+    """
+    Set the limits for all requests to one CMR environment
+    Parameters:
+        env(string): CMR environment, '' for production
+        rate(float): requests per second, None for no limit
+        burst(int): requests allowed at once after a quiet period
+        in_flight(int): max concurrent requests, None for no limit
+    Returns:
+        the updated TokenBucket
+    """
+    bucket = bucket_for(env)
+    bucket.update(rate, burst, in_flight)
+    return bucket
+
+def stats():
+    """Report on each of the buckets"""
+    with _lock:
+        buckets = dict(_buckets)
+    return {env: bucket.stats() for env, bucket in buckets.items()}
+
+def reset():
+    """Forget all buckets, used by tests"""
+    with _lock:
+        _buckets.clear()
@@ -19,18 +19,83 @@
 """
 date 2020-11-05
 since 0.0
+
+Requests are sent over keep-alive connections from cmr.util.pool, use
+pool_stats() to see how connections are being reused.
+
+Responses are requested with gzip or deflate compression and are inflated as
+they are read, use transfer_stats() to see how many bytes crossed the wire
+compared to how many were decoded.
+
+Requests which fail with a transient error (429, 502, 503, 504, or a network
+error) are retried with capped exponential backoff and jitter, honoring any
+Retry-After header sent by the server. A network error after a request may
+have reached CMR is only retried for requests which can safely be sent twice,
+GETs and searches. See retry_policy() for the settings.
+
+Requests give up on connecting after timeout.connect seconds and on any one
+read after timeout.read seconds, timeout.budget caps the total time including
+retries. Requests which time out return an error dictionary, see
+request_timeouts() for the settings.
+
+Every request waits on the process wide rate limiter for its CMR environment
+from cmr.util.limiter, see rate_limiter() for the settings.
+
+Responses to requests which are marked as cacheable, as searches are, can be
+kept in memory or on disk and revalidated with CMR using cmr.util.cache, see
+response_cache() for the settings.
+
+Threads which send the same request at the same time can share one call to
+CMR, see flight_stats(). Set coalesce to True in config to turn this on, it is
+only safe for requests which read and do not change anything, like searches.
+
+post_stream() returns before the body is read so that the items of a large
+search page can be parsed one at a time with cmr.util.jsonstream.
+
+Requests are handed to the transport named by the transport config setting,
+see transport_for() and cmr.util.transport. Tests and benchmarks can use the
+in process CMR from cmr.util.fakecmr in place of the network.
 """
 
+import copy
+import email.utils
+import http.client
 import json
 import logging
+import random
+import socket
+import threading
+import time
 import urllib.parse
 import urllib.request
+import zlib
 
+from cmr.util import cache
 from cmr.util import common
+from cmr.util import jsonstream
+from cmr.util import limiter
+from cmr.util import pool
+from cmr.util import singleflight
+from cmr.util import transport
 
 logging.basicConfig(level = logging.ERROR)
 logger = logging.getLogger('cmr.util.network')
 
+READ_CHUNK_SIZE = 64 * 1024
+""" Number of compressed bytes to read from the socket at a time """
+
+ACCEPT_ENCODING = 'gzip, deflate'
+""" Content encodings which post() and get() can decode """
+
+RETRY_STATUSES = [429, 502, 503, 504]
+""" HTTP status codes which are considered transient and worth retrying """
+
+_flights = singleflight.Group()
+
+_transfer_lock = threading.Lock()
+_transfer_totals = {'requests': 0, 'bytes-received': 0, 'bytes-decoded': 0}
+_thread_transfers = threading.local()
+
 def get_local_ip():
     """Rewrite this stub, it is used in code not checked in yet """
     return '127.0.0.1'
@@ -124,16 +189,477 @@ def config_to_header(config, source_key, headers, destination_key=None, default=
         headers[destination_key] = value
     return headers
 
-def post(url, body, accept=None, headers=None):
+# document-it: {"key":"env", "default":"", "msg":"uat, ops, prod, production, or blank for ops"}
+def config_to_env(config: dict = None):
     """
-    Make a basic HTTP call to CMR using the POST action
+    Find the CMR environment named in a config dictionary
     Parameters:
-        url (string): resource to get
-        body (dictionary): parameters to send, or string if raw text to be sent
-        accept (string): encoding of the returned data, some form of json is expected
-        client_id (string): name of the client making the (not python or curl)
-        headers (dictionary): HTTP headers to apply
+        config (dictionary): responds to:
+            * env - sit, uat, ops, prod, production, or blank for production
+    Returns:
+        'sit', 'uat', 'localhost', or '' for production
+    """
+    env = common.always(config).get('env', '')
+    if env is None:
+        env = ''
+    env = env.strip().lower()
+    if env not in ['sit', 'uat', 'localhost']:
+        env = ''
+    return env
+
+# document-it: {"key":"limit.rate", "default":"None", "msg":"requests per second"}
+# document-it: {"key":"limit.burst", "default":"None", "msg":"defaults to one second of requests"}
+# document-it: {"key":"limit.in-flight", "default":"None", "msg":"max concurrent requests"}
+# document-it: {"from":".config_to_env"}
+def rate_limiter(config: dict = None):
+    """
+    Find the process wide rate limiter for the CMR environment in config. The
+    limiter is shared by all threads, limits given in config are applied to it
+    and stay in effect for later calls to the same environment.
+    Parameters:
+        config (dictionary): responds to:
+            * limit.rate - requests per second, None for no limit
+            * limit.burst - requests allowed at once after a quiet period
+            * limit.in-flight - max concurrent requests, None for no limit
+    Returns:
+        cmr.util.limiter.TokenBucket
+    """
+    config = common.always(config)
+    bucket = limiter.bucket_for(config_to_env(config))
+    if any(key in config for key in ['limit.rate', 'limit.burst', 'limit.in-flight']):
+        bucket.update(config.get('limit.rate'),
+            config.get('limit.burst'),
+            config.get('limit.in-flight'))
+    return bucket
+
+def _header_value(resp, name):
+    """Find a response header without regard to case, None if not found"""
+    name = name.lower()
+    for key, value in resp.getheaders():
+        if key.lower() == name:
+            return value
+    return None
+
+def _decompressor(encoding):
+    """
+    Create a zlib decompressor for a Content-Encoding value
+    Returns:
+        decompressobj, or None if the content is not encoded
+    """
+    encoding = common.always(encoding, str).strip().lower()
+    if encoding in ['gzip', 'x-gzip']:
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompressobj(zlib.MAX_WBITS)
+    return None
+
+def _record_transfer(stats):
+    """Add the byte counts from one request to the running totals"""
+    totals = getattr(_thread_transfers, 'totals', None)
+    if totals is None:
+        totals = _thread_transfers.totals = {'requests': 0, 'bytes-received': 0,
+            'bytes-decoded': 0}
+    totals['requests'] = totals['requests'] + 1
+    for key in ['bytes-received', 'bytes-decoded']:
+        totals[key] = totals[key] + stats[key]
+    with _transfer_lock:
+        _transfer_totals['requests'] = _transfer_totals['requests'] + 1
+        for key in ['bytes-received', 'bytes-decoded']:
+            _transfer_totals[key] = _transfer_totals[key] + stats[key]
+
+class BodyDecoder():
+    """
+    Decode a response body one chunk at a time as it comes off the socket,
+    inflating gzip or deflate content, so that the compressed copy of the body
+    is never held in memory. Bytes are counted before and after decoding.
+    """
+    def __init__(self, encoding: str = None):
+        """
+        Parameters:
+            encoding(string): value of the Content-Encoding header, if any
+        """
+        self.encoding = common.always(encoding, str).strip().lower()
+        self._decompressor = _decompressor(self.encoding)
+        self._received = 0
+        self._decoded = 0
+
+    def is_encoded(self):
+        """True if the body needs to be inflated"""
+        return self._decompressor is not None
+
+    def feed(self, chunk):
+        """
+        Decode the next chunk of the body
+        Parameters:
+            chunk(bytes): raw bytes as read from the network
+        Returns:
+            decoded bytes, which may be empty
+        """
+        if self._decompressor is None:
+            decoded = chunk
+        else:
+            try:
+                decoded = self._decompressor.decompress(chunk)
+            except zlib.error:
+                if self._received > 0 or self.encoding != 'deflate':
+                    raise
+                # some servers send a raw deflate stream without the zlib header
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                decoded = self._decompressor.decompress(chunk)
+        self._received = self._received + len(chunk)
+        self._decoded = self._decoded + len(decoded)
+        return decoded
+
+    def finish(self):
+        """
+        Flush out any remaining data and add this body to the transfer stats
+        Returns:
+            the last of the decoded bytes
+        """
+        decoded = b''
+        if self._decompressor is not None:
+            decoded = self._decompressor.flush()
+            self._decoded = self._decoded + len(decoded)
+            logger.debug(" %s response of %d bytes decoded to %d bytes",
+                self.encoding, self._received, self._decoded)
+        _record_transfer(self.stats())
+        return decoded
+
+    def stats(self):
+        """Bytes received (bytes-received) and the number after decoding (bytes-decoded)"""
+        return {'bytes-received': self._received, 'bytes-decoded': self._decoded}
+
+def read_body(resp):
+    """
+    Read the full body of a response, inflating gzip or deflate content one
+    chunk at a time as it comes off the socket.
+    Parameters:
+        resp: response from urlopen()
+    Returns:
+        tuple of the body as bytes and a dictionary with the number of bytes
+        received (bytes-received) and the number after decoding (bytes-decoded)
+    """
+    decoder = BodyDecoder(_header_value(resp, 'Content-Encoding'))
+    if decoder.is_encoded():
+        parts = []
+        chunk = resp.read(READ_CHUNK_SIZE)
+        while chunk:
+            parts.append(decoder.feed(chunk))
+            chunk = resp.read(READ_CHUNK_SIZE)
+        parts.append(decoder.finish())
+        body = b''.join(parts)
+    else:
+        body = decoder.feed(resp.read())
+        decoder.finish()
+    return body, decoder.stats()
+
+# document-it: {"key":"retry.max-attempts", "default":"3", "msg":"1 turns off retries"}
+# document-it: {"key":"retry.backoff-base", "default":"0.5", "msg":"seconds"}
+# document-it: {"key":"retry.backoff-cap", "default":"30", "msg":"seconds"}
+# document-it: {"key":"retry.jitter", "default":"True"}
+# document-it: {"key":"retry.statuses", "default":"[429, 502, 503, 504]"}
+# document-it: {"key":"retry.idempotent", "default":"None", "msg":"True for GETs and searches"}
+def retry_policy(config: dict = None):
+    """
+    Build the retry settings used by post() and get() from a config dictionary
+    Parameters:
+        config (dictionary): responds to:
+            * retry.max-attempts - total tries for one request, 1 means no retries
+            * retry.backoff-base - seconds to wait after the first failure
+            * retry.backoff-cap - longest backoff in seconds between attempts,
+              a Retry-After from the server is waited out in full as long as
+              it fits in timeout.budget
+            * retry.jitter - randomize waits to keep clients from retrying in step
+            * retry.statuses - list of HTTP status codes which can be retried
+            * retry.idempotent - True if the request can be sent again after a
+              network error which it may have reached CMR before, None to
+              decide by method, where only GET can be, searches set this
+    Returns:
+        dictionary of retry settings
+    """
+    config = common.always(config)
+    return {'max-attempts': max(1, int(config.get('retry.max-attempts', 3))),
+        'backoff-base': max(0.0, float(config.get('retry.backoff-base', 0.5))),
+        'backoff-cap': max(0.0, float(config.get('retry.backoff-cap', 30))),
+        'jitter': bool(config.get('retry.jitter', True)),
+        'statuses': config.get('retry.statuses', RETRY_STATUSES),
+        'idempotent': config.get('retry.idempotent')}
+
+def may_resend(method, policy, reason):
+    """
+    Decide if a request which failed without a response can be sent again
+    Parameters:
+        method (string): HTTP method of the request
+        policy (dictionary): settings from retry_policy()
+        reason: exception which the request failed with
+    Returns:
+        True if the request can be sent again, either because sending it twice
+        does no harm or because it failed before it could have reached CMR
+    """
+    idempotent = policy.get('idempotent')
+    if idempotent is None:
+        idempotent = method == 'GET'
+    return bool(idempotent) or isinstance(reason, (ConnectionRefusedError, socket.gaierror))
+
+def retry_delay(attempt, policy, retry_after = None):
     """
+    Calculate how long to wait before trying again
+    Parameters:
+        attempt (int): the attempt which just failed, starting at 1
+        policy (dictionary): settings from retry_policy()
+        retry_after (float): seconds the server asked for, None if not given
+    Returns:
+        seconds to sleep, the server's request wins over exponential backoff
+    """
+    if retry_after is not None:
+        return retry_after
+    delay = min(policy['backoff-cap'], policy['backoff-base'] * (2 ** (attempt-1)))
+    if policy['jitter']:
+        # "full jitter", spread clients out over the whole window
+        delay = random.uniform(0, delay)
+    return delay
+
+def parse_retry_after(value, now = None):
+    """
+    Convert a Retry-After header, which is either seconds or an HTTP date, into
+    seconds from now
+    Parameters:
+        value (string): header value
+        now (float): current epoch time, defaults to time.time()
+    Returns:
+        non negative seconds or None if the value could not be understood
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+def _status_of(exception):
+    """HTTP status from an HTTPError as an int, some callers build these with strings"""
+    try:
+        return int(exception.code)
+    except (TypeError, ValueError):
+        return None
+
+def _drain(exception):
+    """Read what is left of an error response so the connection can go back to the pool"""
+    if getattr(exception, 'fp', None) is None:
+        return # nothing was sent back, and HTTPError can not read or close without it
+    try:
+        exception.read()
+    except (OSError, ValueError, http.client.HTTPException):
+        pass # the connection will be dropped instead of reused
+    finally:
+        exception.close()
+
+# document-it: {"key":"timeout.connect", "default":"10", "msg":"seconds"}
+# document-it: {"key":"timeout.read", "default":"60", "msg":"seconds"}
+# document-it: {"key":"timeout.budget", "default":"None", "msg":"seconds for all attempts"}
+def request_timeouts(config: dict = None):
+    """
+    Build the timeout settings used by post() and get() from a config dictionary
+    Parameters:
+        config (dictionary): responds to:
+            * timeout.connect - seconds to wait for a connection to CMR
+            * timeout.read - seconds to wait on any one read from CMR
+            * timeout.budget - seconds allowed for the request including all
+              retries, None for no limit. Set by searches with a deadline.
+    Returns:
+        dictionary with connect, read, and budget values
+    """
+    config = common.always(config)
+    return {'connect': config.get('timeout.connect', 10),
+        'read': config.get('timeout.read', 60),
+        'budget': config.get('timeout.budget')}
+
+def _remaining(expires):
+    """Seconds left before expires, None if there is no limit"""
+    if expires is None:
+        return None
+    return expires - time.monotonic()
+
+# document-it: {"key":"transport", "default":"urllib", "msg":"see cmr.util.transport"}
+def transport_for(config: dict = None):
+    """
+    Find the transport which will carry requests for the settings in config
+    Parameters:
+        config (dictionary): responds to:
+            * transport - name of a transport registered with
+              cmr.util.transport.register(), or a Transport object
+    Returns:
+        cmr.util.transport.Transport, raises ValueError for unknown names
+    """
+    name = common.always(config).get('transport', transport.DEFAULT)
+    if isinstance(name, str):
+        return transport.lookup(name)
+    return name
+
+def _open(req, timeouts, expires, sender = None):
+    """Open a request with timeouts no longer then the time remaining"""
+    connect = timeouts['connect']
+    read = timeouts['read']
+    remaining = _remaining(expires)
+    if remaining is not None:
+        if remaining <= 0:
+            raise urllib.error.URLError(socket.timeout('time budget used up'))
+        connect = remaining if connect is None else min(connect, remaining)
+        read = remaining if read is None else min(read, remaining)
+    sender = sender if sender is not None else transport.lookup()
+    #pylint: disable=R1732 # the mock code does not support this in tests
+    return sender.urlopen(req, timeout=connect, read_timeout=read)
+
+def _send(req, policy, bucket = None, timeouts = None, sender = None):
+    """
+    Open a request, retrying transient failures as described by the policy.
+    Errors which can not be retried, or which are still failing after the last
+    attempt, are raised to the caller just as urlopen() would. No retry is
+    started which could not finish inside the time budget.
+    Parameters:
+        req (urllib.request.Request): request to send, it may be sent many times
+        policy (dictionary): settings from retry_policy()
+        bucket (TokenBucket): rate limiter to wait on before each attempt
+        timeouts (dictionary): settings from request_timeouts()
+        sender (Transport): transport to open the request with, None for the default
+    Returns:
+        response object from urlopen()
+    """
+    timeouts = timeouts if timeouts is not None else request_timeouts()
+    expires = None
+    if timeouts['budget'] is not None:
+        expires = time.monotonic() + timeouts['budget']
+    attempt = 1
+    while True:
+        if bucket is not None:
+            bucket.take()
+        try:
+            return _open(req, timeouts, expires, sender)
+        except urllib.error.HTTPError as exception:
+            if attempt >= policy['max-attempts'] \
+                    or _status_of(exception) not in policy['statuses']:
+                raise
+            retry_after = None
+            if exception.headers is not None:
+                retry_after = parse_retry_after(exception.headers.get('Retry-After'))
+            delay = retry_delay(attempt, policy, retry_after)
+            remaining = _remaining(expires)
+            if remaining is not None and delay >= remaining:
+                raise
+            _drain(exception)
+            reason = f'HTTP {exception.code}'
+        except urllib.error.URLError as exception:
+            if attempt >= policy['max-attempts'] \
+                    or not may_resend(req.get_method(), policy, exception.reason):
+                raise
+            delay = retry_delay(attempt, policy)
+            remaining = _remaining(expires)
+            if remaining is not None and delay >= remaining:
+                raise
+            reason = str(exception.reason)
+        logger.warning(" %s failed with %s on attempt %d of %d, retrying in %.2fs",
+            req.full_url, reason, attempt, policy['max-attempts'], delay)
+        time.sleep(delay)
+        attempt = attempt + 1
+
+def is_timeout(exception):
+    """True if an exception from post() or get() was caused by a timeout"""
+    if isinstance(exception, urllib.error.URLError) \
+            and not isinstance(exception, urllib.error.HTTPError):
+        exception = exception.reason
+    return isinstance(exception, socket.timeout)
+
+def timeout_error(exception):
+    """Build an error dictionary for a request which ran out of time"""
+    reason = 'Timed out: ' + str(exception)
+    return {'code': 0, 'reason': reason, 'errors': [reason]}
+
+# document-it: {"key":"cache", "default":"False", "msg":"reuse responses, see cmr.util.cache"}
+# document-it: {"key":"cache.directory", "default":"None", "msg":"None for memory only"}
+# document-it: {"key":"cache.memory-entries", "default":"256"}
+# document-it: {"key":"cache.max-bytes", "default":"104857600", "msg":"size of cache.directory"}
+# document-it: {"key":"cache.max-age", "default":"0", "msg":"seconds before revalidating"}
+# document-it: {"key":"cacheable", "default":"False", "msg":"set by searches"}
+def response_cache(config: dict = None):
+    """
+    Find the process wide response cache to use for the settings in config.
+    Only requests with cacheable set to True in their config go through it,
+    searches set this, as requests which change something must always be sent.
+    Parameters:
+        config (dictionary): responds to:
+            * cache - True to turn on the cache
+            * cache.directory - where to keep responses on disk, None for memory only
+            * cache.memory-entries - number of responses to keep in memory
+            * cache.max-bytes - largest size of cache.directory
+            * cache.max-age - seconds a response can be used before asking CMR
+              if it has changed, 0 to always ask
+    Returns:
+        cmr.util.cache.HttpCache, or None if caching is off
+    """
+    config = common.always(config)
+    if not config.get('cache', False):
+        return None
+    return cache.cache_for(config.get('cache.directory'),
+        config.get('cache.memory-entries'),
+        config.get('cache.max-bytes'))
+
+def _fetch(req, config, bucket):
+    """
+    Send a request and read the body, going through the response cache if it is
+    turned on and the request is cacheable. Stored responses with an ETag or
+    Last-Modified value are sent back to CMR as If-None-Match or
+    If-Modified-Since, and a 304 response is answered from the cache.
+    Returns:
+        tuple of the response and the decoded body as bytes
+    """
+    config = common.always(config)
+    store = response_cache(config) if config.get('cacheable', False) else None
+    key = None if store is None else cache.request_key(req)
+    if key is None:
+        resp = _send(req, retry_policy(config), bucket, request_timeouts(config),
+            transport_for(config))
+        return resp, read_body(resp)[0]
+
+    max_age = config.get('cache.max-age', 0)
+    entry = store.get(key)
+    if entry is not None:
+        if time.time() - entry['stored'] < max_age:
+            store.count('hits')
+            return cache.CachedResponse(entry), entry['body']
+        apply_headers_to_request(req, cache.validators(entry))
+    try:
+        resp = _send(req, retry_policy(config), bucket, request_timeouts(config),
+            transport_for(config))
+    except urllib.error.HTTPError as exception:
+        if exception.code != 304 or entry is None:
+            raise
+        _drain(exception)
+        store.count('revalidated')
+        entry = dict(entry, stored=time.time())
+        store.put(key, entry)
+        return cache.CachedResponse(entry), entry['body']
+    body, _ = read_body(resp)
+    store.count('misses')
+    if resp.status == 200:
+        fresh = cache.make_entry(resp.status, resp.getheaders(), body)
+        if max_age > 0 or cache.validators(fresh):
+            store.put(key, fresh)
+    return resp, body
+
+def decode_error(exception):
+    """Build an error dictionary for a response body which could not be inflated"""
+    reason = 'Could not decode response: ' + str(exception)
+    return {'code': 0, 'reason': reason, 'errors': [reason]}
+
+def _post_request(url, body, accept, headers):
+    """Build a POST request with the body encoded the way CMR expects"""
     if isinstance(body, str):
         #JSON string or other such text passed in"
         data = body
@@ -147,13 +673,105 @@ def post(url, body, accept=None, headers=None):
     logger.debug(" Headers->CMR= %s", headers)
     logger.debug(" POST Data= %s", data)
     req = urllib.request.Request(url, data)
+    apply_headers_to_request(req, {'Accept-Encoding': ACCEPT_ENCODING})
     if accept is not None:
         apply_headers_to_request(req, {'Accept': accept})
     apply_headers_to_request(req, headers)
+    return req
+
+class _BodyChunks():
+    """
+    Iterator over the decoded chunks of a response body. The response is closed
+    and done() is called once, when the body has been read or close() is called.
+    """
+    def __init__(self, resp, decoder, done):
+        self._resp = resp
+        self._decoder = decoder
+        self._done = done
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self._resp is not None:
+            try:
+                chunk = self._resp.read(READ_CHUNK_SIZE)
+                if chunk:
+                    decoded = self._decoder.feed(chunk)
+                else:
+                    decoded = self._decoder.finish()
+                    self.close()
+            except zlib.error as exception:
+                self.close()
+                raise ValueError('Could not decode response: ' + str(exception)) from exception
+            except BaseException:
+                self.close()
+                raise
+            if decoded:
+                return decoded
+        raise StopIteration
+
+    def close(self):
+        """Close the response and report that the body is done with"""
+        resp, self._resp = self._resp, None
+        if resp is not None:
+            try:
+                resp.close()
+            finally:
+                self._done()
+
+# document-it: {"key":"coalesce", "default":"False", "msg":"share identical concurrent requests"}
+def _coalesce(req, config, action):
+    """
+    Run action(req, config) once for all threads sending the same request at the
+    same time, if config asks for it. Requests are the same if they would have
+    the same cache key.
+    The thread which sent the request gets the response, all the others get
+    their own copy of it so that changes made by one caller are not seen by any
+    other.
+    Parameters:
+        req (urllib.request.Request): request to send
+        config (dictionary): responds to:
+            * coalesce - True to share the request, only for requests which
+              do not change anything
+        action: lambda taking the request and config, returning the response
+    Returns:
+        the response from action()
+    """
+    config = common.always(config)
+    key = cache.request_key(req) if config.get('coalesce', False) else None
+    if key is None:
+        return action(req, config)
+    result, shared = _flights.do(key, lambda: action(req, config))
+    return copy.deepcopy(result) if shared else result
+
+# document-it: {"from":".retry_policy"}
+# document-it: {"from":".rate_limiter"}
+# document-it: {"from":".request_timeouts"}
+# document-it: {"from":".response_cache"}
+# document-it: {"from":".transport_for"}
+# document-it: {"from":"._coalesce"}
+def post(url, body, accept=None, headers=None, config: dict = None):
+    """
+    Make a basic HTTP call to CMR using the POST action
+    Parameters:
+        url (string): resource to get
+        body (dictionary): parameters to send, or string if raw text to be sent
+        accept (string): encoding of the returned data, some form of json is expected
+        client_id (string): name of the client making the (not python or curl)
+        headers (dictionary): HTTP headers to apply
+        config (dictionary): configurations, see retry_policy(), rate_limiter(),
+            request_timeouts(), response_cache(), and transport_for()
+    """
+    req = _post_request(url, body, accept, headers)
+    return _coalesce(req, config, _post_response)
+
+def _post_response(req, config):
+    """Send the request built by post() and convert the response"""
+    bucket = rate_limiter(config)
+    bucket.hold()
     try:
-        #pylint: disable=R1732 # the mock code does not support this in tests
-        resp = urllib.request.urlopen(req)
-        response = resp.read()
+        resp, response = _fetch(req, config, bucket)
         raw_response = response.decode('utf-8')
         if resp.status == 200:
             obj_json = json.loads(raw_response)
@@ -181,8 +799,82 @@ def post(url, body, accept=None, headers=None):
         obj_json['reason'] = exception.reason
         obj_json['errors'] = [exception.reason]
         return obj_json
+    except (urllib.error.URLError, socket.timeout) as exception:
+        if not is_timeout(exception):
+            raise
+        return timeout_error(exception)
+    except zlib.error as exception:
+        return decode_error(exception)
+    finally:
+        bucket.release()
 
-def get(url, accept=None, headers=None):
+# document-it: {"from":".retry_policy"}
+# document-it: {"from":".rate_limiter"}
+# document-it: {"from":".request_timeouts"}
+# document-it: {"from":".transport_for"}
+# pylint: disable=R0911 # errors are returned the same way as post()
+def post_stream(url, body, accept=None, headers=None, config: dict = None):
+    """
+    Make a POST call to CMR but return before the body has been read, so that
+    the items of a large response can be parsed and used one at a time. The
+    in flight slot from the rate limiter is held till the stream has been read
+    to the end or closed, so always close() a stream which is not read to the end.
+    Parameters:
+        url (string): resource to get
+        body (dictionary): parameters to send, or string if raw text to be sent
+        accept (string): encoding of the returned data, some form of json is expected
+        headers (dictionary): HTTP headers to apply
+        config (dictionary): configurations, see retry_policy(), rate_limiter(),
+            request_timeouts(), and transport_for()
+    Returns:
+        cmr.util.jsonstream.ItemStream for a 200 response, otherwise the same
+        values post() would return
+    """
+    req = _post_request(url, body, accept, headers)
+    bucket = rate_limiter(config)
+    bucket.hold()
+    try:
+        resp = _send(req, retry_policy(config), bucket, request_timeouts(config),
+            transport_for(config))
+    except urllib.error.HTTPError as exception:
+        bucket.release()
+        return {'code': exception.code,
+            'reason': exception.reason,
+            'errors': [exception.reason]}
+    except urllib.error.URLError as exception:
+        bucket.release()
+        if not is_timeout(exception):
+            raise
+        return timeout_error(exception)
+    except BaseException:
+        bucket.release()
+        raise
+    if resp.status != 200:
+        # small bodies, errors and empty responses, are handled like post()
+        try:
+            response, _ = read_body(resp)
+        except zlib.error as exception:
+            return decode_error(exception)
+        finally:
+            bucket.release()
+        head_list = dict(resp.getheaders())
+        if resp.status == 204:
+            return {'http-headers': head_list}
+        raw_response = response.decode('utf-8')
+        if raw_response.startswith("{") and raw_response.endswith("}"):
+            return json.loads(raw_response)
+        return raw_response
+    decoder = BodyDecoder(_header_value(resp, 'Content-Encoding'))
+    return jsonstream.ItemStream(_BodyChunks(resp, decoder, bucket.release),
+        headers=dict(resp.getheaders()))
+
+# document-it: {"from":".retry_policy"}
+# document-it: {"from":".rate_limiter"}
+# document-it: {"from":".request_timeouts"}
+# document-it: {"from":".response_cache"}
+# document-it: {"from":".transport_for"}
+# document-it: {"from":"._coalesce"}
+def get(url, accept=None, headers=None, config: dict = None):
     """
     Make a basic HTTP call to CMR using the POST action
     Parameters:
@@ -191,16 +883,24 @@ def get(url, accept=None, headers=None):
         accept (string): encoding of the returned data, some form of json is expected
         client_id (string): name of the client making the (not python or curl)
         headers (dictionary): HTTP headers to apply
+        config (dictionary): configurations, see retry_policy(), rate_limiter(),
+            request_timeouts(), response_cache(), and transport_for()
     """
     logger.debug(" Headers->CMR= %s", headers)
     req = urllib.request.Request(url)
+    apply_headers_to_request(req, {'Accept-Encoding': ACCEPT_ENCODING})
     if accept is not None:
         apply_headers_to_request(req, {'Accept': accept})
     apply_headers_to_request(req, headers)
+    return _coalesce(req, config, _get_response)
+
+# pylint: disable=R0912 # one branch per kind of response or error
+def _get_response(req, config):
+    """Send the request built by get() and convert the response"""
+    bucket = rate_limiter(config)
+    bucket.hold()
     try:
-        #pylint: disable=R1732 # the mock code does not support this in tests
-        resp = urllib.request.urlopen(req)
-        response = resp.read()
+        resp, response = _fetch(req, config, bucket)
         raw_response = response.decode('utf-8')
         if resp.status == 200:
             obj_json = json.loads(raw_response)
@@ -232,3 +932,48 @@ def get(url, accept=None, headers=None):
         obj_json['reason'] = exception.reason
         obj_json['errors'] = [exception.reason]
         return obj_json
+    except (urllib.error.URLError, socket.timeout) as exception:
+        if not is_timeout(exception):
+            raise
+        return timeout_error(exception)
+    except zlib.error as exception:
+        return decode_error(exception)
+    finally:
+        bucket.release()
+
+def pool_stats():
+    """
+    Report on the connection pool used by post() and get()
+    Returns:
+        dictionary with counts of created, reused, returned, evicted, and
+        discarded connections along with the idle connections by host
+    """
+    return pool.stats()
+
+def flight_stats():
+    """
+    Report on requests shared between threads by post() and get()
+    Returns:
+        dictionary with the number of calls sent (calls), the number of callers
+        who used the response of another thread (shared), and calls in-flight
+    """
+    return _flights.stats()
+
+def transfer_stats():
+    """
+    Report on the bytes read by post() and get() since the module was loaded
+    Returns:
+        dictionary with the number of requests, the bytes received over the
+        network, and the bytes after any gzip or deflate content was decoded
+    """
+    with _transfer_lock:
+        return dict(_transfer_totals)
+
+def thread_transfer_stats():
+    """
+    Same as transfer_stats() but only counting the requests read by the thread
+    which calls this, so the size of one response can be found by asking before
+    and after it is read, even while other threads are reading responses
+    """
+    return dict(getattr(_thread_transfers, 'totals',
+        {'requests': 0, 'bytes-received': 0, 'bytes-decoded': 0}))
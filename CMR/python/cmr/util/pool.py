@@ -0,0 +1,326 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+A keep-alive connection pool used by cmr.util.network
+date: 2026-10-17
+since: 0.1
+
+The standard `urllib.request.urlopen()` function sends `Connection: close` on
+every request, so each call pays for a new TCP and TLS handshake. This module
+provides urllib handlers which check `http.client` connections out of a shared
+pool and return them when the response has been read, leaving everything else
+in urllib (redirects, proxies, HTTPError) as it was.
+
+    urlopen()
+        req - a urllib.request.Request object
+        timeout - seconds to wait on the socket, None for the system default
+    stats()
+        counts of created, reused, and evicted connections
+"""
+
+import http.client
+import logging
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+logging.basicConfig(level = logging.ERROR)
+logger = logging.getLogger('cmr.util.pool')
+
+# ******************************************************************************
+# pool
+
+class ConnectionPool():
+    """
+    Bounded, thread safe, collection of idle connections. Connections are
+    grouped by a key, normally the scheme and host, and only idle connections
+    are held by the pool, a connection which has been checked out belongs to
+    exactly one caller till it is checked back in.
+    """
+    def __init__(self, max_size = 10, idle_timeout = 60):
+        """
+        Parameters:
+            max_size(int): max number of idle connections to keep per key
+            idle_timeout(float): seconds a connection may sit unused before it is closed
+        """
+        self.max_size = max(0, max_size)
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._stats = {'created': 0, 'reused': 0, 'returned': 0, 'evicted': 0,
+            'discarded': 0}
+
+    def _count(self, name):
+        """Increment a stats counter, caller must hold the lock"""
+        self._stats[name] = self._stats[name] + 1
+
+    def _evict_stale(self, key, now):
+        """Close connections for a key which have been idle too long, lock must be held"""
+        fresh = []
+        for conn, last_used in self._idle.get(key, []):
+            if now - last_used > self.idle_timeout:
+                conn.close()
+                self._count('evicted')
+            else:
+                fresh.append((conn, last_used))
+        self._idle[key] = fresh
+        return fresh
+
+    def checkout(self, key, factory):
+        """
+        Take an idle connection out of the pool or create a new one
+        Parameters:
+            key(tuple): pool partition, normally (scheme, host)
+            factory: lambda taking no parameters which creates a new connection
+        Returns:
+            tuple of (connection, True if the connection was reused)
+        """
+        with self._lock:
+            idle = self._evict_stale(key, time.monotonic())
+            if len(idle) > 0:
+                conn, _ = idle.pop()
+                self._count('reused')
+                return conn, True
+            self._count('created')
+        return factory(), False
+
+    def checkin(self, key, conn):
+        """
+        Return a connection to the pool so it can be used by another request
+        Parameters:
+            key(tuple): pool partition the connection was checked out from
+            conn: the connection
+        """
+        with self._lock:
+            idle = self._evict_stale(key, time.monotonic())
+            if len(idle) < self.max_size:
+                idle.append((conn, time.monotonic()))
+                self._count('returned')
+                return
+            self._count('discarded')
+        conn.close()
+
+    def discard(self, conn):
+        """Close a connection which could not be reused"""
+        with self._lock:
+            self._count('discarded')
+        conn.close()
+
+    def evict_idle(self):
+        """Close all connections which have been idle longer then idle_timeout"""
+        with self._lock:
+            now = time.monotonic()
+            for key in list(self._idle.keys()):
+                if len(self._evict_stale(key, now)) < 1:
+                    del self._idle[key]
+
+    def clear(self):
+        """Close all idle connections"""
+        with self._lock:
+            for connections in self._idle.values():
+                for conn, _ in connections:
+                    conn.close()
+            self._idle = {}
+
+    def stats(self):
+        """
+        Report on pool usage
+        Returns:
+            dictionary of counters plus the number of idle connections by host
+        """
+        with self._lock:
+            report = dict(self._stats)
+            report['idle'] = {f'{key[0]}://{key[1]}': len(value)
+                for key, value in self._idle.items() if len(value) > 0}
+        return report
+
+# ******************************************************************************
+# urllib handlers
+
+class _PooledResponse(http.client.HTTPResponse):
+    """
+    A response which hands its connection back to the pool once the body has
+    been read to the end or the response has been closed
+    """
+    release = None
+
+    def close(self):
+        if self.fp is not None:
+            # closed before the body was read to the end, the rest of the body
+            # is still on the socket so the connection can not be reused
+            self.will_close = True
+        super().close()
+
+    def _close_conn(self):
+        super()._close_conn()
+        release, self.release = self.release, None
+        if release is not None:
+            release(self)
+
+# pylint: disable=R0903 # a mixin, public methods come from the urllib handler
+class _KeepAliveMixin():
+    """Shared logic for the HTTP and HTTPS keep-alive handlers"""
+    pool = None
+
+    def _conn_args(self):
+        """Extra arguments for the connection class"""
+        return {}
+
+    def _new_connection(self, conn_class, req):
+        """Build a connection for the request, honoring any proxy tunnel"""
+        conn = conn_class(req.host, timeout=req.timeout, **self._conn_args())
+        conn.response_class = _PooledResponse
+        # pylint: disable=W0212 # same use as urllib.request.AbstractHTTPHandler
+        if req._tunnel_host:
+            conn.set_tunnel(req._tunnel_host)
+        return conn
+
+    def _release(self, key, conn):
+        """Lambda which puts the connection back in the pool when a response is done"""
+        def release(response):
+            if response.will_close or conn.sock is None:
+                self.pool.discard(conn)
+            else:
+                self.pool.checkin(key, conn)
+        return release
+
+    def keep_alive_open(self, conn_class, req):
+        """
+        Send a request over a pooled connection, like AbstractHTTPHandler.do_open
+        but without forcing the connection closed
+        """
+        if not req.host:
+            raise urllib.error.URLError('no host given')
+        # pylint: disable=W0212 # same use as urllib.request.AbstractHTTPHandler
+        key = (req.type, req.host, req._tunnel_host)
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers = {name.title(): val for name, val in headers.items()}
+
+        # urllib uses a sentinel object when no timeout was given
+        connect_timeout = req.timeout
+        if not isinstance(connect_timeout, (int, float)):
+            connect_timeout = socket.getdefaulttimeout()
+        read_timeout = getattr(req, 'read_timeout', None)
+        if read_timeout is None:
+            read_timeout = connect_timeout
+
+        conn, reused = self.pool.checkout(key, lambda: self._new_connection(conn_class, req))
+        while True:
+            try:
+                if conn.sock is None:
+                    conn.timeout = connect_timeout
+                    conn.connect()
+                conn.sock.settimeout(read_timeout)
+                conn.request(req.get_method(), req.selector, req.data, headers,
+                    encode_chunked=req.has_header('Transfer-encoding'))
+                response = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError) as err:
+                # The server has closed an idle connection, try once more on a
+                # new connection before giving up
+                self.pool.discard(conn)
+                if not reused:
+                    raise urllib.error.URLError(err)
+                logger.debug('Stale pooled connection to %s, reconnecting', req.host)
+                conn, reused = self._new_connection(conn_class, req), False
+            except OSError as err:
+                self.pool.discard(conn)
+                raise urllib.error.URLError(err)
+            except:
+                self.pool.discard(conn)
+                raise
+
+        response.release = self._release(key, conn)
+        response.url = req.get_full_url()
+        response.msg = response.reason
+        return response
+
+class KeepAliveHTTPHandler(_KeepAliveMixin, urllib.request.HTTPHandler):
+    """urllib handler for http:// urls which reuses pooled connections"""
+    def __init__(self, pool: ConnectionPool):
+        super().__init__()
+        self.pool = pool
+
+    def http_open(self, req):
+        """Open an http connection"""
+        return self.keep_alive_open(http.client.HTTPConnection, req)
+
+class KeepAliveHTTPSHandler(_KeepAliveMixin, urllib.request.HTTPSHandler):
+    """urllib handler for https:// urls which reuses pooled connections"""
+    def __init__(self, pool: ConnectionPool, context = None):
+        super().__init__(context=context)
+        self.pool = pool
+        self.context = context
+
+    def _conn_args(self):
+        return {'context': self.context}
+
+    def https_open(self, req):
+        """Open an https connection"""
+        return self.keep_alive_open(http.client.HTTPSConnection, req)
+
+def build_opener(pool: ConnectionPool):
+    """
+    Create a urllib opener which sends all http and https requests through a pool
+    Parameters:
+        pool(ConnectionPool): where connections are kept between requests
+    Returns:
+        urllib.request.OpenerDirector
+    """
+    return urllib.request.build_opener(KeepAliveHTTPHandler(pool),
+        KeepAliveHTTPSHandler(pool))
+
+# ******************************************************************************
+# public functions
+
+_default_pool = ConnectionPool()
+_default_opener = build_opener(_default_pool)
+
+def default_pool():
+    """Return the pool shared by all calls to urlopen()"""
+    return _default_pool
+
+def urlopen(req, timeout = None, read_timeout = None):
+    """
+    Drop in replacement for urllib.request.urlopen() which reuses connections
+    Parameters:
+        req (urllib.request.Request): the request to send
+        timeout (float): seconds to wait for a connection, and for reads if
+            read_timeout is not given, None for the system default
+        read_timeout (float): seconds to wait on any one read from the socket
+    Returns:
+        http.client.HTTPResponse, raises urllib.error.HTTPError as urlopen would
+    """
+    req.read_timeout = read_timeout
+    if timeout is None:
+        return _default_opener.open(req)
+    return _default_opener.open(req, timeout=timeout)
+
+def stats():
+    """Report on the usage of the shared pool"""
+    return _default_pool.stats()
+
+def clear():
+    """Close all idle connections in the shared pool"""
+    _default_pool.clear()
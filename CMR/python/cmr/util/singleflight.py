@@ -0,0 +1,99 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Share one call between threads which ask for the same thing at the same time
+date: 2026-10-17
+since: 0.1
+
+When many threads send the same request at once, only the first one, the
+leader, does the work. The others wait for the leader to finish and are handed
+the same result, or the same exception. Once the call is done the next request
+for the key starts a new call, nothing is cached.
+
+    Group
+        do() - run a function once for all concurrent callers with the same key
+        stats() - number of calls made and the number of callers which shared one
+"""
+
+import threading
+
+# ******************************************************************************
+
+# pylint: disable=R0903 # a record of one call in progress
+class _Call():
+    """One call in progress and the callers waiting on it"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class Group():
+    """A set of calls in progress, one per key"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'calls': 0, 'shared': 0}
+
+    def do(self, key, function):
+        """
+        Run function, unless a call for key is already running in which case
+        wait for that one to finish and use its result
+        Parameters:
+            key: hashable value naming the call
+            function: lambda with no parameters doing the work
+        Returns:
+            tuple of the result and True if the result was given to more then
+            one caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['calls'] = self._stats['calls'] + 1
+            else:
+                call.waiters = call.waiters + 1
+                self._stats['shared'] = self._stats['shared'] + 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.waiters > 0
+            call.done.set()
+        return call.result, shared
+
+    def stats(self):
+        """Report the number of calls made and callers who shared a call"""
+        with self._lock:
+            report = dict(self._stats)
+            report['in-flight'] = len(self._calls)
+        return report
@@ -0,0 +1,120 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Transports which carry the requests made by cmr.util.network
+date: 2026-10-17
+since: 0.1
+
+A transport takes a `urllib.request.Request` and returns a response in the same
+way as `urllib.request.urlopen()`: an object with status, getheaders(), read(),
+and close(), or an urllib.error.HTTPError or URLError. The network module picks
+a transport by the name given in the transport config setting, 'urllib' being
+the default which sends requests over the pooled connections of cmr.util.pool.
+Other transports, like the in process fake in cmr.util.fakecmr, are added with
+register().
+
+    register()
+        name - name used in config
+        transport - a Transport
+    lookup()
+        name - name of a registered transport
+"""
+
+import threading
+
+from cmr.util import pool
+
+# ******************************************************************************
+
+class Transport():
+    """The interface for all transports"""
+
+    def urlopen(self, req, timeout = None, read_timeout = None):
+        """
+        Send a request
+        Parameters:
+            req (urllib.request.Request): request to send
+            timeout (float): seconds to wait for a connection
+            read_timeout (float): seconds to wait on any one read
+        Returns:
+            response like http.client.HTTPResponse, or raises an
+            urllib.error.HTTPError or URLError just as urlopen() would
+        """
+        raise NotImplementedError()
+
+    def stats(self):
+        """Report on the requests sent by this transport"""
+        return {}
+
+class UrllibTransport(Transport):
+    """Send requests to CMR over the keep-alive connections from cmr.util.pool"""
+
+    def urlopen(self, req, timeout = None, read_timeout = None):
+        #pylint: disable=R1732 # the caller closes the response
+        return pool.urlopen(req, timeout=timeout, read_timeout=read_timeout)
+
+    def stats(self):
+        return pool.stats()
+
+# ******************************************************************************
+# registry
+
+DEFAULT = 'urllib'
+""" Name of the transport used when config does not name one """
+
+_lock = threading.Lock()
+_transports = {DEFAULT: UrllibTransport()}
+
+def register(name: str, transport: Transport):
+    """
+    Make a transport available by name to the transport config setting
+    Parameters:
+        name (string): name to use in config
+        transport (Transport): object to send requests with
+    Returns:
+        the transport
+    """
+    with _lock:
+        _transports[name] = transport
+    return transport
+
+def unregister(name: str):
+    """Remove a transport, the default transport can not be removed"""
+    if name != DEFAULT:
+        with _lock:
+            _transports.pop(name, None)
+
+def lookup(name: str = None):
+    """
+    Find a registered transport
+    Parameters:
+        name (string): registered name, None for the default
+    Returns:
+        Transport, raises ValueError if name is not registered
+    """
+    with _lock:
+        found = _transports.get(DEFAULT if name is None else name)
+    if found is None:
+        raise ValueError(f"No transport named '{name}' has been registered")
+    return found
+
+def names():
+    """List the names of all registered transports"""
+    with _lock:
+        return sorted(_transports.keys())
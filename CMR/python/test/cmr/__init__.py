@@ -21,6 +21,7 @@ Created: 2020-10-26
 since: 0.0.0
 """
 
+import io
 import os
 import json
 
@@ -51,10 +52,35 @@ class MockStream():
     def decode(self, _):
         """ Just return the result """
         return self.result
+    def __len__(self):
+        """ Size of the result, as would be done for bytes """
+        return 0 if self.result is None else len(self.result)
     def get_result(self):
         """ return the internal result ; silence PEP8 R0903 """
         return self.result
 
+class MockChunkedResponse():
+    """
+    Mock up a Response which is read a few bytes at a time, like a real
+    `http.client.HTTPResponse`, for code which streams the body.
+    """
+    def __init__(self, body, status=200, headers=()):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.status = status
+        self.headers = headers
+        self.stream = io.BytesIO(body)
+        self.closed = False
+    def read(self, amt=None):
+        """Return the next amt bytes of the body"""
+        return self.stream.read(amt)
+    def close(self):
+        """Record the close"""
+        self.closed = True
+    def getheaders(self):
+        """Return headers"""
+        return self.headers
+
 # note, this read_file() is from cmr.util.common, but it should not be imorted
 # because tests have not proven the file yet
 
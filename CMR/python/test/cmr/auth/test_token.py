@@ -254,7 +254,7 @@ class TestToken(unittest.TestCase):
         test("Bearer None", None, 'nothing given')
         test("Bearer token-here", 'token-here', 'token given')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_read_tokens(self, urlopen_mock):
         """
         Test the read_tokens function, make sure that the data that comes back
@@ -296,7 +296,7 @@ class TestToken(unittest.TestCase):
         result = token.read_tokens(user, token_lambdas, config)
         self.assertEqual('invalid_credentials', result['error'], "check bad response")
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_create_token(self, urlopen_mock):
         """ Test that the code can send a create token request """
 
@@ -324,7 +324,16 @@ class TestToken(unittest.TestCase):
         tokens = token.create_token(user, token_lambdas, config)
         self.assertEqual('invalid_credentials', tokens['error'], 'Bad test')
 
-    @patch('urllib.request.urlopen')
+        # tokens are never shared between threads or resent, even when asked to be
+        with patch('cmr.util.network.post') as post_mock:
+            token.create_token(user, token_lambdas, dict(config, coalesce=True,
+                **{'retry.idempotent': True}))
+            token.delete_token('EDL-UToken-Content', user, [token.token_config],
+                dict(config, coalesce=True))
+        self.assertEqual([(False, False)]*2, [(call[1]['config']['coalesce'],
+            call[1]['config']['retry.idempotent']) for call in post_mock.call_args_list])
+
+    @patch('cmr.util.pool.urlopen')
     def test_delete_token(self, urlopen_mock):
         """ Test that the code can send a delete token request to EDL """
 
@@ -360,7 +369,7 @@ class TestToken(unittest.TestCase):
         tokens = token.delete_token('EDL-UToken-Content', user, token_lambdas, config)
         self.assertEqual('invalid_credentials', tokens['error'], 'Bad test')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     @patch('cmr.auth.token.read_tokens')
     @patch('cmr.auth.token.delete_token')
     @patch('cmr.util.common.now')
@@ -388,7 +397,7 @@ class TestToken(unittest.TestCase):
         tokens = token.fetch_token("tester", [token.token_config], config)
         self.assertEqual('EDL-UToken-Content', tokens, 'access token test')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_fetch_token(self, urlopen_mock):
         """ Test that the code can fetch a token request """
 
@@ -413,7 +422,7 @@ class TestToken(unittest.TestCase):
         tokens = token.fetch_token(user, token_lambdas, config)
         self.assertEqual('invalid_credentials', tokens['error'], 'Bad test')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     @patch('cmr.auth.token.read_tokens')
     def test_fetch_token2(self, readtoken_mock, urlopen_mock):
         """ Test that the code can fetch a token request """
@@ -434,7 +443,7 @@ class TestToken(unittest.TestCase):
         tokens = token.fetch_token(user, token_lambdas, config)
         self.assertEqual('EDL-UToken-Content', tokens, 'access token test')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_fetch_bearer_token(self, urlopen_mock):
         """ Test that the code can fetch a token request """
         user = 'tester'
@@ -457,7 +466,7 @@ class TestToken(unittest.TestCase):
         tokens = token.fetch_bearer_token(user, token_lambdas, config)
         self.assertEqual('invalid_credentials', tokens['error'], 'Bad test')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_fetch_bearer_token_with_password(self, urlopen_mock):
         """ Test that the code can fetch a token request """
 
@@ -468,7 +477,7 @@ class TestToken(unittest.TestCase):
         self.assertEqual('Bearer EDL-UToken-Content', tokens['authorization'], 'access token test')
 
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_use_bearer_token_from_url(self, urlopen_mock):
         """ Follow the path in the use_bearer_token() which pulls from a url """
         # Setup for use bearer token
@@ -478,7 +487,7 @@ class TestToken(unittest.TestCase):
         expected = {'cmr.token.value': 'pass', 'authorization': 'Bearer pass'}
         self.assertEqual(expected, token.use_bearer_token(config=config))
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_token(self, urlopen_mock):
         """ Test that the code can fetch a token request """
         token_lambdas = [token.token_config]
@@ -22,8 +22,15 @@ Author: thomas.a.cherry@nasa.gov - NASA
 Created: 2020-11-30
 """
 
+# pylint: disable=C0302 # one test for each way of paging in cmr.search.common
+
 from unittest.mock import Mock
 from unittest.mock import patch
+import asyncio
+import json
+import socket
+import threading
+import time
 import unittest
 
 import urllib.error as urlerr
@@ -31,6 +38,7 @@ import urllib.error as urlerr
 import test.cmr as tutil
 
 from cmr.util import common
+from cmr.util import fakecmr
 import cmr.search.common as scom
 
 # ******************************************************************************
@@ -40,6 +48,21 @@ def valid_cmr_response(file, status=200, headers=()):
     json_response = common.read_file(file)
     return tutil.MockResponse(json_response, status=status, headers=headers)
 
+def returns(value):
+    """Side effect for a mock of a coroutine function, AsyncMock needs python 3.8"""
+    async def resolved(*_args, **_kwargs):
+        return value
+    return resolved
+
+def run_async(coroutine):
+    """Run a coroutine on a fresh loop, run_async() needs python 3.7"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+# pylint: disable=R0904 # one test per feature of the search API
 class TestSearch(unittest.TestCase):
     """Test suit for Search API"""
 
@@ -74,6 +97,84 @@ class TestSearch(unittest.TestCase):
         test({'concept-id':'C123'}, {'meta':{'concept-id':'C123'}}, "found a concept-id in meta")
         test({'concept-id':'C123'}, {'concept-id':'C123'}, "found a concept-id")
 
+    def test_compile_filters(self):
+        """ Test that a list of filters runs as one function """
+        def add(text):
+            return lambda item: item + text
+        items = ['a', 'b']
+        for count in range(11):
+            filters = [add(str(index)) for index in range(count)]
+            expected = [item + ''.join(str(index) for index in range(count))
+                for item in items]
+            self.assertEqual(expected, scom.apply_filters(filters, items), count)
+            self.assertEqual(expected, list(scom.iter_filters(filters, items)), count)
+            self.assertEqual(expected, scom.apply_filters(scom.compile_filters(filters),
+                items), count)
+
+        self.assertIsNone(scom.compile_filters(None))
+        self.assertIsNone(scom.compile_filters([]))
+        self.assertIs(scom.concept_id_fields, scom.compile_filters(scom.concept_id_fields))
+        self.assertIs(items, scom.apply_filters(None, items))
+        self.assertEqual(['ax', 'bx'], scom.apply_filters(add('x'), items))
+
+        # the lazy form only filters what is asked for
+        seen = []
+        lazy = scom.iter_filters([seen.append, lambda _: len(seen)], iter(items))
+        self.assertEqual([], seen)
+        self.assertEqual(1, next(lazy))
+        self.assertEqual(['a'], seen)
+
+    def test_predicate_filters(self):
+        """ Test that predicate filters drop items, locally or in CMR """
+        items = [fakecmr.make_item('granules', index) for index in range(20)]
+        even = scom.keep_if(lambda item: int(item['meta']['concept-id'][1:11]) % 2 == 0)
+        expected = [f'G{1000000000 + index}-FAKE' for index in range(0, 20, 2)]
+        self.assertEqual(expected, scom.apply_filters([even, scom.concept_id_fields,
+            lambda item: item['concept-id']], items))
+        self.assertEqual(expected, list(scom.iter_filters([scom.meta_fields,
+            scom.keep_if(lambda meta: meta['concept-id'] in expected),
+            lambda meta: meta['concept-id']], items)))
+        self.assertIs(scom.DROPPED, scom.compile_filters(even)(items[1]))
+
+        overlaps = scom.temporal_overlaps('2000-01-01T10:30:00Z', '2000-01-01T12:00:00Z')
+        self.assertEqual(items[10:13], scom.apply_filters(overlaps, items))
+        # ranges which only touch still overlap, as they do in CMR
+        self.assertEqual(items[17:], scom.apply_filters(
+            scom.temporal_overlaps('2000-01-01T18:00:00Z'), items))
+        self.assertEqual(items[:2], scom.apply_filters(
+            scom.temporal_overlaps(end='2000-01-01T01:00:00Z'), items))
+        self.assertEqual(items, scom.apply_filters(scom.provider_is('FAKE'), items))
+        self.assertEqual([], scom.apply_filters(scom.provider_is('OTHER'), items))
+
+        # predicates with a CMR parameter go into the query, unless it has one
+        query, filters = scom.push_down({'provider': 'FAKE'}, [scom.meta_fields, overlaps,
+            scom.provider_is('OTHER'), even])
+        self.assertEqual({'provider': 'FAKE', 'temporal': '2000-01-01T10:30:00Z,'
+            '2000-01-01T12:00:00Z'}, query)
+        self.assertEqual(3, len(filters))
+        self.assertEqual((None, None), scom.push_down(None, None))
+        # an open range at both ends has nothing to send or test
+        self.assertEqual(({}, [scom.all_fields]), scom.push_down({},
+            [scom.temporal_overlaps()]))
+
+        fake = fakecmr.FakeCmr(hits=5000)
+        found = scom.search_by_page('granules', {}, filters=[overlaps,
+            scom.concept_id_fields], page_state=scom.create_page_state(limit=100),
+            config={'transport': fake})
+        self.assertEqual([{'concept-id': f'G{1000000000 + index}-FAKE'}
+            for index in range(10, 13)], found)
+        self.assertEqual(['2000-01-01T10:30:00Z,2000-01-01T12:00:00Z'],
+            fake.requests[0]['params']['temporal'])
+        self.assertEqual(3, fake.stats()['items'])
+
+        # the query already has a temporal range, so the predicate runs locally
+        fake = fakecmr.FakeCmr(hits=5000)
+        found = scom.search_by_page('granules', {'temporal':
+            '2000-01-01T00:00:00Z,2000-01-01T19:00:00Z'}, filters=overlaps,
+            page_state=scom.create_page_state(limit=100), config={'transport': fake})
+        self.assertEqual(items[10:13], found)
+        self.assertEqual(20, fake.stats()['items'])
+
     # pylint: disable=W0212
     def test_next_state(self):
         """Check that the sort by attribute is added correctly"""
@@ -293,34 +394,33 @@ class TestSearch(unittest.TestCase):
             'page_size=10&provider=p01'
         self.assertEqual(expected, result)
 
-        #now test for scrolling
+        #large searches page with search after by default
         page_state = scom.create_page_state(limit=2048)
-
         result = scom._cmr_query_url("search", {'provider':'p01'}, page_state,
             config={'env':'sit'})
         expected = 'https://cmr.sit.earthdata.nasa.gov/search/search?' \
-            'page_size=683&provider=p01&scroll=true'
+            'page_size=683&provider=p01'
         self.assertEqual(expected, result)
 
         #now test for scrolling
         result = scom._cmr_query_url("search", {'provider':'p01'}, page_state,
-            config={'env':'sit'})
+            config={'env':'sit', 'paging': 'scroll'})
         expected = 'https://cmr.sit.earthdata.nasa.gov/search/search?' \
             'page_size=683&provider=p01&scroll=true'
         self.assertEqual(expected, result)
 
         result = scom._cmr_query_url("search", {'provider':'p01'}, page_state,
-            config={})
+            config={'paging': 'scroll'})
         expected = 'https://cmr.earthdata.nasa.gov/search/search?' \
             'page_size=683&provider=p01&scroll=true'
         self.assertEqual(expected, result)
 
-        result = scom._cmr_query_url("search", {}, page_state, config={})
+        result = scom._cmr_query_url("search", {}, page_state, config={'paging': 'scroll'})
         expected = 'https://cmr.earthdata.nasa.gov/search/search?' \
             'page_size=683&scroll=true'
         self.assertEqual(expected, result)
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_scroll(self, urlopen_mock):
         """ Test the scroll clear function to see if it returns an error or not"""
         recorded_file = tutil.resolve_full_path('../data/cmr/common/scroll_good.json')
@@ -333,7 +433,7 @@ class TestSearch(unittest.TestCase):
         result = scom.clear_scroll('0')
         self.assertTrue('errors' in result)
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test__make_search_request(self, urlopen_mock):
         """
         Test the inner function which performs the first half of a search
@@ -347,7 +447,7 @@ class TestSearch(unittest.TestCase):
         self.assertEqual({'http-headers': {}}, response,
             'test that the scroll id code gets touched')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     @patch('cmr.search.common.clear_scroll')
     def test_search_by_page(self, clr_scroll_mock, urlopen_mock):
         """
@@ -364,7 +464,8 @@ class TestSearch(unittest.TestCase):
         urlopen_mock.return_value = valid_cmr_response(recorded_file, 200,
             [('CMR-Scroll-Id','si-01')])
         page_state['CMR-Scroll-Id'] = 'abcd'
-        response = scom.search_by_page('collections', query, page_state=page_state)
+        response = scom.search_by_page('collections', query, page_state=page_state,
+            config={'paging': 'scroll'})
         self.assertEqual(20, len(response), 'assumed page_state')
 
         # error processing 1
@@ -388,7 +489,8 @@ class TestSearch(unittest.TestCase):
         clr_scroll_mock.return_value = {'errors': ['bad scroll id']}
         urlopen_mock.return_value = valid_cmr_response(recorded_file, 200)
         urlopen_mock.side_effect = None
-        response = scom.search_by_page('collections', query, page_state=page_state)
+        response = scom.search_by_page('collections', query, page_state=page_state,
+            config={'paging': 'scroll'})
         self.assertEqual(10, len(response), "bad scroll id")
 
        # takes to long
@@ -399,7 +501,225 @@ class TestSearch(unittest.TestCase):
         response = scom.search_by_page('collections', query, page_state=page_state)
         self.assertEqual(10, len(response), "bad scroll id")
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
+    def test_search_by_page_stream(self, urlopen_mock):
+        """
+        Items are parsed and filtered as they are read when streaming
+        """
+        recorded = tutil.load_relative_file('../data/cmr/search/ten_results_from_ghrc.json')
+        query = {'keyword':'water'}
+        config = {'stream': True}
+
+        urlopen_mock.return_value = tutil.MockChunkedResponse(recorded)
+        expected = scom.search_by_page('collections', query)
+        urlopen_mock.return_value = tutil.MockChunkedResponse(recorded)
+        self.assertEqual(expected, scom.search_by_page('collections', query, config=config))
+
+        urlopen_mock.return_value = tutil.MockChunkedResponse(recorded)
+        response = scom.search_by_page('collections', query,
+            filters=[scom.concept_id_fields], config=config)
+        self.assertEqual(10, len(response))
+        self.assertEqual({'concept-id': 'C179003030-ORNL_DAAC'}, response[0])
+
+        # two pages
+        side_effect = [tutil.MockChunkedResponse(recorded), tutil.MockChunkedResponse(recorded)]
+        urlopen_mock.side_effect = side_effect
+        page_state = scom.create_page_state(limit=20)
+        page_state['page_size'] = 10
+        response = scom.search_by_page('collections', query, page_state=page_state,
+            config=config)
+        self.assertEqual(20, len(response))
+        self.assertTrue(all(resp.closed for resp in side_effect))
+        urlopen_mock.side_effect = None
+
+        # errors
+        urlopen_mock.return_value = tutil.MockChunkedResponse("I'm a tea pot")
+        response = scom.search_by_page('collections', query, config=config)
+        self.assertEqual(['unknown response: I\'m a tea pot'], response['errors'])
+
+        urlopen_mock.return_value = tutil.MockChunkedResponse(recorded[:500])
+        response = scom.search_by_page('collections', query, config=config)
+        self.assertTrue(response['errors'][0].startswith('Could not parse response'))
+
+    @patch('cmr.util.pool.urlopen')
+    def test_search_deadline(self, urlopen_mock):
+        """
+        A search which runs out of time returns what it has found so far
+        """
+        recorded = tutil.load_relative_file('../data/cmr/search/ten_results_from_ghrc.json')
+        query = {'keyword':'water'}
+
+        def make_page_state():
+            page_state = scom.create_page_state(limit=30)
+            page_state['page_size'] = 10
+            return page_state
+
+        urlopen_mock.side_effect = lambda *args, **kwargs: tutil.MockChunkedResponse(recorded)
+        response = scom.search_by_page('collections', query, page_state=make_page_state(),
+            config={'deadline': 60})
+        self.assertEqual(30, len(response))
+        self.assertEqual('complete', response.status)
+        self.assertTrue(urlopen_mock.call_args[1]['timeout'] <= 10)
+
+        # a shorter budget from the caller is kept
+        response = scom.search_by_page('collections', query, page_state=make_page_state(),
+            config={'deadline': 60, 'timeout.budget': 2})
+        self.assertEqual('complete', response.status)
+        self.assertTrue(urlopen_mock.call_args[1]['timeout'] <= 2)
+        page_state = scom.start_pages(make_page_state(), {'deadline': 60})
+        self.assertEqual(2, scom._page_config(page_state, {'timeout.budget': 2})['timeout.budget'])
+        self.assertTrue(scom._page_config(page_state, {'timeout.budget': 600})['timeout.budget']
+            <= 60)
+
+        # the second page is slow and times out once the deadline has passed
+        def slow_second_page(*_, **__):
+            if urlopen_mock.call_count > 1:
+                time.sleep(0.06)
+                raise urlerr.URLError(socket.timeout('timed out'))
+            return tutil.MockChunkedResponse(recorded)
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = slow_second_page
+        response = scom.search_by_page('collections', query, page_state=make_page_state(),
+            config={'deadline': 0.05, 'retry.max-attempts': 1})
+        self.assertEqual(10, len(response))
+        self.assertEqual('deadline', response.status)
+
+        # nothing found in time is an error
+        urlopen_mock.side_effect = urlerr.URLError(socket.timeout('timed out'))
+        response = scom.search_by_page('collections', query, config={'deadline': 0.05,
+            'retry.max-attempts': 1})
+        self.assertTrue(response['errors'][0].startswith('Timed out'))
+
+        # CMR processing time
+        urlopen_mock.side_effect = lambda *args, **kwargs: tutil.MockChunkedResponse(recorded)
+        response = scom.search_by_page('collections', query, page_state=make_page_state(),
+            config={'max-time': 5})
+        self.assertEqual('max-time', response.status)
+
+    def test_search_many_pages(self):
+        """
+        Searches with more pages then the recursion limit are read in a loop,
+        large searches page with search after or a scroll
+        """
+        fake = fakecmr.FakeCmr(hits=3000)
+        page_state = scom.create_page_state(limit=3000)
+        page_state['page_size'] = 2
+        response = scom.search_by_page('granules', {'provider': 'FAKE'},
+            page_state=page_state, config={'transport': fake})
+        self.assertEqual(3000, len(response))
+        self.assertEqual('complete', response.status)
+        self.assertEqual('G1000002999-FAKE', response[-1]['meta']['concept-id'])
+        self.assertEqual(3000, len({item['meta']['concept-id'] for item in response}))
+        # one request per page, each after the first continues from the last
+        self.assertEqual(1500, fake.stats()['requests'])
+        self.assertEqual('[2997]', fake.requests[-1]['headers']['cmr-search-after'])
+        self.assertNotIn('scroll', fake.requests[-1]['params'])
+
+        # or with a scroll
+        fake = fakecmr.FakeCmr(hits=4500)
+        config = {'transport': fake, 'paging': 'scroll'}
+        response = scom.search_by_page('granules', {}, config=config,
+            page_state=scom.create_page_state(limit=4100))
+        self.assertEqual(4100, len({item['meta']['concept-id'] for item in response}))
+        self.assertEqual(1, fake.stats()['scrolls-opened'])
+        self.assertEqual('clear-scroll', fake.requests[-1]['endpoint'])
+
+        # only as many pages as there are hits are asked for
+        fake = fakecmr.FakeCmr(hits=2500)
+        response = scom.search_by_page('granules', {}, config={'transport': fake},
+            page_state=scom.create_page_state(limit=10000))
+        self.assertEqual(2500, len(response))
+        self.assertEqual(2, fake.stats()['requests'])
+        self.assertEqual(0, fake.stats()['scrolls-opened'])
+
+        # streaming consumers are not held to 100000 items
+        self.assertEqual(100000, scom.create_page_state(limit=250000)['limit'])
+        self.assertEqual(250000,
+            scom.create_page_state(limit=250000, max_limit=None)['limit'])
+
+        with self.assertRaises(ValueError):
+            scom.search_by_page('granules', {}, config={'paging': 'page_num'},
+                page_state=scom.create_page_state(limit=4100))
+
+    def test_read_page(self):
+        """Pages can be stepped through one at a time"""
+        fake = fakecmr.FakeCmr(hits=2500)
+        config = {'transport': fake, 'page.target-time': 1}
+        page_state = scom.start_pages(scom.create_page_state(limit=3000), config)
+        self.assertEqual(100, page_state['page_size'], 'adapted pages start small')
+        pages, more = [], True
+        while more:
+            obj_json, page, more = scom.read_page('granules', {}, scom.meta_fields,
+                page_state, config)
+            pages.append(page)
+        self.assertEqual(2500, obj_json['hits'])
+        self.assertEqual(2500, sum(len(page) for page in pages))
+        self.assertEqual('G1000002499-FAKE', pages[-1][-1]['concept-id'])
+        self.assertEqual(len(pages), page_state['page_num'])
+
+        fake = fakecmr.FakeCmr(hits=10, errors={1: 500})
+        obj_json, page, more = scom.read_page('granules', {}, None,
+            scom.create_page_state(), {'transport': fake, 'retry.max-attempts': 1})
+        self.assertEqual((500, None, False), (obj_json['code'], page, more))
+
+    def test_search_after_missing(self):
+        """A search which CMR does not say how to continue is incomplete"""
+        class Forgetful(fakecmr.FakeCmr):
+            """Leaves the search after header off of the second page"""
+            def urlopen(self, req, timeout = None, read_timeout = None):
+                response = super().urlopen(req, timeout, read_timeout)
+                if len(self.requests) == 2:
+                    response.headers = [(key, value) for key, value in response.headers
+                        if key != 'CMR-Search-After']
+                return response
+        with self.assertLogs(scom.logger, level='WARNING') as test_log:
+            response = scom.search_by_page('granules', {}, config={
+                'transport': Forgetful(hits=5000)},
+                page_state=scom.create_page_state(page_size=2000, limit=5000))
+        self.assertEqual('incomplete', response.status)
+        self.assertEqual(2500, len(response), 'pages up to the one without a header')
+        self.assertIn('CMR-Search-After', test_log.output[0])
+
+        # the last page does not need to say how to find the next one
+        response = scom.search_by_page('granules', {}, config={
+            'transport': Forgetful(hits=2500)},
+            page_state=scom.create_page_state(page_size=2000, limit=5000))
+        self.assertEqual('complete', response.status)
+        self.assertEqual(2500, len(response))
+
+    def test_search_parallel(self):
+        """
+        Pages after the first are downloaded at the same time and kept in order
+        """
+        lock = threading.Lock()
+        running = {'now': 0, 'most': 0}
+        def sleep(seconds):
+            with lock:
+                running['now'] = running['now'] + 1
+                running['most'] = max(running['most'], running['now'])
+            time.sleep(seconds)
+            with lock:
+                running['now'] = running['now'] - 1
+
+        fake = fakecmr.FakeCmr(hits=9000, latency=0.02, sleep=sleep)
+        config = {'transport': fake, 'paging': 'parallel', 'paging.workers': 3}
+        response = scom.search_by_page('granules', {}, config=config,
+            page_state=scom.create_page_state(limit=10000))
+        self.assertEqual('complete', response.status)
+        self.assertEqual(9000, len(response))
+        self.assertEqual([fakecmr.make_item('granules', index)['meta']['concept-id']
+            for index in range(9000)], [item['meta']['concept-id'] for item in response])
+        self.assertEqual(['1', '2', '3', '4', '5'],
+            sorted(request['params']['page_num'][0] for request in fake.requests))
+        self.assertTrue(1 < running['most'] <= 3)
+
+        # a page which fails fails the search
+        fake = fakecmr.FakeCmr(hits=9000, errors={3: 400})
+        response = scom.search_by_page('granules', {}, page_state=scom.create_page_state(
+            limit=10000), config={'transport': fake, 'paging': 'parallel'})
+        self.assertEqual(400, response['code'])
+
+    @patch('cmr.util.pool.urlopen')
     def test_experimental_search(self, urlopen_mock):
         """
         def search(query=None, filters=None, limit=None, options=None):
@@ -444,6 +764,241 @@ class TestSearch(unittest.TestCase):
         except AssertionError:
             self.fail('no log entry')
 
+    def test_adaptive_page_size(self):
+        """Pages are resized to take about page.target-time or hold page.target-bytes"""
+        # each granule takes a millisecond to send
+        fake = fakecmr.FakeCmr(hits=2000,
+            latency=lambda kind, params: int(params['page_size'][0]) / 1000)
+        config = {'transport': fake, 'page.target-time': 0.05}
+        found = scom.search_by_page('granules', page_state=scom.create_page_state(limit=2000),
+            config=config)
+        self.assertEqual(2000, len(found))
+        self.assertEqual([fakecmr.make_item('granules', index)['meta']['concept-id']
+            for index in range(2000)], [item['meta']['concept-id'] for item in found])
+        sizes = [int(request['params']['page_size'][0]) for request in fake.requests]
+        self.assertEqual(100, sizes[0])
+        self.assertTrue(all(15 <= size <= 80 for size in sizes[1:-1]), sizes)
+        self.assertEqual(2000, sum(sizes))
+
+        # big records make for small pages
+        fake = fakecmr.FakeCmr(hits=5000)
+        page_state = scom.create_page_state(limit=5000)
+        config = {'transport': fake, 'page.target-bytes': 50000, 'page.first-size': 10}
+        found = list(scom.search_by_page_generator('granules', page_state=page_state,
+            config=config))
+        self.assertEqual(5000, len(found))
+        self.assertEqual(5000, len({item['meta']['concept-id'] for item in found}))
+        sizes = [int(request['params']['page_size'][0]) for request in fake.requests]
+        self.assertEqual([10, 20, 40], sizes[:3])
+        size = len(json.dumps(found[0]))
+        self.assertTrue(all(abs(size * page - 50000) < 10000 for page in sizes[4:-1]),
+            sizes)
+
+        # only the items which came back count towards the limit
+        page_state = {'page_size': 100, 'limit': 150}
+        scom._resize_page(page_state, {'page.target-time': 0.1}, 0.05, 0, 40)
+        self.assertEqual(40, page_state['downloaded'])
+        self.assertEqual(110, page_state['page_size'])
+
+        # other paging modes keep their page size
+        fake = fakecmr.FakeCmr(hits=5000)
+        scom.search_by_page('granules', page_state=scom.create_page_state(limit=5000),
+            config={'transport': fake, 'page.target-time': 0.05, 'paging': 'scroll'})
+        self.assertEqual({1250}, {int(request['params']['page_size'][0])
+            for request in fake.requests if 'page_size' in request['params']})
+
+    def test_count(self):
+        """Counts ask for no items and can be remembered for a while"""
+        scom.clear_counts()
+        fake = fakecmr.FakeCmr(hits=lambda kind, params: len(params.get('keyword', [''])[0]))
+        config = {'transport': fake}
+        self.assertEqual({'hits': 5, 'took': 1}, scom.count('granules', {'keyword': 'water'},
+            config))
+        self.assertEqual(['0'], fake.requests[-1]['params']['page_size'])
+        self.assertEqual(0, fake.stats()['items'])
+
+        # remembered counts are used till they expire
+        config = {'transport': fake, 'count.ttl': 0.2}
+        for _ in range(3):
+            self.assertEqual(4, scom.count('granules', {'keyword': 'fire'}, config)['hits'])
+        self.assertEqual(2, fake.stats()['requests'])
+        scom.count('granules', {'keyword': 'fires'}, config)
+        scom.count('granules', {'keyword': 'fire'}, dict(config, env='uat'))
+        self.assertEqual(4, fake.stats()['requests'])
+        time.sleep(0.25)
+        scom.count('granules', {'keyword': 'fire'}, config)
+        self.assertEqual(5, fake.stats()['requests'])
+        scom.clear_counts()
+
+        # many at once, in order, with errors in place
+        fake = fakecmr.FakeCmr(hits=lambda kind, params: len(params.get('keyword', [''])[0]),
+            errors={3: 400})
+        queries = [{'keyword': 'x' * size} for size in range(10)]
+        found = scom.count_many('collections', queries, {'transport': fake,
+            'count.workers': 1})
+        self.assertEqual([0, 1, None, 3, 4, 5, 6, 7, 8, 9],
+            [result.get('hits') for result in found])
+        self.assertEqual(400, found[2]['code'])
+        self.assertEqual([], scom.count_many('collections', []))
+
+        # a query which raises is an error in its place, not lost with the rest
+        real_count = scom.count
+        def failing_count(base, query, config):
+            if query['keyword'] == 'xx':
+                raise urlerr.URLError(socket.timeout('timed out'))
+            if query['keyword'] == 'xxx':
+                raise ValueError('bad query')
+            return real_count(base, query, config)
+        with patch('cmr.search.common.count', side_effect=failing_count):
+            found = scom.count_many('collections', queries[:5], {'transport': fake})
+        self.assertEqual([0, 1, None, None, 4], [result.get('hits') for result in found])
+        self.assertTrue(found[2]['reason'].startswith('Timed out'))
+        self.assertEqual(['bad query'], found[3]['errors'])
+
+        # a response without took is still a count
+        with patch('cmr.search.common._make_search_request', return_value={'hits': 7}):
+            self.assertEqual({'hits': 7, 'took': 0}, scom.count('collections', {}))
+
+    def test_search_by_page_generator(self):
+        """Pages are read ahead of the caller but no more then prefetch pages"""
+        # for each request, the number of items the caller had been given
+        progress = threading.Condition()
+        consumed = [0]
+        started = []
+        def record(*_):
+            with progress:
+                started.append(consumed[0])
+                progress.notify_all()
+            return 0
+        fake = fakecmr.FakeCmr(hits=500, latency=record)
+        page_state = scom.create_page_state(limit=5000)
+        page_state['page_size'] = 10
+        generator = scom.search_by_page_generator('granules', {'provider': 'FAKE'},
+            page_state=page_state, config={'transport': fake, 'prefetch': 2})
+        first = next(generator)
+        self.assertEqual('G1000000000-FAKE', first['meta']['concept-id'])
+
+        # one page being read, two waiting, and one more downloaded without
+        # the caller asking for anything
+        with progress:
+            consumed[0] = 1
+            self.assertTrue(progress.wait_for(lambda: len(started) >= 4, timeout=10))
+        items = [first]
+        for item in generator:
+            items.append(item)
+            with progress:
+                consumed[0] = consumed[0] + 1
+        self.assertEqual(500, len(items))
+        self.assertEqual([fakecmr.make_item('granules', index)['meta']['concept-id']
+            for index in range(500)], [item['meta']['concept-id'] for item in items])
+        # a page is only asked for once the caller has taken the page four back
+        for number, seen in enumerate(started, 1):
+            self.assertGreaterEqual(seen, (number - 4) * 10, f'request {number}')
+
+        # stopping early stops the downloads
+        fake = fakecmr.FakeCmr(hits=500)
+        page_state = scom.create_page_state(limit=5000)
+        page_state['page_size'] = 10
+        generator = scom.search_by_page_generator('granules', {}, page_state=page_state,
+            config={'transport': fake, 'prefetch': 1})
+        next(generator)
+        generator.close()
+        for thread in threading.enumerate():
+            if thread.name == 'cmr-prefetch':
+                thread.join(10)
+        self.assertGreaterEqual(3, fake.stats()['requests'])
+
+        # errors part way end the iteration with a log entry
+        fake = fakecmr.FakeCmr(hits=500, errors={3: 400})
+        page_state = scom.create_page_state(limit=5000)
+        page_state['page_size'] = 10
+        with self.assertLogs(scom.logger, level='ERROR') as test_log:
+            items = list(scom.search_by_page_generator('granules', {},
+                page_state=page_state, config={'transport': fake}))
+        self.assertEqual(20, len(items))
+        self.assertEqual(["ERROR:cmr.search.common:Error in generator: Injected error 400."],
+            test_log.output)
+
+    def test_search_by_page_generator_overlap(self):
+        """The next page is downloaded while the caller works on the last one"""
+        progress = threading.Condition()
+        started = [0]
+        def record(*_):
+            with progress:
+                started[0] = started[0] + 1
+                progress.notify_all()
+            return 0.01
+        fake = fakecmr.FakeCmr(hits=100, latency=record)
+        page_state = scom.create_page_state(limit=5000)
+        page_state['page_size'] = 10
+        for index, _ in enumerate(scom.search_by_page_generator('granules', {},
+                page_state=page_state, config={'transport': fake})):
+            if index % 10 == 9 and index < 90:
+                # a reader which downloaded each page only when asked would
+                # never see the next request start here
+                page = index // 10 + 1
+                with progress:
+                    self.assertTrue(progress.wait_for(lambda page=page: started[0] > page,
+                        timeout=10), f'page {page}')
+        self.assertEqual(100, fake.stats()['items'])
+
+    @patch('cmr.util.aio.post')
+    def test_search_by_page_async(self, post_mock):
+        """The asyncio search returns the same results as search_by_page()"""
+        recorded_file = tutil.resolve_full_path('../data/cmr/search/ten_results_from_ghrc.json')
+        recorded = json.loads(common.read_file(recorded_file))
+        post_mock.side_effect = returns(recorded)
+        query = {'keyword':'water'}
+
+        response = run_async(scom.search_by_page_async('collections', query))
+        self.assertEqual(10, len(response), 'one page')
+
+        page_state = scom.create_page_state(limit=20)
+        page_state['page_size'] = 10
+        response = run_async(scom.search_by_page_async('collections', query,
+            page_state=page_state))
+        self.assertEqual(20, len(response), 'two pages')
+        self.assertEqual(3, post_mock.call_count)
+
+        post_mock.side_effect = returns({'code': '500', 'reason': 'Server Error',
+            'errors': ['Server Error']})
+        response = run_async(scom.search_by_page_async('collections', query))
+        self.assertEqual(['Server Error'], response['errors'])
+
+    def test_search_by_page_async_transport(self):
+        """The asyncio search uses the transport named in config"""
+        fake = fakecmr.FakeCmr(hits=3000)
+        response = run_async(scom.search_by_page_async('granules', {'keyword': 'water'},
+            page_state=scom.create_page_state(limit=2500), config={'transport': fake}))
+        self.assertEqual(2500, len(response))
+        self.assertEqual([fakecmr.make_item('granules', index)['meta']['concept-id']
+            for index in range(2500)], [item['meta']['concept-id'] for item in response])
+        self.assertTrue(all('cmr-search-after' in request['headers']
+            for request in list(fake.requests)[1:]))
+
+    @patch('cmr.util.aio.post')
+    def test_search_by_page_async_generator(self, post_mock):
+        """The async generator yields items up to the limit"""
+        recorded_file = tutil.resolve_full_path('../data/cmr/search/ten_results_from_ghrc.json')
+        post_mock.side_effect = returns(json.loads(common.read_file(recorded_file)))
+
+        async def consume(page_state):
+            return [item async for item in scom.search_by_page_async_generator(
+                'collections', {'provider':'SEDAC'}, page_state=page_state)]
+
+        page_state = scom.create_page_state(limit=15)
+        page_state['page_size'] = 10
+        items = run_async(consume(page_state))
+        self.assertEqual(15, len(items))
+        self.assertEqual("ORNL_DAAC", items[0]['meta']['provider-id'])
+
+        post_mock.side_effect = returns({'errors': ['Server Error']})
+        with self.assertLogs(scom.logger, level='ERROR') as test_log:
+            items = run_async(consume(None))
+        self.assertEqual([], items)
+        self.assertEqual(["ERROR:cmr.search.common:Error in generator: Server Error."],
+            test_log.output)
+
     @patch('webbrowser.open')
     def test_open_api(self, webopener):
         """ Test the function of the open_api without actually opening it """
@@ -23,13 +23,16 @@ Created: 2020-12-01
 """
 
 from unittest.mock import patch
+import threading
 import unittest
+import urllib.error
 
 from functools import partial
 
 import test.cmr as tutil
 
 from cmr.util import common
+from cmr.util import fakecmr
 import cmr.search.granule as gran
 
 # ******************************************************************************
@@ -50,7 +53,7 @@ class TestSearch(unittest.TestCase):
     # **********************************************************************
     # Tests
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_search(self, urlopen_mock):
         """
         def search(query=None, filters=None, limit=None, options=None):
@@ -119,7 +122,7 @@ class TestSearch(unittest.TestCase):
             'GranuleUR': 'urbanspatial-hist-urban-pop-3700bc-ad2000-xlsx.xlsx'}]
         self.assertEqual(expected, ids_results)
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_experimental_search(self, urlopen_mock):
         """
         def search(query=None, filters=None, limit=None, options=None):
@@ -133,6 +136,15 @@ class TestSearch(unittest.TestCase):
         for item in generator:
             self.assertEqual('G1527288030-SEDAC', item['meta']['concept-id'])
 
+    def test_count(self):
+        """Counts are asked of the granules end point"""
+        fake = fakecmr.FakeCmr(hits=42)
+        self.assertEqual({'hits': 42, 'took': 1}, gran.count({'provider': 'FAKE'},
+            config={'transport': fake}))
+        self.assertEqual([42, 42], [found['hits'] for found in gran.count_many(
+            [{'provider': 'A'}, {'provider': 'B'}], config={'transport': fake})])
+        self.assertEqual({'granules'}, {request['endpoint'] for request in fake.requests})
+
     def test_granule_core_fields(self):
         """
         Test that the function conforms to expectations by only returning the
@@ -232,7 +244,7 @@ class TestSearch(unittest.TestCase):
         self.coll_sam_lim_helper([1, 32], [-32, 32], "Bad granule limit")
         self.coll_sam_lim_helper([1, 1], [-32, -32], "Bad collection and granule limit")
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_compound_search_collection(self, urlopen_mock):
         """
         Test the compound test works
@@ -257,7 +269,7 @@ class TestSearch(unittest.TestCase):
             'C1227811476-ORNL_DAAC',
             'C179130785-ORNL_DAAC'], result, "list matches")
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_compound_search_gran(self, urlopen_mock):
         """
         Assuming that _collection_samples works and CMR work, test _granule_samples.
@@ -301,7 +313,7 @@ class TestSearch(unittest.TestCase):
         self.assertEqual(expected, found_granules, "Compound Search - Granual Compound")
 
     @patch('cmr.search.granule._collection_samples')
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_compound_search(self, urlopen_mock, coll_mock):
         """
         Do a full test of the compound search, assuming that the component pieces
@@ -349,6 +361,86 @@ class TestSearch(unittest.TestCase):
         tester(expected[:5], {"granule": 5, "collection": 1}, "at most five, using dictionary")
         tester(expected, {"granule": 1, "collection": None}, "defaulting with dictionary")
 
+    def test_sample_concurrently(self):
+        """Collections are sampled at once, in order, and failures are reported"""
+        release = threading.Barrier(4, timeout=5)
+
+        def hits(kind, _params):
+            if kind == 'granules':
+                # every sample must be in flight at once to get past here
+                release.wait()
+            return 100
+        fake = fakecmr.FakeCmr(hits=hits)
+        config = {'transport': fake, 'sample.workers': 4, 'sample.strategy': 'each'}
+        found = gran.sample_by_collections({'provider': 'FAKE'}, limits=[3, 4],
+            filters=[gran.concept_id_fields], config=config)
+        self.assertEqual('complete', found.status)
+        self.assertEqual([{'concept-id': f'G100000000{index}-FAKE'} for index in range(3)]*4,
+            found)
+        concepts = [request['params']['concept_id'][0] for request in fake.requests
+            if request['endpoint'] == 'granules']
+        self.assertEqual([f'C100000000{index}-FAKE' for index in range(4)], sorted(concepts))
+
+        # one collection fails, the rest are still returned
+        fake = fakecmr.FakeCmr(hits=100, errors={3: 400})
+        found = gran.sample_by_collections({'provider': 'FAKE'}, limits=[2, 3],
+            config={'transport': fake, 'sample.workers': 1, 'sample.strategy': 'each'})
+        self.assertEqual('errors', found.status)
+        self.assertEqual(4, len(found))
+        self.assertEqual(['C1000000001-FAKE'], list(found.errors.keys()))
+        self.assertEqual(400, found.errors['C1000000001-FAKE']['code'])
+
+        # one collection can not be reached, the rest are still returned
+        def unreachable(kind, params):
+            if kind == 'granules' and params.get('concept_id') == ['C1000000001-FAKE']:
+                raise urllib.error.URLError(ConnectionResetError('reset by peer'))
+            return 100
+        found = gran.sample_by_collections({'provider': 'FAKE'}, limits=[2, 3],
+            config={'transport': fakecmr.FakeCmr(hits=unreachable), 'sample.workers': 2,
+                'sample.strategy': 'each'})
+        self.assertEqual('errors', found.status)
+        self.assertEqual(4, len(found))
+        self.assertEqual(['C1000000001-FAKE'], list(found.errors.keys()))
+        self.assertIn('reset by peer', found.errors['C1000000001-FAKE']['errors'][0])
+
+        # the collection search fails
+        fake = fakecmr.FakeCmr(hits=100, errors={1: 400})
+        self.assertEqual(400, gran.sample_by_collections({}, config={'transport': fake})['code'])
+
+    def test_sample_batched(self):
+        """Small samples of many collections are found with a few requests"""
+        fake = fakecmr.FakeCmr(hits=10000, collection_count=150)
+        found = gran.sample_by_collections({'provider': 'FAKE'}, limits=[5, 150],
+            filters=[gran.concept_id_fields], config={'transport': fake})
+        self.assertEqual('complete', found.status)
+        self.assertEqual(750, len(found))
+        expected = [{'concept-id': f'G{1000000000 + collection + 150 * index}-FAKE'}
+            for collection in range(150) for index in range(5)]
+        self.assertEqual(expected, found)
+        batches = [request['params']['collection_concept_id'] for request in fake.requests
+            if request['endpoint'] == 'granules']
+        self.assertEqual([100, 50], [len(batch) for batch in batches])
+        self.assertEqual(sorted(batches[0] + batches[1]), batches[0] + batches[1])
+
+        # collections which a batch could not fill are searched on their own
+        def hits(kind, params):
+            return 2000 if kind == 'granules' and 'collection_concept_id' in params else 100
+        fake = fakecmr.FakeCmr(hits=hits, collection_count=2)
+        found = gran.sample_by_collections({'provider': 'FAKE'}, limits=[3, 4],
+            filters=[gran.concept_id_fields], config={'transport': fake})
+        self.assertEqual(12, len(found))
+        alone = [request['params']['concept_id'][0] for request in fake.requests
+            if 'concept_id' in request['params']]
+        self.assertEqual(['C1000000002-FAKE', 'C1000000003-FAKE'], sorted(alone))
+
+        # batches which fail fall back to searching each collection
+        fake = fakecmr.FakeCmr(hits=100, collection_count=4, errors={2: 400})
+        found = gran.sample_by_collections({'provider': 'FAKE'}, limits=[2, 3],
+            config={'transport': fake, 'sample.workers': 1})
+        self.assertEqual('complete', found.status)
+        self.assertEqual(6, len(found))
+        self.assertEqual(5, fake.stats()['requests'])
+
     @patch('cmr.search.common.open_api')
     @patch('cmr.search.common.set_logging_to')
     def test_ignore_tests(self, log_mock, api_mock):
@@ -0,0 +1,136 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.search.harvest module
+Created: 2026-10-17
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from cmr.util import fakecmr
+from cmr.search import harvest as harv
+import cmr.search.granule as gran
+
+# ******************************************************************************
+
+def concept_ids(path):
+    """Concept ids of the items in a JSON lines file"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return [json.loads(line)['meta']['concept-id'] for line in file]
+
+def expected(count):
+    """Concept ids of the first count granules from the fake CMR"""
+    return [fakecmr.make_item('granules', index)['meta']['concept-id']
+        for index in range(count)]
+
+class TestHarvest(unittest.TestCase):
+    """Test suit for checkpointed harvests"""
+
+    def setUp(self):
+        # pylint: disable=R1732 # cleaned up in tearDown
+        self.temp = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.temp.name, 'harvest.json')
+        self.output = os.path.join(self.temp.name, 'granules.jsonl')
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_harvest(self):
+        """A harvest writes every item and saves where it is up to"""
+        fake = fakecmr.FakeCmr(hits=5000)
+        result = gran.harvest({'provider': 'FAKE'}, self.checkpoint, self.output,
+            config={'transport': fake})
+        self.assertEqual({'status': 'complete', 'items': 5000, 'pages': 3, 'hits': 5000,
+            'resumed': False}, result)
+        self.assertEqual(expected(5000), concept_ids(self.output))
+
+        state = harv.read_checkpoint(self.checkpoint)
+        self.assertEqual('complete', state['status'])
+        self.assertEqual(os.path.getsize(self.output), state['offset'])
+
+        # a finished harvest is not run again
+        self.assertTrue(gran.harvest({'provider': 'FAKE'}, self.checkpoint, self.output,
+            config={'transport': fake})['resumed'])
+        self.assertEqual(3, fake.stats()['requests'])
+
+        # a checkpoint can not be used by another harvest
+        with self.assertRaises(ValueError):
+            gran.harvest({'provider': 'OTHER'}, self.checkpoint, self.output,
+                config={'transport': fake})
+
+    def test_incomplete(self):
+        """A harvest CMR does not say how to continue ends, and is not run again"""
+        class Forgetful(fakecmr.FakeCmr):
+            """Leaves the search after header off of every page"""
+            def urlopen(self, req, timeout = None, read_timeout = None):
+                response = super().urlopen(req, timeout, read_timeout)
+                response.headers = [(key, value) for key, value in response.headers
+                    if key != 'CMR-Search-After']
+                return response
+        fake = Forgetful(hits=5000)
+        with self.assertLogs('cmr.search.common', level='WARNING'):
+            result = gran.harvest({}, self.checkpoint, self.output, config={'transport': fake})
+        self.assertEqual('incomplete', result['status'])
+        self.assertEqual(1, result['pages'])
+        self.assertEqual('incomplete', harv.read_checkpoint(self.checkpoint)['status'])
+        gran.harvest({}, self.checkpoint, self.output, config={'transport': fake})
+        self.assertEqual(1, fake.stats()['requests'])
+
+    def test_resume(self):
+        """A harvest which failed carries on from the last page saved"""
+        query = {'provider': 'FAKE'}
+        fake = fakecmr.FakeCmr(hits=5000, errors={3: 400})
+        result = gran.harvest(query, self.checkpoint, self.output, limit=5000,
+            config={'transport': fake})
+        self.assertEqual(400, result['code'])
+        state = harv.read_checkpoint(self.checkpoint)
+        self.assertEqual(2500, state['items'])
+        self.assertEqual('[2499]', state['page_state']['CMR-Search-After'])
+
+        # part of a page was written before the harvest was stopped
+        with open(self.output, 'a', encoding='utf-8') as file:
+            file.write('{"meta": {"concept-id": "half written')
+
+        fake = fakecmr.FakeCmr(hits=5000)
+        result = gran.harvest(query, self.checkpoint, self.output,
+            config={'transport': fake})
+        self.assertEqual({'status': 'complete', 'items': 5000, 'pages': 4, 'hits': 5000,
+            'resumed': True}, result)
+        self.assertEqual('[2499]', fake.requests[0]['headers']['cmr-search-after'])
+        self.assertEqual(2, fake.stats()['requests'])
+        found = concept_ids(self.output)
+        self.assertEqual(5000, len(found))
+        self.assertEqual(expected(5000), found)
+
+    def test_max_time(self):
+        """Runs which go over max-time stop and can be run again"""
+        query = {'provider': 'FAKE'}
+        limit = 1000
+        config = {'max-time': 0, 'page.target-time': 60, 'page.first-size': 100}
+        for runs in range(1, 20):
+            result = harv.harvest('granules', query, self.checkpoint, self.output,
+                limit=limit, config=dict(config, transport=fakecmr.FakeCmr(hits=5000)))
+            if result['status'] == 'complete':
+                break
+            self.assertEqual('max-time', result['status'])
+        self.assertEqual(4, runs)
+        self.assertEqual(expected(1000), concept_ids(self.output))
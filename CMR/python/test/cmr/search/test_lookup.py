@@ -0,0 +1,92 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.search.lookup module
+Created: 2026-10-17
+"""
+
+import threading
+import unittest
+
+from cmr.util import fakecmr
+from cmr.search import lookup
+import cmr.search.collection as coll
+import cmr.search.granule as gran
+
+# ******************************************************************************
+
+def concept_id(kind, index):
+    """Concept id of a record from the fake CMR"""
+    return fakecmr.make_item(kind, index)['meta']['concept-id']
+
+class TestLookup(unittest.TestCase):
+    """Test suit for looking up concept ids"""
+
+    def test_lookup_by_ids(self):
+        """Ids are looked up once, in chunks, and the missing ones are listed"""
+        fake = fakecmr.FakeCmr(hits=5000)
+        ids = [concept_id('granules', index) for index in range(0, 6000, 3)]
+        ids = ids + ids[:10] + ['G1-OTHER']
+        found = gran.lookup_by_ids(ids, filters=[gran.concept_id_fields],
+            config={'transport': fake, 'lookup.batch': 300})
+        records = list(found)
+
+        present = [key for key in ids[:2000] if int(key[1:11]) < 1000005000]
+        self.assertEqual(len(present), len(records))
+        self.assertEqual([(key, {'concept-id': key}) for key in present], records)
+        self.assertEqual(len(ids) - 10 - len(present), len(found.missing))
+        self.assertEqual(['G1000005001-FAKE', 'G1000005004-FAKE'], found.missing[:2])
+        self.assertEqual('G1-OTHER', found.missing[-1])
+        self.assertEqual({}, found.errors)
+        self.assertEqual(7, fake.stats()['requests'])
+        self.assertTrue(all(request['method'] == 'POST' for request in fake.requests))
+        self.assertEqual([201] + [300]*6,
+            sorted(len(request['params']['concept_id']) for request in fake.requests))
+
+    def test_concurrent(self):
+        """Chunks download at the same time and failed ones are reported"""
+        release = threading.Barrier(3, timeout=5)
+
+        def hits(_kind, _params):
+            # every chunk must be in flight at once to get past here
+            release.wait()
+            return 100
+        fake = fakecmr.FakeCmr(hits=hits)
+        ids = [concept_id('collections', index) for index in range(9)]
+        found = coll.lookup_by_ids(ids, config={'transport': fake, 'lookup.batch': 3,
+            'lookup.workers': 3})
+        self.assertEqual(ids, [key for key, _ in found])
+        self.assertEqual([], found.missing)
+
+        fake = fakecmr.FakeCmr(hits=100, errors={2: 400})
+        found = lookup.lookup_by_ids(ids, 'collections', config={'transport': fake,
+            'lookup.batch': 3, 'lookup.workers': 1})
+        self.assertEqual(ids[:3] + ids[6:], [key for key, _ in found])
+        self.assertEqual([ids[3]], list(found.errors.keys()))
+        self.assertEqual(400, found.errors[ids[3]]['code'])
+
+    def test_predicates(self):
+        """Records a predicate drops are left out but are not missing"""
+        fake = fakecmr.FakeCmr(hits=10)
+        ids = [concept_id('granules', index) for index in range(12)]
+        found = gran.lookup_by_ids(ids, filters=[gran.temporal_overlaps(
+            '2000-01-01T05:00:00Z'), gran.concept_id_fields], config={'transport': fake})
+        self.assertEqual(ids[4:10], [key for key, _ in found])
+        self.assertEqual(ids[10:], found.missing)
+        self.assertNotIn('temporal', fake.requests[0]['params'])
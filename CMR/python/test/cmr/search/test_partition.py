@@ -0,0 +1,138 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.search.partition module
+Created: 2026-10-17
+"""
+
+import unittest
+
+from cmr.util import fakecmr
+import cmr.search.common as scom
+import cmr.search.granule as gran
+import cmr.search.partition as part
+
+# ******************************************************************************
+
+# the 5000 hours from the first fake record to the last
+TEMPORAL = '2000-01-01T00:00:00Z,2000-07-28T07:00:00Z'
+
+class TestPartition(unittest.TestCase):
+    """Test suit for splitting up searches"""
+
+    def test_parse_time(self):
+        """Dates are read and written as CMR uses them"""
+        when = part.parse_time('2020-01-31T12:30:00Z')
+        self.assertEqual('2020-01-31T12:30:00Z', part.format_time(when))
+        self.assertEqual(when, part.parse_time('2020-01-31T12:30:00'))
+        self.assertIsNone(part.parse_time(' '))
+        self.assertIsNone(part.parse_time('not a date'))
+
+        for query in [{}, {'temporal': '2020-01-01T00:00:00Z,'}, {'temporal': ['a', 'b']}]:
+            with self.assertRaises(ValueError):
+                part.temporal_windows('granules', query)
+
+    def test_hits(self):
+        """Hits are counted without downloading items"""
+        fake = fakecmr.FakeCmr(hits=5000)
+        config = {'transport': fake}
+        self.assertEqual(5000, scom.search_hits('granules', {}, config))
+        self.assertEqual(4, scom.search_hits('granules',
+            {'temporal': '2000-01-01T00:30:00Z,2000-01-01T03:00:00Z'}, config))
+        self.assertEqual(0, fake.stats()['items'])
+
+        fake.errors = {3: 400}
+        self.assertEqual(400, scom.search_hits('granules', {}, config)['code'])
+
+    def test_temporal_windows(self):
+        """Ranges are cut in half till each window is under the target"""
+        fake = fakecmr.FakeCmr(hits=5000)
+        windows = part.temporal_windows('granules', {'temporal': TEMPORAL}, target=1000,
+            config={'transport': fake})
+        self.assertEqual(8, len(windows))
+        self.assertTrue(all(hits <= 1000 for _, _, hits in windows))
+        self.assertEqual(sorted(windows), windows)
+        # one probe for the whole range, then 2, 4, and 8 windows
+        self.assertEqual(15, fake.stats()['requests'])
+
+        # windows which can not be cut any smaller are used as they are
+        windows = part.temporal_windows('granules',
+            {'temporal': '2000-01-01T00:00:00Z,2000-01-01T00:00:01Z'}, target=1,
+            config={'transport': fake})
+        self.assertEqual(1, len(windows))
+
+    def test_search_by_temporal(self):
+        """Windows are downloaded at once and merged without duplicates"""
+        fake = fakecmr.FakeCmr(hits=5000)
+        found = gran.search_by_temporal({'temporal': TEMPORAL}, target=1000,
+            config={'transport': fake, 'partition.workers': 3})
+        self.assertEqual('complete', found.status)
+        self.assertEqual([fakecmr.make_item('granules', index)['meta']['concept-id']
+            for index in range(5000)], [item['meta']['concept-id'] for item in found])
+        # items on the edge of two windows were downloaded twice
+        self.assertTrue(fake.stats()['items'] > 5000)
+
+        found = gran.search_by_temporal({'temporal': TEMPORAL}, target=1000,
+            filters=[gran.concept_id_fields], config={'transport': fake})
+        self.assertEqual(5000, len(found))
+        self.assertEqual({'concept-id': 'G1000000000-FAKE'}, found[0])
+
+        fake = fakecmr.FakeCmr(hits=5000, errors={20: 400})
+        found = gran.search_by_temporal({'temporal': TEMPORAL}, target=1000,
+            config={'transport': fake})
+        self.assertEqual(400, found['code'])
+
+    def test_spatial_tiles(self):
+        """Boxes are cut across the longer side, including over the antimeridian"""
+        # pylint: disable=W0212 # test a private function
+        self.assertEqual((170, -10, 190, 10),
+            part._spatial_box({'bounding_box': '170,-10,-170,10'}))
+        self.assertEqual((170, -10, 190, 10),
+            part._spatial_box({'polygon': '170,-10,-170,-10,-170,10,170,10,170,-10'}))
+        self.assertEqual('170,-10,-170,10', part.bounding_box((170, -10, 190, 10)))
+        self.assertEqual('-180,-10,-170,10', part.bounding_box((180, -10, 190, 10)))
+        self.assertEqual('170,-10,180,10', part.bounding_box((170, -10, 180, 10)))
+        self.assertEqual('-180,-90,180,90', part.bounding_box((-180, -90, 180, 90)))
+        with self.assertRaises(ValueError):
+            part.spatial_tiles('granules', {'temporal': TEMPORAL})
+
+        fake = fakecmr.FakeCmr(hits=5000)
+        tiles = part.spatial_tiles('granules', {'bounding_box': '-180,-90,180,90'},
+            target=1000, config={'transport': fake})
+        self.assertTrue(all(hits <= 1000 for *_, hits in tiles))
+        self.assertEqual(5000, sum(hits for *_, hits in tiles))
+
+    def test_search_by_spatial(self):
+        """Tiles across the antimeridian are downloaded at once without duplicates"""
+        fake = fakecmr.FakeCmr(hits=20000)
+        query = {'bounding_box': '90,-90,-90,90'}
+        expected = [fakecmr.make_item('granules', index)['meta']['concept-id']
+            for index in range(20000)
+            if abs(fakecmr.location(index)[0]) >= 90]
+
+        found = gran.search_by_spatial(query, target=1000,
+            config={'transport': fake, 'partition.workers': 3})
+        self.assertEqual('complete', found.status)
+        self.assertEqual(len(expected), len(found))
+        self.assertEqual(sorted(expected),
+            sorted(item['meta']['concept-id'] for item in found))
+        # tiles on both sides of the antimeridian were searched
+        boxes = [request['params'].get('bounding_box', [''])[0] for request in fake.requests]
+        self.assertTrue(any(box.startswith('-180,') for box in boxes))
+        self.assertTrue(any(',180,' in box for box in boxes))
@@ -46,7 +46,7 @@ class TestSearch(unittest.TestCase):
     # **********************************************************************
     # Tests
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_search(self, urlopen_mock):
         """ Check that a good query will result in finding providers """
         # Setup
@@ -62,7 +62,7 @@ class TestSearch(unittest.TestCase):
             self.assertEqual('ORNL_DAAC', data[0].get('short-name'))
             self.assertEqual('GEOSS', data[len(data)-1].get('consortiums'))
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_search_by_id(self, urlopen_mock):
         """
         Check that a good query with filtering will result in finding a subset
@@ -93,7 +93,7 @@ class TestSearch(unittest.TestCase):
         self.assertEqual(['Regular Expression is invalid and could not compile'],
             bad_data.get('errors'), 'Bad Search')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_search_bad(self, urlopen_mock):
         """
         There is no documented error from this interface, however the code will
@@ -46,7 +46,7 @@ class TestSearch(unittest.TestCase):
     # **********************************************************************
     # Tests
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_limited_search(self, urlopen_mock):
         """
         Test that the limit parameter will not allow more data to be returned.
@@ -63,7 +63,7 @@ class TestSearch(unittest.TestCase):
             result = coll.search({'provider':'GHRC_CLOUD'}, limit=index)
             self.assertEqual(index, len(result))
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_search(self, urlopen_mock):
         """
         def search(query=None, filters=None, limit=None, config=None):
@@ -234,7 +234,7 @@ class TestSearch(unittest.TestCase):
         for i in results:
             print (i)
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_logged_search(self, urlopen_mock):
         """
         Test that search still runs as expected when logging is turned on
@@ -253,7 +253,7 @@ class TestSearch(unittest.TestCase):
             coll.search({'provider':'GHRC_CLOUD'}, limit=1)
             self.assertEqual(expected, log_collector.output)
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_logged_search_with_config(self, urlopen_mock):
         """
         Test that search still runs as expected when logging is turned on
@@ -0,0 +1,124 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.search.sync module
+Created: 2026-10-17
+"""
+
+import os
+import tempfile
+import unittest
+
+from cmr.util import fakecmr
+from cmr.search import sync
+import cmr.search.granule as gran
+
+# ******************************************************************************
+
+def concept_id(index):
+    """Concept id of a granule from the fake CMR"""
+    return fakecmr.make_item('granules', index)['meta']['concept-id']
+
+class TestSync(unittest.TestCase):
+    """Test suit for delta syncs"""
+
+    def setUp(self):
+        # pylint: disable=R1732 # cleaned up in tearDown
+        self.temp = tempfile.TemporaryDirectory()
+        self.state = os.path.join(self.temp.name, 'sync.json')
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_sync(self):
+        """Only changed records are downloaded and deletions are found"""
+        fake = fakecmr.FakeCmr(hits=3000)
+        config = {'transport': fake}
+        first = gran.sync({'provider': 'FAKE'}, self.state, config=config)
+        self.assertEqual(3000, len(first['added']))
+        self.assertEqual(([], []), (first['updated'], first['deleted']))
+        self.assertEqual('2000-05-04T23:00:00Z', first['watermark'])
+        self.assertEqual('revision_date', fake.requests[0]['params']['sort_key'][0])
+
+        # nothing changed, one page of the overlap and a count
+        fake.requests.clear()
+        second = gran.sync({'provider': 'FAKE'}, self.state, config=config)
+        self.assertEqual(([], [], []), (second['added'], second['updated'],
+            second['deleted']))
+        self.assertEqual('2000-05-04T22:59:00Z',
+            fake.requests[0]['params']['updated_since'][0])
+        self.assertEqual(['0'], fake.requests[-1]['params']['page_size'])
+        self.assertEqual(2, len(fake.requests))
+
+        # two new, one revised, and two deleted
+        fake.hits = 3002
+        fake.revised = {10: (2, '2001-01-01T00:00:00.000Z')}
+        fake.deleted = {20, 30}
+        fake.requests.clear()
+        third = gran.sync({'provider': 'FAKE'}, self.state, filters=[gran.concept_id_fields],
+            config=config)
+        self.assertEqual([{'concept-id': concept_id(3000)}, {'concept-id': concept_id(3001)}],
+            third['added'])
+        self.assertEqual([{'concept-id': concept_id(10)}], third['updated'])
+        self.assertEqual(sorted([concept_id(20), concept_id(30)]), third['deleted'])
+        self.assertEqual('2001-01-01T00:00:00Z', third['watermark'])
+
+        state = sync.read_state(self.state)
+        records = next(iter(state['queries'].values()))['records']
+        self.assertEqual(3000, len(records))
+        self.assertEqual(2, records[concept_id(10)])
+
+        # queries are kept apart
+        other = gran.sync({'provider': 'OTHER'}, self.state, config=config)
+        self.assertEqual(3000, len(other['added']))
+        self.assertEqual(2, len(sync.read_state(self.state)['queries']))
+
+    def test_cut_short(self):
+        """A sync which runs out of time keeps what it found, and predicates drop records"""
+        fake = fakecmr.FakeCmr(hits=3000)
+        first = gran.sync({}, self.state, config={'transport': fake, 'max-time': 0,
+            'page.target-time': 1})
+        self.assertEqual(('max-time', 100), (first['status'], len(first['added'])))
+        self.assertEqual(1, fake.stats()['requests'])
+
+        fake.deleted = {1}
+        even = gran.keep_if(lambda item: int(item['meta']['concept-id'][1:11]) % 2 == 0)
+        second = gran.sync({}, self.state, filters=[even, gran.concept_id_fields],
+            config={'transport': fake})
+        self.assertEqual('complete', second['status'])
+        self.assertEqual([{'concept-id': concept_id(index)} for index in range(100, 3000, 2)],
+            second['added'])
+        self.assertEqual([concept_id(1)], second['deleted'])
+
+    def test_errors(self):
+        """A sync which fails leaves the state file as it was"""
+        fake = fakecmr.FakeCmr(hits=10)
+        gran.sync({}, self.state, config={'transport': fake})
+        with open(self.state, 'r', encoding='utf-8') as file:
+            before = file.read()
+
+        fake.errors = {fake.stats()['requests'] + 1: 400}
+        fake.deleted = {1}
+        self.assertEqual(400, gran.sync({}, self.state, config={'transport': fake})['code'])
+        fake.errors = {fake.stats()['requests'] + 2: 400}
+        self.assertEqual(400, gran.sync({}, self.state, config={'transport': fake})['code'])
+        with open(self.state, 'r', encoding='utf-8') as file:
+            self.assertEqual(before, file.read())
+        self.assertEqual([concept_id(1)],
+            gran.sync({}, self.state, config={'transport': fake})['deleted'])
@@ -0,0 +1,245 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.aio module
+Created: 2026-10-17
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+import asyncio
+import concurrent.futures
+import gzip
+import json
+import threading
+import time
+import unittest
+
+from cmr.util import aio
+from cmr.util import limiter
+
+# ******************************************************************************
+
+BODY = json.dumps({'hits': 2, 'took': 5, 'items': [{'a': 1}, {'b': 2}]}).encode('utf-8')
+
+class CmrLikeHandler(BaseHTTPRequestHandler):
+    """Serve a few canned responses in the ways CMR might send them"""
+    protocol_version = 'HTTP/1.1'
+    connections = []
+    throttled = []
+
+    def setup(self):
+        super().setup()
+        CmrLikeHandler.connections.append(self.client_address)
+
+    def _send(self, status, body, headers = None):
+        """Write a response with a known length"""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunked(self, body):
+        """Write a response with chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for index in range(0, len(body), 7):
+            piece = body[index:index+7]
+            self.wfile.write(f'{len(piece):x}\r\n'.encode('ascii') + piece + b'\r\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _respond(self):
+        """Pick a response based on the path"""
+        if self.path.startswith('/slow'):
+            time.sleep(0.5)
+            self._send(200, BODY)
+        elif self.path.startswith('/stall'):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY[:10])
+            self.wfile.flush()
+            time.sleep(0.5)
+            self.wfile.write(BODY[10:])
+        elif self.path.startswith('/gzip'):
+            self._send(200, gzip.compress(BODY), {'Content-Encoding': 'gzip'})
+        elif self.path.startswith('/chunked'):
+            self._send_chunked(BODY)
+        elif self.path.startswith('/throttle') and len(CmrLikeHandler.throttled) < 1:
+            CmrLikeHandler.throttled.append(self.path)
+            self._send(429, b'slow down', {'Retry-After': '0'})
+        elif self.path.startswith('/missing'):
+            self._send(404, b'{"errors": ["not found"]}')
+        elif self.path.startswith('/list'):
+            self._send(200, b'[{"a": 1}, {"b": 2}, {"c": 3}]')
+        else:
+            self._send(200, BODY, {'CMR-Hits': '2'})
+
+    # pylint: disable=C0103 # name required by BaseHTTPRequestHandler
+    def do_GET(self):
+        """Respond to a GET"""
+        self._respond()
+
+    # pylint: disable=C0103 # name required by BaseHTTPRequestHandler
+    def do_POST(self):
+        """Respond to a POST, the body must be read to keep the connection usable"""
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self._respond()
+
+    def log_message(self, *args):
+        """Keep the test output quiet"""
+
+class QuietServer(ThreadingMixIn, HTTPServer):
+    """A server with a thread per connection, the same as ThreadingHTTPServer"""
+    daemon_threads = True
+
+class TestAio(unittest.TestCase):
+    """Test suit for the asyncio transport"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = QuietServer(('127.0.0.1', 0), CmrLikeHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        CmrLikeHandler.connections = []
+        CmrLikeHandler.throttled = []
+        limiter.reset()
+
+    def tearDown(self):
+        limiter.reset()
+
+    def run_async(self, coroutine):
+        """Run a coroutine on a fresh loop, closing any pooled connections after"""
+        async def wrapper():
+            try:
+                return await coroutine
+            finally:
+                aio.default_pool().clear()
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(wrapper())
+        finally:
+            loop.close()
+
+    def test_post(self):
+        """A POST returns the same structure as network.post()"""
+        data = self.run_async(aio.post(self.url + '/search', {'keyword': 'water'}))
+        self.assertEqual(2, data['hits'])
+        self.assertEqual('2', data['http-headers']['CMR-Hits'])
+
+    def test_get(self):
+        """A GET returns the same structure as network.get()"""
+        data = self.run_async(aio.get(self.url + '/search'))
+        self.assertEqual(2, data['hits'])
+        self.assertNotIn('http-headers', data)
+
+        data = self.run_async(aio.get(self.url + '/list'))
+        self.assertEqual(3, data['hits'])
+
+    def test_encodings(self):
+        """gzip and chunked bodies can be read"""
+        for path in ['/gzip', '/chunked']:
+            data = self.run_async(aio.post(self.url + path, {}))
+            self.assertEqual(2, len(data['items']), path)
+
+    def test_errors(self):
+        """HTTP errors are returned as error dictionaries"""
+        data = self.run_async(aio.get(self.url + '/missing'))
+        self.assertEqual(404, data['code'])
+        self.assertIn('errors', data)
+
+    def test_retry(self):
+        """Throttled requests are retried"""
+        data = self.run_async(aio.get(self.url + '/throttle',
+            config={'retry.jitter': False}))
+        self.assertEqual(2, data['hits'])
+        self.assertEqual(1, len(CmrLikeHandler.throttled))
+
+    def test_timeouts(self):
+        """Slow responses are reported as timeouts"""
+        for config in [{'timeout.read': 0.05, 'retry.max-attempts': 1},
+                {'timeout.budget': 0.05}]:
+            data = self.run_async(aio.get(self.url + '/slow', config=config))
+            self.assertEqual(0, data['code'], config)
+            self.assertTrue(data['reason'].startswith('Timed out'), config)
+
+        # a body which stops part way is also a timeout
+        data = self.run_async(aio.get(self.url + '/stall',
+            config={'timeout.read': 0.05, 'retry.max-attempts': 1}))
+        self.assertEqual(0, data['code'])
+        self.assertTrue(data['reason'].startswith('Timed out'))
+        data = self.run_async(aio.get(self.url + '/stall', config={'timeout.read': 5}))
+        self.assertEqual(2, data['hits'])
+
+    def test_concurrent_keep_alive(self):
+        """Many requests run at once and connections are reused"""
+        async def many():
+            first = await asyncio.gather(*[aio.get(self.url + '/search') for _ in range(5)])
+            second = await asyncio.gather(*[aio.get(self.url + '/search') for _ in range(5)])
+            return first + second, aio.pool_stats()
+        results, stats = self.run_async(many())
+        self.assertEqual(10, len(results))
+        self.assertTrue(all(result['hits'] == 2 for result in results))
+        self.assertEqual(5, stats['reused'])
+        self.assertEqual(5, len(CmrLikeHandler.connections))
+
+    def test_limit_more_tasks_than_threads(self):
+        """Tasks waiting on the limiter do not tie up the threads of the loop"""
+        async def many():
+            asyncio.get_event_loop().set_default_executor(
+                concurrent.futures.ThreadPoolExecutor(max_workers=2))
+            return await asyncio.gather(*[aio.get(self.url + '/search',
+                config={'limit.in-flight': 3}) for _ in range(40)])
+        results = self.run_async(asyncio.wait_for(many(), 10))
+        self.assertEqual(40, len(results))
+        self.assertTrue(all(result['hits'] == 2 for result in results))
+        stats = limiter.bucket_for('').stats()
+        self.assertEqual(0, stats['in-flight'])
+        self.assertEqual(40, stats['requests'])
+        self.assertLessEqual(len(CmrLikeHandler.connections), 3)
+
+    def test_limit_cancelled(self):
+        """A task cancelled while waiting for a slot does not keep one"""
+        bucket = limiter.configure('', in_flight=1)
+        bucket.hold()
+        async def cancel():
+            task = asyncio.ensure_future(aio.get(self.url + '/search'))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            # the slot frees up after the task has given up on it
+            bucket.release()
+            await asyncio.sleep(0.05)
+            self.assertTrue(task.cancelled())
+            return await aio.get(self.url + '/search')
+        data = self.run_async(cancel())
+        self.assertEqual(2, data['hits'])
+        self.assertEqual(0, bucket.stats()['in-flight'])
+        self.assertEqual(1, bucket.stats()['requests'])
@@ -0,0 +1,188 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.cache module
+Created: 2026-10-17
+"""
+
+from unittest.mock import patch
+import io
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+import test.cmr as tutil
+
+from cmr.util import cache
+import cmr.util.network as net
+import cmr.search.common as scom
+
+# ******************************************************************************
+
+BODY = '{"hits": 1, "took": 2, "items": [{"a": 1}]}'
+
+class TestCache(unittest.TestCase):
+    """Test suit for the response cache"""
+
+    def setUp(self):
+        # pylint: disable=R1732 # cleaned up in tearDown
+        self.temp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        cache.reset()
+        self.temp.cleanup()
+
+    def test_request_key(self):
+        """Keys change with the method, url, body, and headers which matter"""
+        def key(url='https://cmr.earthdata.nasa.gov/search', data=None, headers=None):
+            return cache.request_key(urllib.request.Request(url, data, headers or {}))
+
+        self.assertEqual(key(), key())
+        self.assertEqual(key(), key(headers={'Client-Id': 'other'}))
+        self.assertNotEqual(key(), key(url='https://cmr.uat.earthdata.nasa.gov/search'))
+        self.assertNotEqual(key(), key(data=b'keyword=water'))
+        self.assertNotEqual(key(), key(headers={'Accept': 'application/json'}))
+        self.assertNotEqual(key(), key(headers={'Authorization': 'token'}))
+        self.assertIsNone(key(headers={'CMR-Scroll-Id': '1234'}))
+
+    def test_memory_lru(self):
+        """The least recently used entry is dropped first"""
+        store = cache.MemoryCache(max_entries=2)
+        store.put('a', 1)
+        store.put('b', 2)
+        store.get('a')
+        store.put('c', 3)
+        self.assertEqual(1, store.get('a'))
+        self.assertIsNone(store.get('b'))
+        self.assertEqual(2, len(store))
+
+    def test_disk(self):
+        """Entries are kept on disk and the directory is trimmed to size"""
+        entry = cache.make_entry(200, [('ETag', '"v1"'), ('Content-Encoding', 'gzip')],
+            b'x' * 100)
+        self.assertEqual([('ETag', '"v1"')], entry['headers'])
+        self.assertEqual({'If-None-Match': '"v1"'}, cache.validators(entry))
+
+        store = cache.DiskCache(self.temp.name)
+        store.put('one', entry)
+        self.assertEqual(entry, cache.DiskCache(self.temp.name).get('one'))
+        size = os.path.getsize(os.path.join(self.temp.name, 'one.cache'))
+
+        # room for two entries, the one used longest ago goes first
+        store.max_bytes = size * 2.5
+        store.put('two', entry)
+        os.utime(os.path.join(self.temp.name, 'two.cache'), (1, 1))
+        store.put('three', entry)
+        self.assertIsNone(store.get('two'))
+        self.assertIsNotNone(store.get('one'))
+        self.assertIsNotNone(store.get('three'))
+        self.assertEqual(2, len(os.listdir(self.temp.name)))
+
+    def test_tiers(self):
+        """Entries on disk are found by a new cache and copied into memory"""
+        entry = cache.make_entry(200, [], b'body')
+        cache.HttpCache(directory=self.temp.name).put('key', entry)
+        store = cache.HttpCache(memory_entries=10, directory=self.temp.name)
+        self.assertEqual(0, len(store.memory))
+        self.assertEqual(b'body', store.get('key')['body'])
+        self.assertEqual(1, len(store.memory))
+
+    @patch('cmr.util.pool.urlopen')
+    def test_revalidation(self, urlopen_mock):
+        """A 304 from CMR is answered from the cache"""
+        config = {'cache': True, 'cacheable': True, 'cache.directory': self.temp.name}
+        url = 'https://cmr.earthdata.nasa.gov/search/collections'
+        urlopen_mock.return_value = tutil.MockChunkedResponse(BODY,
+            headers=[('ETag', '"v1"'), ('CMR-Hits', '1')])
+        first = net.post(url, {'keyword': 'water'}, config=config)
+        self.assertEqual(1, first['hits'])
+        self.assertIsNone(urlopen_mock.call_args[0][0].get_header('If-none-match'))
+
+        def not_modified(*_args, **_kwargs):
+            raise urllib.error.HTTPError(url, 304, 'Not Modified', {}, io.BytesIO(b''))
+        urlopen_mock.side_effect = not_modified
+        second = net.post(url, {'keyword': 'water'}, config=config)
+        self.assertEqual(first, second)
+        self.assertEqual('"v1"', urlopen_mock.call_args[0][0].get_header('If-none-match'))
+
+        # other queries are not answered from the cache
+        self.assertEqual(304, net.post(url, {'keyword': 'fire'}, config=config)['code'])
+
+        stats = net.response_cache(config).stats()
+        self.assertEqual(1, stats['revalidated'])
+        self.assertEqual(1, stats['misses'])
+
+    @patch('time.time')
+    @patch('cmr.util.pool.urlopen')
+    def test_fresh_after_revalidation(self, urlopen_mock, clock_mock):
+        """A response CMR says has not changed is fresh for another max-age"""
+        config = {'cache': True, 'cacheable': True, 'cache.max-age': 60}
+        url = 'https://cmr.earthdata.nasa.gov/search/collections'
+        clock_mock.return_value = 1000.0
+        urlopen_mock.return_value = tutil.MockChunkedResponse(BODY,
+            headers=[('ETag', '"v1"')])
+        net.post(url, {'keyword': 'water'}, config=config)
+
+        def not_modified(*_args, **_kwargs):
+            raise urllib.error.HTTPError(url, 304, 'Not Modified', {}, io.BytesIO(b''))
+        urlopen_mock.side_effect = not_modified
+        clock_mock.return_value = 1100.0
+        net.post(url, {'keyword': 'water'}, config=config)
+        self.assertEqual(2, urlopen_mock.call_count)
+
+        # right after the 304 the response is fresh again
+        clock_mock.return_value = 1101.0
+        self.assertEqual(1, net.post(url, {'keyword': 'water'}, config=config)['hits'])
+        self.assertEqual(2, urlopen_mock.call_count)
+        stats = net.response_cache(config).stats()
+        self.assertEqual((1, 1), (stats['revalidated'], stats['hits']))
+
+    @patch('cmr.util.pool.urlopen')
+    def test_max_age(self, urlopen_mock):
+        """Fresh responses are used without asking CMR"""
+        config = {'cache': True, 'cacheable': True, 'cache.max-age': 60}
+        url = 'https://cmr.earthdata.nasa.gov/search/providers'
+        urlopen_mock.side_effect = lambda *args, **kwargs: tutil.MockChunkedResponse(BODY)
+        self.assertEqual(1, net.get(url, config=config)['hits'])
+        self.assertEqual(1, net.get(url, config=config)['hits'])
+        self.assertEqual(1, urlopen_mock.call_count)
+        self.assertEqual(1, net.response_cache(config).stats()['hits'])
+
+        # responses without validators are not kept when max-age is 0
+        net.get(url + '?other', config={'cache': True, 'cacheable': True})
+        net.get(url + '?other', config={'cache': True, 'cacheable': True})
+        self.assertEqual(3, urlopen_mock.call_count)
+
+        # the cache is off by default
+        net.get(url)
+        self.assertEqual(4, urlopen_mock.call_count)
+
+        # and requests which are not marked cacheable, like token requests, never use it
+        net.post(url, {}, config={'cache': True, 'cache.max-age': 60})
+        net.post(url, {}, config={'cache': True, 'cache.max-age': 60})
+        self.assertEqual(6, urlopen_mock.call_count)
+
+        # searches are cacheable
+        config = {'cache': True, 'cache.max-age': 60}
+        for _ in range(2):
+            self.assertEqual(1, len(scom.search_by_page('collections', {'keyword': 'water'},
+                config=config)))
+        self.assertEqual(7, urlopen_mock.call_count)
@@ -27,7 +27,7 @@ import unittest
 
 import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 import cmr.util.common as com
 
@@ -118,6 +118,19 @@ class TestSearch(unittest.TestCase):
         cmd = com.help_format_lambda()
         self.assertTrue("str(object='') -> str" in cmd("str", ""))
 
+    def test_parse_time(self):
+        """Test that dates from CMR are read, and odd ones are passed over"""
+        utc = timezone.utc
+        noon = datetime(2020, 1, 31, 12, 0, tzinfo=utc)
+        for text in ['2020-01-31T12:00:00Z', '2020-01-31T12:00:00.000Z', ' 2020-01-31T12:00 ',
+                '2020-01-31T12:00:00', '2020-01-31T14:00:00+02:00', '2020-01-31T07:00:00-0500']:
+            self.assertEqual(noon, com.parse_time(text), text)
+        self.assertEqual(datetime(2020, 1, 31, tzinfo=utc), com.parse_time('2020-01-31'))
+        self.assertEqual(123456, com.parse_time('2020-01-31T12:00:00.1234567Z').microsecond)
+        for text in [None, '', ' ', 'yesterday', '2020-13-01T00:00:00Z', '-3700-01-01',
+                '2020-01-31T12:00:00Zulu']:
+            self.assertIsNone(com.parse_time(text), text)
+
     def test_mask_string(self):
         """Test that the mask_diictionary function will clean out sensitive info"""
         def tester(expected, given, msg):
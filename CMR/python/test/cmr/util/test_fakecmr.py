@@ -0,0 +1,93 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.fakecmr module
+Created: 2026-10-17
+"""
+
+import json
+import unittest
+
+from cmr.util import fakecmr
+import cmr.util.network as net
+import cmr.search.collection as coll
+import cmr.search.granule as gran
+
+# ******************************************************************************
+
+URL = 'https://cmr.earthdata.nasa.gov/search/'
+
+class TestFakeCmr(unittest.TestCase):
+    """Test suit for the in process CMR"""
+
+    def test_pages(self):
+        """Pages are generated by position and can be requested many ways"""
+        fake = fakecmr.FakeCmr(hits=25)
+        config = {'transport': fake, 'coalesce': False}
+
+        page = net.post(URL + 'granules', {'page_size': 10, 'page_num': 3}, config=config)
+        self.assertEqual(25, page['hits'])
+        self.assertEqual(['G1000000020-FAKE', 'G1000000024-FAKE'],
+            [page['items'][0]['meta']['concept-id'], page['items'][-1]['meta']['concept-id']])
+        self.assertEqual(fakecmr.make_item('granules', 20), page['items'][0])
+
+        page = net.post(URL + 'collections.umm_json', {'page_size': 2, 'offset': 5},
+            config=config)
+        self.assertEqual('C1000000005-FAKE', page['items'][0]['meta']['concept-id'])
+
+        page = net.post(URL + 'collections', {'page_size': 0}, config=config)
+        self.assertEqual((25, []), (page['hits'], page['items']))
+
+        # search after continues from the last record of the previous page
+        page = net.post(URL + 'collections', {'page_size': 3}, config=config,
+            headers={'CMR-Search-After': json.dumps([9])})
+        self.assertEqual('C1000000010-FAKE', page['items'][0]['meta']['concept-id'])
+
+        self.assertEqual(4, fake.stats()['requests'])
+        self.assertEqual('collections', fake.requests[-1]['endpoint'])
+
+    def test_scroll(self):
+        """Large searches scroll through every record and clear the scroll"""
+        fake = fakecmr.FakeCmr(hits=4100, latency=0.5, sleep=lambda _: None)
+        results = coll.search({'provider': 'FAKE'}, limit=4100,
+            config={'transport': fake, 'paging': 'scroll'})
+        ids = [item['meta']['concept-id'] for item in results]
+        self.assertEqual(4100, len(set(ids)))
+        self.assertEqual('C1000004099-FAKE', ids[-1])
+        stats = fake.stats()
+        self.assertEqual(1, stats['scrolls-opened'])
+        self.assertEqual(0, stats['scrolls'])
+
+    def test_errors(self):
+        """Injected errors are retried or returned like CMR errors"""
+        fake = fakecmr.FakeCmr(hits=5, errors={1: 503, 3: 400}, retry_after=0)
+        config = {'transport': fake, 'coalesce': False}
+        self.assertEqual(5, len(gran.search({'provider': 'FAKE'}, limit=5, config=config)))
+        self.assertEqual(400, net.post(URL + 'granules', {}, config=config)['code'])
+        self.assertEqual(404, net.get(URL + 'unknown', config=config)['code'])
+        self.assertEqual(2, fake.stats()['errors'])
+
+        # random errors repeat for the same seed
+        def failures(seed):
+            fake = fakecmr.FakeCmr(error_rate=0.5, seed=seed)
+            config = {'transport': fake, 'coalesce': False, 'retry.max-attempts': 1}
+            return [net.post(URL + 'granules', {}, config=config).get('code')
+                for _ in range(10)]
+        self.assertEqual(failures(7), failures(7))
+        self.assertIn(503, failures(7))
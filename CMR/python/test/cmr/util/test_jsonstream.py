@@ -0,0 +1,97 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.jsonstream module
+Created: 2026-10-17
+"""
+
+import json
+import unittest
+
+import test.cmr as tutil
+
+from cmr.util import jsonstream
+
+# ******************************************************************************
+
+def chunked(text, size):
+    """Break text into byte chunks of size"""
+    data = text.encode('utf-8')
+    return [data[index:index+size] for index in range(0, len(data), size)]
+
+class TestJsonStream(unittest.TestCase):
+    """Test suit for the streaming item parser"""
+
+    def test_items(self):
+        """Items and fields match json.loads() no matter how the body is split"""
+        doc = {'hits': 3,
+            'took': 5,
+            'items': [{'a': 'quote " and brace } and slash \\', 'b': [1, {'c': None}]},
+                [1, 2], 'text', 3.5, True, None, {'name': 'café'}],
+            'after': {'key': [1]}}
+        text = json.dumps(doc, ensure_ascii=False)
+        for size in [1, 2, 3, 7, 1024]:
+            stream = jsonstream.ItemStream(chunked(text, size))
+            self.assertEqual(doc['items'], list(stream), f'chunk size {size}')
+            self.assertEqual({'hits': 3, 'took': 5, 'after': {'key': [1]}}, stream.fields)
+            self.assertEqual(7, stream.count)
+
+    def test_fields_before_items(self):
+        """Fields sent before the items can be used with the first item"""
+        stream = jsonstream.ItemStream(chunked('{"hits": 2, "items": [1, 2]}', 4))
+        iterator = iter(stream)
+        self.assertEqual(1, next(iterator))
+        self.assertEqual({'hits': 2}, stream.fields)
+
+    def test_recorded(self):
+        """A real CMR response"""
+        text = tutil.load_relative_file('../data/cmr/search/ten_results_from_ghrc.json')
+        expected = json.loads(text)
+        stream = jsonstream.ItemStream(chunked(text, 100), headers={'CMR-Hits': '2038'})
+        self.assertEqual(expected['items'], list(stream))
+        self.assertEqual({'hits': 2038, 'took': 10, 'http-headers': {'CMR-Hits': '2038'}},
+            stream.result())
+
+    def test_not_an_object(self):
+        """Bodies which are not objects are kept as raw text"""
+        stream = jsonstream.ItemStream(chunked("I'm a tea pot", 3))
+        self.assertEqual([], list(stream))
+        self.assertEqual("I'm a tea pot", stream.raw)
+
+        stream = jsonstream.ItemStream([b'{}'])
+        self.assertEqual([], list(stream))
+        self.assertEqual({}, stream.result())
+
+    def test_malformed(self):
+        """Broken JSON raises a ValueError"""
+        for text in ['{"items": [1, 2', '{"items": [{"a": "b}]}', '{"hits" 1}', '{1: 2}']:
+            with self.assertRaises(ValueError, msg=text):
+                list(jsonstream.ItemStream(chunked(text, 2)))
+
+    def test_close(self):
+        """Closing the stream closes the source"""
+        def source():
+            try:
+                yield b'{"items": [1, 2, 3]}'
+            finally:
+                closed.append(True)
+        closed = []
+        with jsonstream.ItemStream(source()) as stream:
+            self.assertEqual(1, next(iter(stream)))
+        self.assertEqual([True], closed)
@@ -0,0 +1,124 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.limiter module
+Created: 2026-10-17
+"""
+
+from unittest.mock import patch
+import threading
+import time
+import unittest
+
+import test.cmr as tutil
+
+from cmr.util import common
+from cmr.util import limiter
+import cmr.util.network as net
+
+# ******************************************************************************
+
+class TestLimiter(unittest.TestCase):
+    """Test suit for the rate limiter"""
+
+    def tearDown(self):
+        limiter.reset()
+
+    def test_unlimited(self):
+        """A bucket without limits never waits"""
+        bucket = limiter.TokenBucket()
+        for _ in range(100):
+            self.assertEqual(0, bucket.take())
+        self.assertEqual(100, bucket.stats()['requests'])
+        self.assertEqual(0, bucket.stats()['waits'])
+
+    def test_rate(self):
+        """Requests beyond the burst are spread out at the rate"""
+        bucket = limiter.TokenBucket(rate=50, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.take()
+        elapsed = time.monotonic() - start
+        # 2 go right away, 4 more at 50 a second
+        self.assertTrue(elapsed >= 0.07, f'took {elapsed}')
+        self.assertEqual(4, bucket.stats()['waits'])
+
+    def test_in_flight(self):
+        """No more then in_flight requests may be held at once"""
+        bucket = limiter.TokenBucket(in_flight=2)
+        lock = threading.Lock()
+        active = {'now': 0, 'max': 0}
+
+        def work():
+            with bucket:
+                with lock:
+                    active['now'] = active['now'] + 1
+                    active['max'] = max(active['max'], active['now'])
+                time.sleep(0.01)
+                with lock:
+                    active['now'] = active['now'] - 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(2, active['max'])
+        self.assertEqual(0, bucket.stats()['in-flight'])
+
+    def test_poll(self):
+        """Polling takes what is free and says how long to wait for the rest"""
+        now = [0.0]
+        bucket = limiter.TokenBucket(rate=2, burst=1, in_flight=1, clock=lambda: now[0])
+        self.assertEqual(0, bucket.poll(True, True))
+        self.assertIsNone(bucket.poll(False, True), 'waiting on a release')
+        self.assertEqual(0.5, bucket.poll(True, False), 'waiting on a token')
+        now[0] = 0.5
+        self.assertEqual(0, bucket.poll(True, False, 0.5))
+        bucket.release()
+        self.assertEqual(0, bucket.poll(False, True))
+        stats = bucket.stats()
+        self.assertEqual((2, 1, 0.5, 1), (stats['requests'], stats['waits'],
+            stats['wait-time'], stats['in-flight']))
+
+    def test_buckets_by_env(self):
+        """Each environment has its own shared bucket"""
+        self.assertIs(limiter.bucket_for('uat'), limiter.bucket_for('uat'))
+        self.assertIsNot(limiter.bucket_for('uat'), limiter.bucket_for(''))
+
+        limiter.configure('uat', rate=5, in_flight=3)
+        self.assertEqual((5.0, 5.0, 3), limiter.bucket_for('uat').limits())
+        self.assertEqual((None, None, None), limiter.bucket_for('').limits())
+        self.assertIn('uat', limiter.stats())
+
+    @patch('cmr.util.pool.urlopen')
+    def test_network_uses_limiter(self, urlopen_mock):
+        """post() and get() wait on the limiter for the env in config"""
+        recorded_data_file = tutil.resolve_full_path('../data/cmr/search/one_cmr_result.json')
+        urlopen_mock.return_value = tutil.MockResponse(common.read_file(recorded_data_file))
+
+        config = {'env': 'UAT', 'limit.rate': 1000, 'limit.in-flight': 4}
+        net.post('https://cmr.uat.earthdata.nasa.gov/search', {}, config=config)
+        net.get('https://cmr.uat.earthdata.nasa.gov/search', config={'env': 'uat'})
+
+        bucket = limiter.bucket_for('uat')
+        self.assertEqual((1000.0, 1000.0, 4), bucket.limits())
+        self.assertEqual(2, bucket.stats()['requests'])
+        self.assertEqual(0, bucket.stats()['in-flight'])
+        self.assertEqual(0, limiter.bucket_for('').stats()['requests'])
@@ -24,7 +24,11 @@ Created: 2020-10-15
 
 from unittest.mock import Mock
 from unittest.mock import patch
+import gzip
+import io
+import socket
 import unittest
+import zlib
 
 import urllib.error as urlerr
 
@@ -40,6 +44,25 @@ def valid_cmr_response(file, status=200, headers=() ):
     json_response = common.read_file(file)
     return tutil.MockResponse(json_response, status=status, headers=headers)
 
+class EncodedResponse():
+    """
+    Mock up a response with a compressed body which can be read in chunks like
+    the http.client.HTTPResponse object
+    """
+    def __init__(self, body, encoding, status=200):
+        self.status = status
+        self.headers = [('Content-Encoding', encoding)]
+        self.stream = io.BytesIO(body)
+    def read(self, amt=None):
+        """Return the next amt bytes of the body"""
+        return self.stream.read(amt)
+    def close(self):
+        """Nothing to release"""
+        self.stream.close()
+    def getheaders(self):
+        """Return headers"""
+        return self.headers
+
 class TestSearch(unittest.TestCase):
     """Test suit for Search API"""
 
@@ -160,7 +183,7 @@ class TestSearch(unittest.TestCase):
         expected = {'Default-Value':'Always'}
         test(expected, {}, 'Not-Given', {}, 'Default-Value', 'Always')
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_post(self, urlopen_mock):
         """ Test the post method, POST a network resource """
         # Setup
@@ -210,7 +233,7 @@ class TestSearch(unittest.TestCase):
             'errors': ['Unprocessable Entity']}
         self.assertEqual(expected, data)
 
-    @patch('urllib.request.urlopen')
+    @patch('cmr.util.pool.urlopen')
     def test_get(self, urlopen_mock):
         """ Test the get method, get a network resource """
         # Setup
@@ -271,3 +294,239 @@ class TestSearch(unittest.TestCase):
         urlopen_mock.return_value = valid_cmr_response(recorded_data_file)
         data = net.get("http://cmr.earthdata.nasa.gov/ingest/providers?pretty=true")
         self.assertEqual(110, len(data['items']))
+
+    @patch('cmr.util.pool.urlopen')
+    def test_compressed_responses(self, urlopen_mock):
+        """ Test that gzip and deflate responses are inflated """
+        raw = ('{"hits": 3, "took": 4, "items": [' + ', '.join(['{"a": "bcd"}']*500)
+            + ']}').encode('utf-8')
+        raw_deflate = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        raw_deflate = raw_deflate.compress(raw) + raw_deflate.flush()
+
+        for encoding, body in [('gzip', gzip.compress(raw)),
+                ('deflate', zlib.compress(raw)),
+                ('deflate', raw_deflate)]:
+            before = net.transfer_stats()
+            thread_before = net.thread_transfer_stats()
+            urlopen_mock.return_value = EncodedResponse(body, encoding)
+            with patch('cmr.util.network.READ_CHUNK_SIZE', 16):
+                data = net.post("http://cmr.earthdata.nasa.gov/search", {})
+            self.assertEqual(3, data['hits'], encoding)
+            self.assertEqual(500, len(data['items']), encoding)
+
+            after = net.transfer_stats()
+            self.assertEqual(1, after['requests'] - before['requests'])
+            self.assertEqual(len(body), after['bytes-received'] - before['bytes-received'])
+            self.assertEqual(len(raw), after['bytes-decoded'] - before['bytes-decoded'])
+            thread_after = net.thread_transfer_stats()
+            self.assertEqual(len(raw),
+                thread_after['bytes-decoded'] - thread_before['bytes-decoded'])
+
+        request = urlopen_mock.call_args[0][0]
+        self.assertEqual('gzip, deflate', request.get_header('Accept-encoding'))
+
+        # callers can turn off compression
+        urlopen_mock.return_value = EncodedResponse(raw, 'identity')
+        data = net.get("http://cmr.earthdata.nasa.gov/search",
+            headers={'Accept-Encoding': 'identity'})
+        self.assertEqual(3, data['hits'])
+        request = urlopen_mock.call_args[0][0]
+        self.assertEqual('identity', request.get_header('Accept-encoding'))
+
+        # a broken stream is reported as an error
+        urlopen_mock.return_value = EncodedResponse(b'not compressed', 'gzip')
+        data = net.get("http://cmr.earthdata.nasa.gov/search")
+        self.assertEqual(0, data['code'])
+        self.assertTrue(data['reason'].startswith('Could not decode response'))
+
+    @patch('cmr.util.pool.urlopen')
+    def test_post_stream(self, urlopen_mock):
+        """ Test that post_stream() parses items while the body is read """
+        raw = ('{"hits": 3, "took": 4, "items": [' + ', '.join(['{"a": "bcd"}']*3)
+            + ']}').encode('utf-8')
+        urlopen_mock.return_value = EncodedResponse(gzip.compress(raw), 'gzip')
+        with patch('cmr.util.network.READ_CHUNK_SIZE', 16):
+            stream = net.post_stream("http://cmr.earthdata.nasa.gov/search", {})
+            self.assertEqual([{'a': 'bcd'}]*3, list(stream))
+        self.assertEqual(3, stream.result()['hits'])
+        self.assertEqual({'Content-Encoding': 'gzip'}, stream.result()['http-headers'])
+        self.assertEqual(0, net.rate_limiter().stats()['in-flight'])
+
+        # closing early releases the response
+        response = tutil.MockChunkedResponse(raw)
+        urlopen_mock.return_value = response
+        with net.post_stream("http://cmr.earthdata.nasa.gov/search", {}) as stream:
+            self.assertEqual({'a': 'bcd'}, next(iter(stream)))
+        self.assertTrue(response.closed)
+        self.assertEqual(0, net.rate_limiter().stats()['in-flight'])
+
+        # anything but a 200 is handled like post()
+        urlopen_mock.return_value = tutil.MockChunkedResponse('', 204, [('a', 'b')])
+        self.assertEqual({'http-headers': {'a': 'b'}},
+            net.post_stream("http://cmr.earthdata.nasa.gov/search", {}))
+        urlopen_mock.side_effect = urlerr.HTTPError(Mock(status=500), "500",
+            "Server Error", None, None)
+        self.assertEqual({'code': '500', 'reason': 'Server Error', 'errors': ['Server Error']},
+            net.post_stream("http://cmr.earthdata.nasa.gov/search", {}))
+
+        # a broken stream is reported when read
+        urlopen_mock.side_effect = None
+        urlopen_mock.return_value = EncodedResponse(b'not compressed', 'gzip')
+        with self.assertRaises(ValueError):
+            list(net.post_stream("http://cmr.earthdata.nasa.gov/search", {}))
+        self.assertEqual(0, net.rate_limiter().stats()['in-flight'])
+
+    def test_request_timeouts(self):
+        """ Test that timeouts come from config with sane defaults """
+        self.assertEqual({'connect': 10, 'read': 60, 'budget': None}, net.request_timeouts())
+        config = {'timeout.connect': 1, 'timeout.read': 2, 'timeout.budget': 3}
+        self.assertEqual({'connect': 1, 'read': 2, 'budget': 3}, net.request_timeouts(config))
+
+    @patch('time.sleep')
+    @patch('cmr.util.pool.urlopen')
+    def test_timeouts(self, urlopen_mock, sleep_mock):
+        """ Test that timeouts are passed on, clipped to the budget, and reported """
+        urlopen_mock.side_effect = lambda *args, **kwargs: tutil.MockChunkedResponse('{}')
+        net.get('https://cmr.earthdata.nasa.gov/search', config={'timeout.read': 30})
+        self.assertEqual({'timeout': 10, 'read_timeout': 30}, urlopen_mock.call_args[1])
+
+        net.get('https://cmr.earthdata.nasa.gov/search', config={'timeout.budget': 2})
+        self.assertTrue(urlopen_mock.call_args[1]['timeout'] <= 2)
+        self.assertTrue(urlopen_mock.call_args[1]['read_timeout'] <= 2)
+
+        # a timeout which outlasts the retries is returned as an error
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = urlerr.URLError(socket.timeout('timed out'))
+        response = net.post('https://cmr.earthdata.nasa.gov/search', {},
+            config={'retry.jitter': False, 'retry.idempotent': True})
+        self.assertEqual(0, response['code'])
+        self.assertTrue(response['reason'].startswith('Timed out'))
+        self.assertEqual(3, urlopen_mock.call_count)
+
+        # a POST which may have reached CMR is not sent again unless it is safe to
+        urlopen_mock.reset_mock()
+        response = net.post('https://cmr.earthdata.nasa.gov/search', {},
+            config={'retry.jitter': False})
+        self.assertTrue(response['reason'].startswith('Timed out'))
+        self.assertEqual(1, urlopen_mock.call_count)
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = urlerr.URLError(ConnectionRefusedError('refused'))
+        with self.assertRaises(urlerr.URLError):
+            net.post('https://cmr.earthdata.nasa.gov/search', {},
+                config={'retry.jitter': False})
+        self.assertEqual(3, urlopen_mock.call_count, 'never reached CMR')
+        urlopen_mock.side_effect = urlerr.URLError(socket.timeout('timed out'))
+
+        # no retry is started which would run past the budget
+        urlopen_mock.reset_mock()
+        sleep_mock.reset_mock()
+        response = net.post('https://cmr.earthdata.nasa.gov/search', {},
+            config={'retry.jitter': False, 'retry.backoff-base': 5, 'timeout.budget': 1})
+        self.assertTrue(response['reason'].startswith('Timed out'))
+        self.assertEqual(1, urlopen_mock.call_count)
+        sleep_mock.assert_not_called()
+
+        # other network errors are still raised
+        urlopen_mock.side_effect = urlerr.URLError('no route to host')
+        with self.assertRaises(urlerr.URLError):
+            net.get('https://cmr.earthdata.nasa.gov/search', config={'retry.max-attempts': 1})
+
+    def test_retry_policy(self):
+        """ Test that retry settings come from config with sane defaults """
+        policy = net.retry_policy(None)
+        self.assertEqual(3, policy['max-attempts'])
+        self.assertEqual([429, 502, 503, 504], policy['statuses'])
+
+        policy = net.retry_policy({'retry.max-attempts': 0, 'retry.backoff-cap': 2})
+        self.assertEqual(1, policy['max-attempts'], 'at least one attempt')
+        self.assertEqual(2, policy['backoff-cap'])
+
+    def test_retry_delay(self):
+        """ Test the exponential backoff calculation """
+        policy = net.retry_policy({'retry.jitter': False, 'retry.backoff-base': 1,
+            'retry.backoff-cap': 5})
+        self.assertEqual([1, 2, 4, 5, 5], [net.retry_delay(i, policy) for i in range(1, 6)])
+        self.assertEqual(7, net.retry_delay(1, policy, 7), 'Retry-After wins')
+
+        policy['jitter'] = True
+        for attempt in range(1, 6):
+            self.assertTrue(0 <= net.retry_delay(attempt, policy) <= 5)
+
+    def test_parse_retry_after(self):
+        """ Test that both forms of Retry-After can be read """
+        self.assertEqual(None, net.parse_retry_after(None))
+        self.assertEqual(None, net.parse_retry_after('soon'))
+        self.assertEqual(120, net.parse_retry_after(' 120 '))
+        self.assertEqual(30, net.parse_retry_after('Wed, 21 Oct 2015 07:28:30 GMT',
+            now=1445412480))
+        self.assertEqual(0, net.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT',
+            now=1445412480))
+
+    @patch('time.sleep')
+    @patch('cmr.util.pool.urlopen')
+    def test_retry(self, urlopen_mock, sleep_mock):
+        """ Test that transient errors are retried and others are not """
+        recorded_data_file = tutil.resolve_full_path('../data/cmr/search/one_cmr_result.json')
+        good = valid_cmr_response(recorded_data_file)
+        throttled = urlerr.HTTPError("url", 429, "Too Many Requests", {'Retry-After': '2'},
+            io.BytesIO(b'{"errors": ["Too Many Requests"]}'))
+        unavailable = urlerr.HTTPError("url", 503, "Service Unavailable", {},
+            io.BytesIO(b'{"errors": ["Service Unavailable"]}'))
+        config = {'retry.jitter': False, 'retry.backoff-base': 1}
+
+        # recovers from transient errors
+        urlopen_mock.side_effect = [throttled, unavailable, good]
+        data = net.post("http://cmr.earthdata.nasa.gov/search", {}, config=config)
+        self.assertEqual(276, data['hits'])
+        self.assertEqual(3, urlopen_mock.call_count)
+        self.assertEqual([2, 2], [call[0][0] for call in sleep_mock.call_args_list])
+
+        # gives up after the last attempt
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = [unavailable, unavailable]
+        data = net.get("http://cmr.earthdata.nasa.gov/search",
+            config=common.conj(config, {'retry.max-attempts': 2}))
+        self.assertEqual(503, data['code'])
+        self.assertEqual(2, urlopen_mock.call_count)
+
+        # server errors which are not transient are not retried
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = [urlerr.HTTPError("url", 500, "Error", {},
+            io.BytesIO(b'{"errors": ["Error"]}')), good]
+        data = net.get("http://cmr.earthdata.nasa.gov/search", config=config)
+        self.assertEqual(500, data['code'])
+        self.assertEqual(1, urlopen_mock.call_count)
+
+        # errors with no body to read are still reported
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = [urlerr.HTTPError("url", 500, "Error", {}, None), good]
+        data = net.get("http://cmr.earthdata.nasa.gov/search", config=config)
+        self.assertEqual(500, data['code'])
+
+        # the server's wait is honoured even when it is longer then the cap
+        urlopen_mock.reset_mock()
+        sleep_mock.reset_mock()
+        def too_long():
+            return urlerr.HTTPError("url", 429, "Too Many Requests", {'Retry-After': '600'},
+                io.BytesIO(b'{"errors": ["Too Many Requests"]}'))
+        urlopen_mock.side_effect = [too_long(), good]
+        data = net.get("http://cmr.earthdata.nasa.gov/search", config=config)
+        self.assertEqual(276, data['hits'])
+        self.assertEqual(2, urlopen_mock.call_count)
+        self.assertEqual(600, sleep_mock.call_args[0][0])
+
+        # unless it would run past the time budget
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = [too_long(), good]
+        data = net.get("http://cmr.earthdata.nasa.gov/search",
+            config=common.conj(config, {'timeout.budget': 60}))
+        self.assertEqual(429, data['code'])
+        self.assertEqual(1, urlopen_mock.call_count)
+
+        # network errors are retried and then raised
+        urlopen_mock.reset_mock()
+        urlopen_mock.side_effect = [urlerr.URLError('reset'), urlerr.URLError('reset')]
+        with self.assertRaises(urlerr.URLError):
+            net.get("http://cmr.earthdata.nasa.gov/search",
+                config=common.conj(config, {'retry.max-attempts': 2}))
+        self.assertEqual(2, urlopen_mock.call_count)
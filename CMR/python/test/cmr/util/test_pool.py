@@ -0,0 +1,178 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.pool module
+Created: 2026-10-17
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from unittest.mock import patch
+import socket
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from cmr.util import pool
+
+# ******************************************************************************
+
+class KeepAliveServerHandler(BaseHTTPRequestHandler):
+    """A tiny HTTP/1.1 server which counts the connections it has accepted"""
+    protocol_version = 'HTTP/1.1'
+    connections = []
+
+    def setup(self):
+        super().setup()
+        KeepAliveServerHandler.connections.append(self.client_address)
+
+    # pylint: disable=C0103 # name required by BaseHTTPRequestHandler
+    def do_GET(self):
+        """Respond with a small body, or an error when asked to"""
+        status = 404 if self.path.startswith('/missing') else 200
+        if self.path.startswith('/slow'):
+            time.sleep(0.5)
+        body = b'{"hits": 0, "took": 1, "items": []}'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Keep the test output quiet"""
+
+class QuietServer(ThreadingMixIn, HTTPServer):
+    """Test server which does not report clients hanging up on it"""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        """Pooled connections are closed whenever the client wants"""
+
+class FakeConnection():
+    """Stand in for an http.client connection"""
+    def __init__(self):
+        self.closed = False
+    def close(self):
+        """record the close"""
+        self.closed = True
+    def is_closed(self):
+        """Return the closed flag ; silence PEP8 R0903"""
+        return self.closed
+
+class TestPool(unittest.TestCase):
+    """Test suit for the connection pool"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = QuietServer(('127.0.0.1', 0), KeepAliveServerHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        KeepAliveServerHandler.connections = []
+
+    def test_checkout_and_checkin(self):
+        """Connections are reused, bounded, and counted"""
+        conn_pool = pool.ConnectionPool(max_size=1)
+        first, reused = conn_pool.checkout('key', FakeConnection)
+        self.assertFalse(reused)
+        second, reused = conn_pool.checkout('key', FakeConnection)
+        self.assertFalse(reused)
+
+        conn_pool.checkin('key', first)
+        conn_pool.checkin('key', second)
+        self.assertTrue(second.closed, 'pool is full, connection should be closed')
+        self.assertFalse(first.closed)
+
+        again, reused = conn_pool.checkout('key', FakeConnection)
+        self.assertTrue(reused)
+        self.assertIs(first, again)
+
+        stats = conn_pool.stats()
+        self.assertEqual(2, stats['created'])
+        self.assertEqual(1, stats['reused'])
+        self.assertEqual(1, stats['returned'])
+        self.assertEqual(1, stats['discarded'])
+
+    def test_idle_eviction(self):
+        """Connections idle longer then the timeout are closed and not reused"""
+        conn_pool = pool.ConnectionPool(idle_timeout=10)
+        conn, _ = conn_pool.checkout(('http', 'host'), FakeConnection)
+        with patch('time.monotonic', return_value=100):
+            conn_pool.checkin(('http', 'host'), conn)
+        self.assertEqual({'http://host': 1}, conn_pool.stats()['idle'])
+        with patch('time.monotonic', return_value=200):
+            conn_pool.evict_idle()
+        self.assertTrue(conn.closed)
+        stats = conn_pool.stats()
+        self.assertEqual(1, stats['evicted'])
+        self.assertEqual({}, stats['idle'])
+
+    def test_clear(self):
+        """Clearing the pool closes the idle connections"""
+        conn_pool = pool.ConnectionPool()
+        conn, _ = conn_pool.checkout('key', FakeConnection)
+        conn_pool.checkin('key', conn)
+        conn_pool.clear()
+        self.assertTrue(conn.closed)
+        self.assertEqual({}, conn_pool.stats()['idle'])
+
+    def test_keep_alive(self):
+        """Many requests to the same host should share one connection"""
+        conn_pool = pool.ConnectionPool()
+        opener = pool.build_opener(conn_pool)
+        for _ in range(5):
+            with opener.open(urllib.request.Request(self.url + '/search')) as resp:
+                self.assertEqual(200, resp.status)
+                self.assertTrue(resp.read().startswith(b'{"hits"'))
+        self.assertEqual(1, len(KeepAliveServerHandler.connections))
+        stats = conn_pool.stats()
+        self.assertEqual(1, stats['created'])
+        self.assertEqual(4, stats['reused'])
+        conn_pool.clear()
+
+    def test_errors_still_raised(self):
+        """urllib error handling still applies to pooled connections"""
+        conn_pool = pool.ConnectionPool()
+        opener = pool.build_opener(conn_pool)
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            opener.open(urllib.request.Request(self.url + '/missing'))
+        self.assertEqual(404, context.exception.code)
+        context.exception.close()
+        conn_pool.clear()
+
+    def test_read_timeout(self):
+        """A server which is slow to respond trips the read timeout"""
+        conn_pool = pool.ConnectionPool()
+        opener = pool.build_opener(conn_pool)
+        req = urllib.request.Request(self.url + '/slow')
+        req.read_timeout = 0.05
+        with self.assertRaises(urllib.error.URLError) as context:
+            opener.open(req, timeout=5)
+        self.assertIsInstance(context.exception.reason, socket.timeout)
+        self.assertEqual({}, conn_pool.stats()['idle'])
+        conn_pool.clear()
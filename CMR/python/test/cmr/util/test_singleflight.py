@@ -0,0 +1,168 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.singleflight module
+Created: 2026-10-17
+"""
+
+from unittest.mock import patch
+import threading
+import time
+import unittest
+
+import test.cmr as tutil
+
+from cmr.util import singleflight
+import cmr.util.network as net
+import cmr.search.common as scom
+
+# ******************************************************************************
+
+def run_threads(count, target):
+    """Start count threads running target and wait for them all"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def wait_until(condition, limit = 5):
+    """Poll condition till it is True or limit seconds have passed"""
+    give_up = time.monotonic() + limit
+    while not condition() and time.monotonic() < give_up:
+        time.sleep(0.001)
+
+class TestSingleFlight(unittest.TestCase):
+    """Test suit for request coalescing"""
+
+    def test_group(self):
+        """Concurrent calls for one key share a single call"""
+        group = singleflight.Group()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return 'answer'
+
+        def caller():
+            results.append(group.do('key', work))
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: group.stats()['shared'] >= 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual([('answer', True)]*5, results)
+        self.assertEqual({'calls': 1, 'shared': 4, 'in-flight': 0}, group.stats())
+
+        # once done, the next call runs again
+        self.assertEqual(('answer', False), group.do('key', work))
+        self.assertEqual(2, len(calls))
+
+    def test_errors_are_shared(self):
+        """Every waiting caller sees the exception"""
+        group = singleflight.Group()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def work():
+            started.set()
+            release.wait(5)
+            raise ValueError('broken')
+
+        def caller():
+            try:
+                group.do('key', work)
+            except ValueError as err:
+                errors.append(str(err))
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=caller)
+        follower.start()
+        wait_until(lambda: group.stats()['shared'] >= 1)
+        release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(['broken', 'broken'], errors)
+
+    @patch('cmr.util.pool.urlopen')
+    def test_network_coalesces(self, urlopen_mock):
+        """Threads sending the same search at once share one request"""
+        release = threading.Event()
+        body = '{"hits": 1, "took": 2, "items": [{"a": 1}]}'
+
+        def slow_open(*_, **__):
+            release.wait(5)
+            return tutil.MockChunkedResponse(body)
+        urlopen_mock.side_effect = slow_open
+
+        before = net.flight_stats()
+        results = []
+        def search():
+            results.append(net.post('https://cmr.earthdata.nasa.gov/search', {'a': 'b'},
+                config={'coalesce': True}))
+
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: net.flight_stats()['shared'] - before['shared'] >= 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, urlopen_mock.call_count)
+        self.assertEqual(4, len(results))
+        self.assertTrue(all(result['hits'] == 1 for result in results))
+        # each caller has its own copy
+        results[0]['items'].clear()
+        self.assertEqual([{'a': 1}], results[1]['items'])
+
+        # requests are not shared unless asked to be
+        urlopen_mock.reset_mock()
+        run_threads(3, lambda: net.post('https://cmr.earthdata.nasa.gov/search', {'a': 'b'}))
+        self.assertEqual(3, urlopen_mock.call_count)
+
+    @patch('cmr.util.pool.urlopen')
+    def test_searches_coalesce(self, urlopen_mock):
+        """Searches share requests unless they open a scroll or are told not to"""
+        body = '{"hits": 1, "took": 2, "items": [{"a": 1}]}'
+
+        def slow_open(*_, **__):
+            # long enough for every thread to have sent the same search
+            time.sleep(0.2)
+            return tutil.MockChunkedResponse(body)
+        urlopen_mock.side_effect = slow_open
+
+        for config, calls in [({}, 1), ({'coalesce': False}, 3),
+                ({'paging': 'scroll'}, 3)]:
+            urlopen_mock.reset_mock()
+            page_state = scom.create_page_state(limit=3000)
+            run_threads(3, lambda c=config, p=page_state: scom.search_by_page('granules',
+                {'provider': 'FAKE'}, page_state=dict(p), config=c))
+            self.assertEqual(calls, urlopen_mock.call_count, config)
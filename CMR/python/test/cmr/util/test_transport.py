@@ -0,0 +1,84 @@
+# NASA EO-Metadata-Tools Python interface for the Common Metadata Repository (CMR)
+#
+#     https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html
+#
+# Copyright (c) 2020 United States Government as represented by the Administrator
+# of the National Aeronautics and Space Administration. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+"""
+Test cases for the cmr.util.transport module
+Created: 2026-10-17
+"""
+
+from unittest.mock import patch
+import unittest
+
+import test.cmr as tutil
+
+from cmr.util import transport
+import cmr.util.network as net
+
+# ******************************************************************************
+
+class RecordingTransport(transport.Transport):
+    """Answer every request with the same body and remember the urls"""
+    def __init__(self, body):
+        self.body = body
+        self.urls = []
+
+    def urlopen(self, req, timeout = None, read_timeout = None):
+        self.urls.append(req.full_url)
+        return tutil.MockChunkedResponse(self.body)
+
+class TestTransport(unittest.TestCase):
+    """Test suit for choosing a transport"""
+
+    def tearDown(self):
+        transport.unregister('recording')
+
+    def test_registry(self):
+        """Transports are found by name, the default can not be removed"""
+        self.assertIsInstance(transport.lookup(), transport.UrllibTransport)
+        self.assertIs(transport.lookup('urllib'), transport.lookup())
+        with self.assertRaises(ValueError):
+            transport.lookup('recording')
+
+        recorder = transport.register('recording', RecordingTransport('{}'))
+        self.assertIs(recorder, transport.lookup('recording'))
+        self.assertIn('recording', transport.names())
+
+        transport.unregister('urllib')
+        self.assertIn('urllib', transport.names())
+
+    @patch('cmr.util.pool.urlopen')
+    def test_config(self, urlopen_mock):
+        """Requests go to the transport named in config"""
+        body = '{"hits": 1, "took": 2, "items": [{"a": 1}]}'
+        urlopen_mock.side_effect = lambda *args, **kwargs: tutil.MockChunkedResponse(body)
+        url = 'https://cmr.earthdata.nasa.gov/search/collections'
+
+        recorder = transport.register('recording', RecordingTransport(body))
+        self.assertEqual(1, net.post(url, {'a': 'b'}, config={'transport': 'recording'})['hits'])
+        self.assertEqual(1, net.get(url, config={'transport': 'recording'})['hits'])
+        self.assertEqual([url, url], recorder.urls)
+        self.assertEqual(0, urlopen_mock.call_count)
+
+        # transport objects can be given directly
+        other = RecordingTransport(body)
+        net.get(url, config={'transport': other})
+        self.assertEqual([url], other.urls)
+
+        # the default goes over the pooled connections
+        self.assertEqual(1, net.get(url)['hits'])
+        self.assertEqual(1, urlopen_mock.call_count)